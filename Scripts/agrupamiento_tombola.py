@@ -0,0 +1,147 @@
+# 📦 Importaciones
+import numpy as np
+
+from incidencia_tombola import N_NUMEROS
+from frecuencia_tombola import top_k
+
+
+def lloyd(X, centroides, max_iter=20):
+    """
+    Iteraciones de K-Means (asignar al centroide más cercano y recalcular
+    medias) desde los centroides dados. Un cluster que queda vacío conserva
+    su centroide. Devuelve (etiquetas, centroides).
+    """
+    centroides = np.array(centroides, dtype=np.float64)
+    etiquetas = None
+    for _ in range(max_iter):
+        distancias = ((X[:, None, :] - centroides[None, :, :]) ** 2).sum(axis=2)
+        nuevas = distancias.argmin(axis=1)
+        if etiquetas is not None and np.array_equal(nuevas, etiquetas):
+            break
+        etiquetas = nuevas
+        cantidad = np.bincount(etiquetas, minlength=len(centroides))
+        sumas = np.zeros_like(centroides)
+        np.add.at(sumas, etiquetas, X)
+        llenos = cantidad > 0
+        centroides[llenos] = sumas[llenos] / cantidad[llenos, None]
+    return etiquetas, centroides
+
+
+class KMeansIncremental:
+    """
+    K-Means para el walk-forward semanal sobre la tabla número x día de la
+    semana.
+
+    - Ajuste completo (KMeans de scikit-learn con n_init arranques) la
+      primera semana y cada refit_cada semanas (0 = nunca más). Con el valor
+      por defecto (1) todas las semanas son un ajuste completo, igual que
+      agrupar cada semana desde cero.
+    - Con refit_cada > 1, el resto de las semanas arranca de los centroides
+      anteriores, reescalados por el crecimiento de los conteos, y solo hace
+      las pocas iteraciones que hagan falta para reacomodarse. Es una
+      aproximación: Lloyd puede quedar en otro óptimo local y el cluster
+      elegido cambiar respecto del ajuste completo.
+    """
+
+    def __init__(self, n_clusters=3, random_state=42, n_init=10, refit_cada=1, max_iter=20):
+        self.n_clusters = n_clusters
+        self.random_state = random_state
+        self.n_init = n_init
+        self.refit_cada = refit_cada
+        self.max_iter = max_iter
+        self.centroides = None
+        self.total = 0.0
+        self.semanas_desde_refit = 0
+
+    def ajustar(self, X):
+        """Etiquetas de las filas de X (None si hay menos filas que clusters)."""
+        if len(X) < self.n_clusters:
+            return None
+        toca_refit = (
+            self.centroides is None
+            or (self.refit_cada > 0 and self.semanas_desde_refit >= self.refit_cada)
+        )
+        if toca_refit:
+            from sklearn.cluster import KMeans
+            kmeans = KMeans(n_clusters=self.n_clusters, random_state=self.random_state, n_init=self.n_init)
+            etiquetas = kmeans.fit_predict(X)
+            self.centroides = kmeans.cluster_centers_
+            self.semanas_desde_refit = 0
+        else:
+            semilla = self.centroides * (X.sum() / self.total)
+            etiquetas, self.centroides = lloyd(X, semilla, self.max_iter)
+        self.total = X.sum()
+        self.semanas_desde_refit += 1
+        return etiquetas
+
+
+def dbscan_grafo(vecinos, min_samples=2):
+    """
+    Etiquetas de DBSCAN a partir de la matriz booleana de vecinos (cada
+    punto es vecino de sí mismo), iguales a las de sklearn: los núcleos
+    conectados forman un cluster, numerados por su primer punto; un punto de
+    borde toma el cluster de menor número entre sus núcleos vecinos y el
+    resto queda como ruido (-1).
+    """
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    nucleos = vecinos.sum(axis=1) >= min_samples
+    etiquetas = np.full(len(vecinos), -1)
+    if not nucleos.any():
+        return etiquetas
+    _, componentes = connected_components(csr_matrix(vecinos[np.ix_(nucleos, nucleos)]), directed=False)
+    # Componentes renumeradas en el orden de su primer núcleo
+    _, primeros, componentes = np.unique(componentes, return_index=True, return_inverse=True)
+    etiquetas[nucleos] = np.argsort(np.argsort(primeros))[componentes]
+
+    bordes = ~nucleos & vecinos[:, nucleos].any(axis=1)
+    candidatas = np.where(vecinos[np.ix_(bordes, nucleos)], etiquetas[nucleos], len(vecinos))
+    etiquetas[bordes] = candidatas.min(axis=1)
+    return etiquetas
+
+
+class DBSCANIncremental:
+    """
+    DBSCAN para el walk-forward semanal. El resultado de DBSCAN depende solo
+    del grafo de vecinos a distancia <= eps (y de min_samples), así que cada
+    semana se calcula ese grafo con NumPy (100 x 100) y se etiqueta
+    directamente sobre él, sin volver a buscar vecinos; si es el mismo grafo
+    de la semana anterior, se reutilizan las etiquetas.
+    """
+
+    def __init__(self, eps=1.5, min_samples=2):
+        self.eps = eps
+        self.min_samples = min_samples
+        self.vecinos = None
+        self.etiquetas = None
+        self.reutilizadas = 0
+
+    def ajustar(self, X_escalado):
+        diferencias = X_escalado[:, None, :] - X_escalado[None, :, :]
+        vecinos = (diferencias ** 2).sum(axis=2) <= self.eps ** 2
+        if self.vecinos is not None and np.array_equal(vecinos, self.vecinos):
+            self.reutilizadas += 1
+            return self.etiquetas
+        self.etiquetas = dbscan_grafo(vecinos, self.min_samples)
+        self.vecinos = vecinos
+        return self.etiquetas
+
+
+def escalar(X):
+    """Como StandardScaler: media 0 y desvío 1 por columna (las columnas constantes quedan en 0)."""
+    desvio = X.std(axis=0)
+    return (X - X.mean(axis=0)) / np.where(desvio > 0, desvio, 1.0)
+
+
+def orden_en_cluster(totales, presentes, etiquetas, cluster):
+    """
+    (puntajes, orden): total de apariciones de los 100 números y, en orden
+    de mayor a menor total (empates por número), los que están en el cluster.
+    """
+    puntajes = np.zeros(N_NUMEROS)
+    puntajes[presentes] = totales
+    en_cluster = np.zeros(N_NUMEROS, dtype=bool)
+    en_cluster[presentes[etiquetas == cluster]] = True
+    orden = top_k(np.where(en_cluster, puntajes, 0)[None, :], k=N_NUMEROS)[0]
+    return puntajes, orden
@@ -1,73 +1,76 @@
 import pandas as pd
+import numpy as np
 import os
-from datetime import datetime, timedelta
+import argparse
+from incidencia_tombola import cargar_incidencia
+from frecuencia_tombola import conteos_semanales, top_k
+from traza_tombola import Traza
+from salida_incremental_tombola import SalidaIncremental, agregar_argumento_solo_nuevas, configuracion
+from puntajes_tombola import agregar_argumento_puntajes, rangos_de_orden, tabla_puntajes
+
+# Opciones: por defecto se usa la frecuencia acumulada desde el primer sorteo
+parser = argparse.ArgumentParser(description="Top 10 semanal por frecuencia de aparición.")
+parser.add_argument("--ventana", type=int, default=None,
+                    help="Contar solo los sorteos de los últimos N días.")
+parser.add_argument("--vida-media", type=float, default=None,
+                    help="Ponderar los sorteos con decaimiento exponencial de vida media N días.")
+parser.add_argument("--salida", default=os.path.join("data", "analisis_frecuencia_tombola.csv"),
+                    help="Ruta del CSV de predicciones.")
+agregar_argumento_solo_nuevas(parser)
+agregar_argumento_puntajes(parser)
+args = parser.parse_args()
 
 # Ruta al archivo Excel
 ruta_excel = os.path.join("data", "tombola.xlsx")
 
 # Ruta donde se guardará el archivo CSV de predicciones
-ruta_csv = os.path.join("data", "analisis_frecuencia_tombola.csv")
+ruta_csv = args.salida
 
-# Cargar el archivo Excel
+# Medición por etapas (con TOMBOLA_TRAZA=1)
+traza = Traza(ruta_csv)
+
+# Cargar la matriz de incidencia (desde la caché si el Excel no cambió)
 try:
-    df = pd.read_excel(ruta_excel)
+    with traza.etapa("cargar_datos"):
+        incidencia = cargar_incidencia(ruta_excel)
 except FileNotFoundError:
     print("❌ Error: No se encontró el archivo 'tombola.xlsx' en la carpeta 'data'.")
     exit()
 
-# Eliminar filas sin número y asegurar que la columna 'Fecha' sea de tipo datetime
-df.dropna(subset=["Numero"], inplace=True)
-df["Fecha"] = pd.to_datetime(df["Fecha"])
-
-# Obtener el rango de fechas del DataFrame
-fecha_inicio_datos = df["Fecha"].min().date()
-fecha_fin_datos = df["Fecha"].max().date()
-
-# Calcular el inicio de la primera semana completa en los datos
-inicio_primera_semana = fecha_inicio_datos - timedelta(days=fecha_inicio_datos.weekday())
-
-# Lista para almacenar los resultados
-lista_resultados = []
-
-# Iterar semana a semana desde el inicio de los datos hasta el final
-fecha_actual_prediccion = inicio_primera_semana
-while fecha_actual_prediccion <= fecha_fin_datos:
-    # Definir el rango de la semana para la predicción
-    inicio_semana = fecha_actual_prediccion
-    fin_semana = inicio_semana + timedelta(days=6)
-
-    # Convertir fin_semana a datetime para que coincida con el tipo de la columna 'Fecha'
-    fin_semana_datetime = datetime.combine(fin_semana, datetime.min.time())
-
-    # Filtrar los datos que están disponibles hasta el final de la semana actual
-    df_filtrado = df[df["Fecha"] <= fin_semana_datetime]
-
-    # Calcular frecuencias con los datos históricos hasta esa semana
-    frecuencia = df_filtrado["Numero"].value_counts().sort_values(ascending=False)
-
-    # Obtener el top 10 (la predicción para la siguiente semana)
-    prediccion_semanal = frecuencia.head(10).index.tolist()
-
-    # Preparar el nuevo registro y añadirlo a la lista
-    nuevo_registro = {
-        'semana_inicio': inicio_semana.strftime('%Y-%m-%d'),
-        'semana_fin': fin_semana.strftime('%Y-%m-%d'),
-        'prediccion': str(prediccion_semanal)
-    }
-    lista_resultados.append(nuevo_registro)
+# Calcular, para todas las semanas a la vez, las frecuencias con los datos
+# disponibles hasta el final de cada semana (sumas prefijas por número)
+with traza.etapa("conteos_semanales"):
+    inicios, fines, frecuencias = conteos_semanales(
+        incidencia, ventana_dias=args.ventana, vida_media_dias=args.vida_media
+    )
 
-    # Pasar a la siguiente semana
-    fecha_actual_prediccion += timedelta(days=7)
+# Obtener el top 10 de cada semana (la predicción para la siguiente semana)
+with traza.etapa("top_k"):
+    predicciones = top_k(frecuencias, k=10)
 
-# Crear el DataFrame final a partir de la lista de resultados
-df_predicciones = pd.DataFrame(lista_resultados)
+# Crear el DataFrame final con una fila por semana
+df_predicciones = pd.DataFrame({
+    'semana_inicio': inicios.astype(str),
+    'semana_fin': fines.astype(str),
+    'prediccion': [str(prediccion) for prediccion in predicciones]
+})
 
 # Verificar si el archivo ya existía (solo para informar)
-if os.path.exists(ruta_csv):
+if os.path.exists(ruta_csv) and not args.solo_nuevas:
     print("⚠️ El archivo de predicciones ya existía y será sobrescrito.")
 
-# Guardar el DataFrame completo en el archivo CSV
-df_predicciones.to_csv(ruta_csv, index=False)
+# Guardar en el CSV (con --solo-nuevas, solo las semanas que faltan o cambiaron)
+with traza.etapa("guardar_csv"):
+    salida = SalidaIncremental(ruta_csv, incidencia, configuracion(args), args.solo_nuevas, args.puntajes)
+    pendientes = df_predicciones["semana_inicio"].map(salida.es_pendiente).to_numpy(dtype=bool)
+    puntajes = None
+    if args.puntajes:
+        # Puntaje = frecuencia; el puesto sigue el orden de top_k (sin los de frecuencia 0)
+        orden = np.argsort(-frecuencias[pendientes], axis=1, kind="stable")
+        rangos = rangos_de_orden(orden, np.take_along_axis(frecuencias[pendientes], orden, axis=1) > 0)
+        puntajes = tabla_puntajes(inicios[pendientes], frecuencias[pendientes].astype(np.float32), rangos)
+    df_predicciones = df_predicciones[pendientes]
+    salida.guardar(df_predicciones, puntajes)
 
 # Mensajes finales
 print(f"✅ Se han generado predicciones semanales y se han guardado en '{ruta_csv}'")
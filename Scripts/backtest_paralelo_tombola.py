@@ -0,0 +1,118 @@
+# 📦 Importaciones
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from puntajes_tombola import puntajes_semana
+
+# 🧵 Variables que limitan los hilos de las librerías numéricas (OpenMP/BLAS)
+VARIABLES_HILOS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                   "NUMEXPR_NUM_THREADS", "VECLIB_MAXIMUM_THREADS")
+
+
+def lista_semanas(fecha_inicio, fecha_fin):
+    """Lunes de cada semana del backtest, desde la semana de fecha_inicio hasta la de fecha_fin."""
+    semana = fecha_inicio - timedelta(days=fecha_inicio.weekday())
+    semanas = []
+    while semana <= fecha_fin:
+        semanas.append(semana)
+        semana += timedelta(days=7)
+    return semanas
+
+
+def fila_semana(inicio_semana, prediccion, puntajes=None, orden=()):
+    """
+    Registro de salida de una semana con el formato común de los CSV. Con
+    puntajes (vector de 100) y orden (números en el orden del script) se
+    agregan también las filas de la tabla de puntajes.
+    """
+    fila = {
+        "semana_inicio": inicio_semana.strftime("%Y-%m-%d"),
+        "semana_fin": (inicio_semana + timedelta(days=6)).strftime("%Y-%m-%d"),
+        "prediccion": prediccion
+    }
+    if puntajes is not None:
+        fila["puntajes"] = puntajes_semana(inicio_semana, puntajes, orden)
+    return fila
+
+
+def agregar_argumento_trabajadores(parser):
+    parser.add_argument("--trabajadores", type=int, default=1,
+                        help="Procesos para calcular semanas en paralelo (1 = en serie, 0 = todos los núcleos).")
+
+
+def _resolver_trabajadores(trabajadores):
+    if trabajadores == 0:
+        return os.cpu_count() or 1
+    return trabajadores
+
+
+def hilos_por_trabajador(trabajadores):
+    """Hilos de OpenMP/BLAS que le tocan a cada proceso para no pedir más que los núcleos."""
+    return max(1, (os.cpu_count() or 1) // trabajadores)
+
+
+def _limitar_hilos(hilos):
+    """
+    Inicializador de cada proceso del pool. XGBoost, LightGBM y BLAS usan
+    por defecto todos los núcleos; con N procesos eso son N x núcleos hilos
+    compitiendo. Las variables de entorno llegan tarde si la librería ya se
+    cargó (el script se importa antes del inicializador), así que el tope
+    se aplica también con threadpoolctl sobre las librerías ya cargadas.
+    """
+    for variable in VARIABLES_HILOS:
+        os.environ[variable] = str(hilos)
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(limits=hilos)
+
+
+def _pool(trabajadores):
+    return ProcessPoolExecutor(max_workers=trabajadores, initializer=_limitar_hilos,
+                               initargs=(hilos_por_trabajador(trabajadores),))
+
+
+class EjecutorTareas:
+    """
+    Pool de procesos reutilizable entre semanas (o ejecución en serie con
+    trabajadores <= 1). map devuelve los resultados en el orden de las tareas.
+    Usar como context manager para cerrar el pool al terminar.
+    """
+
+    def __init__(self, trabajadores=1):
+        self.trabajadores = _resolver_trabajadores(trabajadores)
+        self.pool = _pool(self.trabajadores) if self.trabajadores > 1 else None
+
+    def map(self, funcion, tareas):
+        if self.pool is None:
+            return [funcion(tarea) for tarea in tareas]
+        tareas = list(tareas)
+        lote = max(1, len(tareas) // (4 * self.trabajadores))
+        return list(self.pool.map(funcion, tareas, chunksize=lote))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+def ejecutar_semanas(funcion, semanas, trabajadores=1):
+    """
+    Aplica funcion(inicio_semana) a cada semana y devuelve los resultados en
+    el mismo orden que semanas.
+
+    Cada semana solo depende de los datos hasta su cierre, así que con
+    trabajadores > 1 se reparten en un pool de procesos; el resultado es el
+    mismo que en serie. funcion debe estar definida a nivel de módulo.
+    """
+    trabajadores = _resolver_trabajadores(trabajadores)
+    if trabajadores <= 1 or len(semanas) <= 1:
+        return [funcion(semana) for semana in semanas]
+
+    trabajadores = min(trabajadores, len(semanas))
+    with _pool(trabajadores) as pool:
+        return list(pool.map(funcion, semanas))
@@ -0,0 +1,271 @@
+# 📦 Importaciones
+import argparse
+import csv
+import filecmp
+import os
+import platform
+import shlex
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from ejecutar_modelos import CARPETA_PROYECTO, CARPETA_SCRIPTS, MODELOS
+
+# 📁 Rutas
+CARPETA_BENCHMARK = os.path.join(CARPETA_PROYECTO, "data", "benchmark")
+CARPETA_SINTETICOS = os.path.join(CARPETA_BENCHMARK, "sinteticos")
+RUTA_RESULTADOS = os.path.join(CARPETA_BENCHMARK, "resultados_benchmark.csv")
+
+# ⚙️ Valores por defecto
+ANIOS = (1, 5, 10, 25, 50)
+MODELOS_BENCHMARK = ("frecuencia", "markov", "poisson", "binomial_negativa", "kmeans", "dbscan", "rf", "xgb", "lgb", "arima", "prophet", "lstm")
+COLUMNAS = ["fecha", "commit", "python", "anios", "dias", "semanas", "modelo", "segundos", "memoria_mb", "estado"]
+
+
+def generar_sorteos(anios, semilla=0, fecha_inicio=date(2000, 1, 3)):
+    """
+    Historial sintético con el esquema de tombola.xlsx (Fecha, Posicion,
+    Numero): diez números al azar (00 a 99, con repetición) por día, de
+    lunes a sábado, durante anios años desde fecha_inicio.
+    """
+    dias = pd.date_range(fecha_inicio, periods=int(round(anios * 365.25)), freq="D")
+    dias = dias[dias.dayofweek < 6]
+    numeros = np.random.default_rng(semilla).integers(0, 100, size=len(dias) * 10)
+    return pd.DataFrame({
+        "Fecha": np.repeat(dias.values, 10),
+        "Posicion": np.tile(np.arange(1, 11), len(dias)),
+        "Numero": numeros,
+    })
+
+
+def archivo_sintetico(anios, semilla=0):
+    """Ruta del Excel sintético de anios años, generándolo la primera vez."""
+    ruta = os.path.join(CARPETA_SINTETICOS, f"tombola_{anios}a_s{semilla}.xlsx")
+    if not os.path.exists(ruta):
+        os.makedirs(CARPETA_SINTETICOS, exist_ok=True)
+        temporal = f"{ruta}.{os.getpid()}.tmp.xlsx"
+        generar_sorteos(anios, semilla).to_excel(temporal, index=False)
+        os.replace(temporal, ruta)
+    return ruta
+
+
+def commit_actual():
+    """Commit corto de HEAD, con sufijo -sucio si hay cambios sin confirmar."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=CARPETA_PROYECTO,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        cambios = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=CARPETA_PROYECTO,
+                                 capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+    return commit + ("-sucio" if cambios else "")
+
+
+def separar_variante(variante):
+    """'arima:--warm-start --trabajadores 4' -> ('arima', ['--warm-start', '--trabajadores', '4'])."""
+    nombre, _, opciones = variante.partition(":")
+    return nombre, shlex.split(opciones)
+
+
+def medir_proceso(comando, carpeta, limite_segundos=None, registro=None, entorno=None):
+    """
+    Ejecuta el comando y devuelve (segundos, memoria_mb, estado), con la
+    memoria pico (RSS máximo) del proceso según el sistema operativo. Sin
+    os.wait4 (Windows) la memoria pico no se puede medir y queda en NaN.
+    """
+    inicio = time.perf_counter()
+    posix = hasattr(os, "wait4")
+    proceso = subprocess.Popen(comando, cwd=carpeta, stdout=registro or subprocess.DEVNULL,
+                               stderr=subprocess.STDOUT, start_new_session=posix, env=entorno)
+    estado = "ok"
+    if posix:
+        while True:
+            pid, codigo, uso = os.wait4(proceso.pid, os.WNOHANG)
+            if pid:
+                break
+            if limite_segundos is not None and time.perf_counter() - inicio > limite_segundos:
+                os.killpg(proceso.pid, signal.SIGKILL)
+                _, codigo, uso = os.wait4(proceso.pid, 0)
+                estado = "limite"
+                break
+            time.sleep(0.05)
+        proceso.returncode = os.waitstatus_to_exitcode(codigo)  # evita que Popen lo espere de nuevo
+        # ru_maxrss está en KiB en Linux y en bytes en macOS
+        memoria_mb = uso.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    else:
+        try:
+            proceso.wait(timeout=limite_segundos)
+        except subprocess.TimeoutExpired:
+            proceso.kill()
+            proceso.wait()
+            estado = "limite"
+        memoria_mb = float("nan")
+    segundos = time.perf_counter() - inicio
+    if estado == "ok" and proceso.returncode != 0:
+        estado = f"error {proceso.returncode}"
+    return segundos, memoria_mb, estado
+
+
+def enlazar_archivo(origen, destino):
+    """
+    Deja en destino el archivo origen: un enlace simbólico o, donde no se
+    pueden crear (Windows sin permisos), una copia. No hace nada si destino
+    ya es ese enlace o una copia igual.
+    """
+    if os.path.lexists(destino):
+        if os.path.islink(destino):
+            if os.path.realpath(destino) == os.path.realpath(origen):
+                return
+        elif filecmp.cmp(origen, destino, shallow=True):
+            return
+        os.remove(destino)
+    try:
+        os.symlink(origen, destino)
+    except (OSError, NotImplementedError):
+        shutil.copy2(origen, destino)
+
+
+def preparar_proyecto(carpeta, anios, semilla=0):
+    """
+    Arma una carpeta de proyecto con data/tombola.xlsx sintético y deja
+    construida la caché de datos, para que no se mida en el primer modelo.
+    Devuelve (dias, semanas) del historial.
+    """
+    os.makedirs(os.path.join(carpeta, "data"), exist_ok=True)
+    enlazar_archivo(archivo_sintetico(anios, semilla), os.path.join(carpeta, "data", "tombola.xlsx"))
+    codigo = ("from incidencia_tombola import cargar_incidencia; i = cargar_incidencia(); "
+              "print(i.n_dias, len(i.semanas()[0]))")
+    entorno = dict(os.environ, PYTHONPATH=CARPETA_SCRIPTS)
+    salida = subprocess.run([sys.executable, "-c", codigo], cwd=carpeta, env=entorno,
+                            capture_output=True, text=True, check=True).stdout.split()
+    return int(salida[0]), int(salida[1])
+
+
+def guardar_resultados(filas, ruta=RUTA_RESULTADOS):
+    """Agrega las filas al CSV de resultados (con encabezado si es nuevo)."""
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    nuevo = not os.path.exists(ruta)
+    with open(ruta, "a", newline="", encoding="utf-8") as f:
+        escritor = csv.DictWriter(f, fieldnames=COLUMNAS)
+        if nuevo:
+            escritor.writeheader()
+        escritor.writerows(filas)
+
+
+def ejecutar_benchmark(variantes, anios, semilla=0, limite_segundos=None):
+    """
+    Corre el backtest completo de cada variante de modelo sobre historiales
+    sintéticos de cada tamaño. Una variante que supera el límite de tiempo
+    no se vuelve a correr en tamaños mayores. Devuelve las filas de resultados.
+    """
+    commit = commit_actual()
+    fecha = datetime.now().isoformat(timespec="seconds")
+    filas = []
+    descartadas = set()
+    for n_anios in sorted(anios):
+        with tempfile.TemporaryDirectory(prefix="benchmark_tombola_") as carpeta:
+            dias, semanas = preparar_proyecto(carpeta, n_anios, semilla)
+            print(f"\n📅 {n_anios} años: {dias} días de sorteo, {semanas} semanas")
+            for variante in variantes:
+                if variante in descartadas:
+                    continue
+                nombre, opciones = separar_variante(variante)
+                comando = [sys.executable, os.path.join(CARPETA_SCRIPTS, MODELOS[nombre][0])] + opciones
+                with open(os.path.join(carpeta, "salida.log"), "ab") as registro:
+                    segundos, memoria_mb, estado = medir_proceso(comando, carpeta, limite_segundos, registro)
+                if estado == "limite":
+                    descartadas.add(variante)
+                print(f"  {variante:<30} {segundos:9.1f} s {memoria_mb:9.0f} MB  {estado}")
+                filas.append({
+                    "fecha": fecha, "commit": commit, "python": platform.python_version(),
+                    "anios": n_anios, "dias": dias, "semanas": semanas, "modelo": variante,
+                    "segundos": round(segundos, 3), "memoria_mb": round(memoria_mb, 1), "estado": estado,
+                })
+    return filas
+
+
+def exponentes(resultados):
+    """
+    Pendiente log-log del tiempo respecto de la cantidad de semanas, por
+    modelo: ~1 es lineal, ~2 delata un costo cuadrático en semanas.
+    """
+    validos = resultados[resultados["estado"] == "ok"]
+    pendientes = {}
+    for modelo, grupo in validos.groupby("modelo", sort=False):
+        if grupo["semanas"].nunique() >= 2:
+            pendientes[modelo] = np.polyfit(np.log(grupo["semanas"]), np.log(grupo["segundos"]), 1)[0]
+    return pd.Series(pendientes, name="exponente", dtype=float)
+
+
+def comparar(resultados, base, actual):
+    """Tabla modelo × años con los segundos de dos commits y su cociente (actual / base)."""
+    validos = resultados[resultados["estado"] == "ok"]
+    # Si un commit se midió varias veces, se toma la última medición
+    ultimos = validos.drop_duplicates(["commit", "modelo", "anios"], keep="last")
+    tabla = ultimos.pivot_table(index=["modelo", "anios"], columns="commit", values="segundos")
+    faltantes = [commit for commit in (base, actual) if commit not in tabla.columns]
+    if faltantes:
+        raise ValueError(f"Sin resultados para: {', '.join(faltantes)}")
+    tabla = tabla[[base, actual]]
+    tabla["cociente"] = tabla[actual] / tabla[base]
+    return tabla
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mide tiempo y memoria pico del backtest de cada modelo sobre historiales sintéticos."
+    )
+    parser.add_argument("modelos", nargs="*", metavar="modelo[:opciones]",
+                        help=f"Modelos a medir, con opciones opcionales (p. ej. 'arima:--warm-start'). "
+                             f"Por defecto: {', '.join(MODELOS_BENCHMARK)}.")
+    parser.add_argument("--anios", type=int, nargs="+", default=list(ANIOS),
+                        help="Tamaños del historial sintético, en años.")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla del generador de sorteos.")
+    parser.add_argument("--limite-segundos", type=float, default=None,
+                        help="Cortar una corrida que supere este tiempo y no medir ese modelo en tamaños mayores.")
+    parser.add_argument("--resultados", default=RUTA_RESULTADOS, help="CSV donde se acumulan los resultados.")
+    parser.add_argument("--comparar", nargs="*", metavar="COMMIT",
+                        help="No medir: comparar los resultados guardados de BASE [ACTUAL] "
+                             "(por defecto, los dos últimos commits medidos).")
+    args = parser.parse_args()
+
+    if args.comparar is not None:
+        if not os.path.exists(args.resultados):
+            parser.error(f"no existe '{args.resultados}'")
+        resultados = pd.read_csv(args.resultados, dtype={"commit": str})
+        commits = list(dict.fromkeys(resultados["commit"]))
+        if not args.comparar and len(commits) < 2:
+            parser.error("hacen falta resultados de al menos dos commits")
+        base = args.comparar[0] if args.comparar else commits[-2]
+        actual = args.comparar[1] if len(args.comparar) > 1 else commits[-1]
+        try:
+            print(comparar(resultados, base, actual).to_string(float_format=lambda x: f"{x:.2f}"))
+        except ValueError as e:
+            parser.error(str(e))
+        return
+
+    variantes = list(dict.fromkeys(args.modelos)) or list(MODELOS_BENCHMARK)
+    desconocidos = [v for v in variantes if separar_variante(v)[0] not in MODELOS]
+    if desconocidos:
+        parser.error(f"modelos desconocidos: {', '.join(desconocidos)}")
+
+    filas = ejecutar_benchmark(variantes, args.anios, args.semilla, args.limite_segundos)
+    guardar_resultados(filas, args.resultados)
+
+    pendientes = exponentes(pd.DataFrame(filas))
+    if len(pendientes):
+        print("\n📈 Crecimiento del tiempo ~ semanas^exponente:")
+        for modelo, exponente in pendientes.items():
+            print(f"  {modelo:<30} {exponente:5.2f}")
+    print(f"\n✅ Resultados agregados a '{args.resultados}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# 📦 Importaciones
+import numpy as np
+import pandas as pd
+
+from incidencia_tombola import N_NUMEROS
+
+# 🧱 Un conjunto de números 00-99 en 128 bits: dos uint64 por fila, el
+# número n es el bit n % 64 de la palabra n // 64 (la segunda usa 36 bits)
+PALABRAS = 2
+
+# Cantidad de unos en cada byte, para NumPy sin bitwise_count (< 2.0)
+_BITS_POR_BYTE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+def contar_bits(palabras, axis=-1):
+    """Cantidad de bits en 1 de un arreglo de uint64, sumada sobre axis."""
+    palabras = np.ascontiguousarray(palabras, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(palabras).sum(axis=axis, dtype=np.int64)
+    por_byte = _BITS_POR_BYTE[palabras.view(np.uint8)].reshape(*palabras.shape, 8)
+    return por_byte.sum(axis=-1, dtype=np.int64).sum(axis=axis)
+
+
+def empaquetar(presencia):
+    """Matriz booleana (..., 100) -> máscaras (..., 2) uint64."""
+    presencia = np.asarray(presencia, dtype=bool)
+    relleno = np.zeros((*presencia.shape[:-1], 64 * PALABRAS - N_NUMEROS), dtype=bool)
+    bytes_ = np.packbits(np.concatenate([presencia, relleno], axis=-1), axis=-1, bitorder="little")
+    return np.ascontiguousarray(bytes_).view("<u8").astype(np.uint64, copy=False)
+
+
+def desempaquetar(mascaras):
+    """Máscaras (..., 2) uint64 -> matriz booleana (..., 100)."""
+    bytes_ = np.ascontiguousarray(mascaras, dtype="<u8").view(np.uint8)
+    return np.unpackbits(bytes_, axis=-1, bitorder="little")[..., :N_NUMEROS].astype(bool)
+
+
+def mascaras_de_listas(numeros):
+    """
+    Predicciones (filas, k) de números con -1 en las posiciones vacías (como
+    las de parsear_predicciones) -> máscaras (filas, 2). Los repetidos
+    cuentan una sola vez.
+    """
+    numeros = np.asarray(numeros, dtype=np.int64)
+    mascaras = np.zeros((len(numeros), PALABRAS), dtype=np.uint64)
+    fila, posicion = np.nonzero((numeros >= 0) & (numeros < N_NUMEROS))
+    valores = numeros[fila, posicion]
+    np.bitwise_or.at(mascaras, (fila, valores >> 6), np.left_shift(np.uint64(1), (valores & 63).astype(np.uint64)))
+    return mascaras
+
+
+def mascara(numeros):
+    """Máscara (2,) de un conjunto de números."""
+    return mascaras_de_listas(np.asarray(list(numeros), dtype=np.int64)[None, :])[0]
+
+
+def numeros_de(mascara_fila):
+    """Lista ordenada de los números de una máscara (2,)."""
+    return np.flatnonzero(desempaquetar(mascara_fila)).tolist()
+
+
+# 🔢 Operaciones vectorizadas (con broadcasting entre filas)
+
+def cantidad(mascaras):
+    """Números de cada conjunto."""
+    return contar_bits(mascaras)
+
+
+def aciertos(a, b):
+    """Números en común entre los conjuntos a y b (popcount del AND)."""
+    return contar_bits(np.bitwise_and(a, b))
+
+
+def contiene(mascaras, numero):
+    """True donde el conjunto incluye numero."""
+    palabra = np.asarray(mascaras)[..., numero >> 6]
+    return (palabra >> np.uint64(numero & 63)) & np.uint64(1) == 1
+
+
+def union(mascaras, axis=0):
+    """Unión de los conjuntos a lo largo de axis."""
+    return np.bitwise_or.reduce(np.asarray(mascaras, dtype=np.uint64), axis=axis)
+
+
+def solapamiento(a, b):
+    """Jaccard entre conjuntos: |a ∩ b| / |a ∪ b| (NaN si ambos están vacíos)."""
+    interseccion = aciertos(a, b)
+    total = contar_bits(np.bitwise_or(a, b))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(total > 0, interseccion / total, np.nan)
+
+
+# 📅 Sorteos y semanas
+
+def mascaras_diarias(incidencia):
+    """Máscara de los números sorteados cada día (n_dias, 2)."""
+    return empaquetar(incidencia.presencia)
+
+
+def mascaras_semanales(incidencia):
+    """
+    (inicios, mascaras): lunes de cada semana del backtest y máscara (n_semanas, 2)
+    de los números que salieron en esa semana (OR de sus días).
+    """
+    inicios, _, cortes = incidencia.semanas()
+    diarias = mascaras_diarias(incidencia)
+    semanales = np.zeros((len(inicios), PALABRAS), dtype=np.uint64)
+    desde = np.concatenate(([0], cortes[:-1])).astype(np.intp)
+    con_dias = cortes > desde
+    if con_dias.any():
+        semanales[con_dias] = np.bitwise_or.reduceat(diarias, desde[con_dias], axis=0)
+    return inicios, semanales
+
+
+def desde_sorteos(df):
+    """
+    DataFrame (Fecha, Numero) -> (fechas, mascaras): días distintos en orden
+    y la máscara de cada uno. Los números fuera de 00-99 se ignoran y los
+    repetidos de un día cuentan una vez.
+    """
+    validos = df["Numero"].between(0, N_NUMEROS - 1)
+    fechas_dia = df.loc[validos, "Fecha"].values.astype("datetime64[D]")
+    numeros = df.loc[validos, "Numero"].values.astype(np.int64)
+    fechas, fila = np.unique(fechas_dia, return_inverse=True)
+    mascaras = np.zeros((len(fechas), PALABRAS), dtype=np.uint64)
+    np.bitwise_or.at(mascaras, (fila, numeros >> 6), np.left_shift(np.uint64(1), (numeros & 63).astype(np.uint64)))
+    return fechas, mascaras
+
+
+def a_sorteos(fechas, mascaras):
+    """(fechas, mascaras) -> DataFrame (Fecha, Numero), con los números de cada día en orden ascendente."""
+    dia, numero = np.nonzero(desempaquetar(mascaras))
+    return pd.DataFrame({
+        "Fecha": pd.to_datetime(np.asarray(fechas, dtype="datetime64[D]")[dia]),
+        "Numero": numero.astype(np.int64),
+    })
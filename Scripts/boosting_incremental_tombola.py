@@ -0,0 +1,103 @@
+# 📦 Importaciones
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+
+class BoostingIncremental:
+    """
+    Clasificador de boosting para el walk-forward semanal que no reentrena
+    desde cero cada semana.
+
+    - Reajuste completo (n_estimators árboles sobre toda la historia) la
+      primera semana y cada refit_cada semanas (0 = nunca más).
+    - El resto de las semanas continúa el booster anterior agregando
+      arboles_por_semana árboles entrenados solo con los días nuevos.
+    - Los datasets de los días nuevos se discretizan con los cortes del
+      último reajuste completo (QuantileDMatrix / lgb.Dataset con reference),
+      sin volver a calcular los histogramas.
+
+    libreria: "xgb" o "lgb". Se usa como el clasificador de sklearn a través
+    de predict_proba.
+    """
+
+    def __init__(self, libreria, n_estimators=100, arboles_por_semana=10, refit_cada=13,
+                 learning_rate=0.1, random_state=42):
+        if libreria not in ("xgb", "lgb"):
+            raise ValueError(f"Librería de boosting desconocida: {libreria}")
+        self.libreria = libreria
+        self.n_estimators = n_estimators
+        self.arboles_por_semana = arboles_por_semana
+        self.refit_cada = refit_cada
+        self.learning_rate = learning_rate
+        self.random_state = random_state
+
+        self.booster = None
+        self.referencia = None
+        self.n_dias_entrenados = 0
+        self.semanas_desde_refit = 0
+
+    def actualizar(self, tabla, n_dias):
+        """
+        Deja el modelo entrenado con los primeros n_dias días de la tabla.
+        Devuelve False si todavía no se puede entrenar (una sola clase).
+        """
+        toca_refit = (
+            self.booster is None
+            or (self.refit_cada > 0 and self.semanas_desde_refit >= self.refit_cada)
+        )
+        if toca_refit:
+            X, y = tabla.hasta(n_dias)
+            if y.nunique() < 2:
+                return False
+            X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, shuffle=True,
+                                                      random_state=self.random_state)
+            self.referencia = self._dataset(X_train, y_train)
+            self.booster = self._entrenar(self.referencia, self.n_estimators, None)
+            self.semanas_desde_refit = 0
+        elif n_dias > self.n_dias_entrenados:
+            X, y = tabla.rango(self.n_dias_entrenados, n_dias)
+            nuevos = self._dataset(X, y, referencia=self.referencia)
+            self.booster = self._entrenar(nuevos, self.arboles_por_semana, self.booster)
+
+        self.n_dias_entrenados = n_dias
+        self.semanas_desde_refit += 1
+        return True
+
+    def predict_proba(self, X):
+        if self.libreria == "xgb":
+            import xgboost as xgb
+            p = self.booster.predict(xgb.DMatrix(X))
+        else:
+            p = self.booster.predict(X)
+        return np.column_stack([1 - p, p])
+
+    # ⚙️ Detalles de cada librería
+
+    def _dataset(self, X, y, referencia=None):
+        if self.libreria == "xgb":
+            import xgboost as xgb
+            return xgb.QuantileDMatrix(X, label=y, ref=referencia)
+        import lightgbm as lgb
+        return lgb.Dataset(X, label=y, reference=referencia, free_raw_data=False)
+
+    def _entrenar(self, dataset, n_arboles, booster_previo):
+        if self.libreria == "xgb":
+            import xgboost as xgb
+            params = {
+                "objective": "binary:logistic",
+                "eval_metric": "logloss",
+                "tree_method": "hist",
+                "learning_rate": self.learning_rate,
+                "seed": self.random_state,
+            }
+            return xgb.train(params, dataset, num_boost_round=n_arboles, xgb_model=booster_previo)
+
+        import lightgbm as lgb
+        params = {
+            "objective": "binary",
+            "learning_rate": self.learning_rate,
+            "seed": self.random_state,
+            "verbose": -1,
+        }
+        return lgb.train(params, dataset, num_boost_round=n_arboles, init_model=booster_previo,
+                         keep_training_booster=True)
@@ -0,0 +1,138 @@
+# 📦 Importaciones
+import hashlib
+import json
+import os
+import pickle
+
+import numpy as np
+
+from datos_tombola import CARPETA_CACHE
+
+# 📁 Carpeta de la caché de modelos ajustados (una subcarpeta por tipo de modelo)
+CARPETA_MODELOS = os.path.join(CARPETA_CACHE, "modelos")
+
+# 📏 Tamaño máximo por defecto; al pasarlo se borran los menos usados
+LIMITE_MB = 512
+
+# 🔖 Versión de las claves (cambiarla invalida todo lo guardado)
+VERSION_CLAVES = 1
+
+
+def agregar_argumento_cache(parser):
+    parser.add_argument("--cache-mb", type=float, default=LIMITE_MB,
+                        help="Tamaño máximo de la caché de ajustes semanales en data/cache/modelos "
+                             "(0 = no usarla).")
+
+
+def huellas_por_dias(incidencia):
+    """
+    Huella acumulada de los sorteos hasta el cierre de cada semana, indexada
+    por la cantidad de días de sorteo (n_dias) a esa altura. Dos corridas con
+    la misma huella para un n_dias tienen exactamente los mismos datos hasta ahí.
+    """
+    _, _, cortes = incidencia.semanas()
+    fechas = incidencia.fechas.astype(np.int64)
+    huellas = {0: ""}
+    anterior, acumulada = 0, b""
+    for corte in cortes:
+        if corte == anterior:
+            continue  # semana sin sorteos: mismos datos que la anterior
+        h = hashlib.blake2b(acumulada, digest_size=16)
+        h.update(fechas[anterior:corte].tobytes())
+        h.update(np.ascontiguousarray(incidencia.conteos[anterior:corte]).tobytes())
+        acumulada = h.digest()
+        huellas[int(corte)] = acumulada.hex()
+        anterior = corte
+    return huellas
+
+
+def _serializable(valor):
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    if isinstance(valor, np.generic):
+        return valor.item()
+    raise TypeError(f"No se puede usar en una clave: {type(valor).__name__}")
+
+
+class CacheModelos:
+    """
+    Caché en disco de ajustes semanales, direccionada por contenido: la clave
+    es el hash de (tipo de modelo, hiperparámetros, huella de los datos hasta
+    el fin de la semana, extras como el número o los parámetros iniciales).
+    Si nada de eso cambió, el ajuste guardado es el mismo que se obtendría
+    reentrenando.
+
+    Cada entrada es un pickle con lo que el script necesita para no volver a
+    ajustar (puntajes por número, parámetros). Las lecturas actualizan la
+    fecha de modificación y recortar() borra las entradas menos usadas hasta
+    quedar bajo limite_mb. Los procesos trabajadores leen y escriben; el
+    recorte lo hace el proceso principal al terminar.
+    """
+
+    def __init__(self, tipo, hiperparametros, incidencia, limite_mb=LIMITE_MB, carpeta=CARPETA_MODELOS):
+        self.activa = limite_mb > 0
+        self.tipo = tipo
+        self.limite_bytes = int(limite_mb * 1024 * 1024)
+        self.carpeta = carpeta
+        self.carpeta_tipo = os.path.join(carpeta, tipo)
+        self.hiperparametros = hiperparametros
+        self.huellas = huellas_por_dias(incidencia) if self.activa else {}
+
+    def clave(self, n_dias, **extra):
+        """Clave del ajuste con los primeros n_dias días de sorteo (n_dias = cierre de una semana)."""
+        if not self.activa:
+            return None
+        contenido = {"version": VERSION_CLAVES, "tipo": self.tipo, "hiperparametros": self.hiperparametros,
+                     "datos": self.huellas[n_dias], "extra": extra}
+        texto = json.dumps(contenido, sort_keys=True, default=_serializable)
+        return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+    def _ruta(self, clave):
+        return os.path.join(self.carpeta_tipo, clave + ".pkl")
+
+    def leer(self, clave):
+        """El contenido guardado (dict) o None si no está."""
+        if not self.activa:
+            return None
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, "rb") as f:
+                contenido = pickle.load(f)
+            os.utime(ruta)  # recién usada
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        return contenido
+
+    def guardar(self, clave, **contenido):
+        if not self.activa:
+            return
+        os.makedirs(self.carpeta_tipo, exist_ok=True)
+        ruta = self._ruta(clave)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, "wb") as f:
+            pickle.dump(contenido, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, ruta)
+
+    def recortar(self):
+        """Borra las entradas menos usadas (de todos los tipos) hasta quedar bajo el límite. Devuelve cuántas."""
+        if not self.activa or not os.path.isdir(self.carpeta):
+            return 0
+        entradas = []
+        for tipo in os.scandir(self.carpeta):
+            if tipo.is_dir():
+                for entrada in os.scandir(tipo.path):
+                    if entrada.name.endswith(".pkl"):
+                        info = entrada.stat()
+                        entradas.append((info.st_mtime_ns, info.st_size, entrada.path))
+        total = sum(tam for _, tam, _ in entradas)
+        borradas = 0
+        for _, tam, ruta in sorted(entradas):
+            if total <= self.limite_bytes:
+                break
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+            total -= tam
+            borradas += 1
+        return borradas
@@ -0,0 +1,76 @@
+# 📦 Importaciones
+import numpy as np
+
+from incidencia_tombola import N_NUMEROS
+
+# ⚙️ Familias: alfa de la binomial negativa como el valor por defecto de statsmodels
+FAMILIAS = ("poisson", "binomial_negativa")
+ALFA_NB = 1.0
+
+
+def diseno():
+    """Matriz de diseño (700, 3): constante, Numero y dia_semana de cada celda (número, día)."""
+    numero, dia = np.meshgrid(np.arange(N_NUMEROS), np.arange(7), indexing="ij")
+    return np.column_stack([np.ones(numero.size), numero.ravel(), dia.ravel()])
+
+
+def conteos_por_dia(conteos, dia_semana):
+    """Apariciones de cada número (100 filas) en cada día de la semana (7 columnas) en un bloque de días."""
+    por_dia = np.zeros((len(dia_semana), 7))
+    por_dia[np.arange(len(dia_semana)), dia_semana] = 1.0
+    return np.asarray(conteos, dtype=np.float64).T @ por_dia
+
+
+class GLMConteo:
+    """
+    Regresión de conteo con enlace log (Poisson o binomial negativa con alfa
+    fijo) sobre la tabla de 100 x 7 conteos por número y día de la semana,
+    la misma que arman los scripts de conteo con statsmodels.
+
+    Se ajusta por IRLS; cada ajuste arranca de los coeficientes del anterior
+    (warm start), así que en el walk-forward semanal alcanzan pocas
+    iteraciones por semana. Los conteos son el estadístico suficiente: se
+    actualizan sumando los días nuevos.
+    """
+
+    def __init__(self, familia="poisson", alfa=ALFA_NB, tolerancia=1e-10, max_iter=100):
+        if familia not in FAMILIAS:
+            raise ValueError(f"Familia desconocida: {familia}")
+        self.familia = familia
+        self.alfa = alfa
+        self.tolerancia = tolerancia
+        self.max_iter = max_iter
+        self.X = diseno()
+        self.coeficientes = None
+        self.iteraciones = 0
+
+    def ajustar(self, conteos):
+        """Ajusta con la tabla de conteos (100, 7). Devuelve False si no hay ningún conteo."""
+        y = np.asarray(conteos, dtype=np.float64).ravel()
+        if y.sum() == 0:
+            return False
+        if self.coeficientes is None:
+            # Arranque de statsmodels: media entre cada conteo y el promedio
+            eta = np.log((y + y.mean()) / 2)
+            beta = np.linalg.lstsq(self.X, eta, rcond=None)[0]
+        else:
+            beta = self.coeficientes
+
+        for self.iteraciones in range(1, self.max_iter + 1):
+            eta = self.X @ beta
+            mu = np.exp(eta)
+            # Pesos de IRLS con enlace log: mu² / var(mu)
+            peso = mu if self.familia == "poisson" else mu / (1 + self.alfa * mu)
+            z = eta + (y - mu) / mu
+            XtW = self.X.T * peso
+            nuevo = np.linalg.solve(XtW @ self.X, XtW @ z)
+            cambio = np.max(np.abs(nuevo - beta))
+            beta = nuevo
+            if cambio <= self.tolerancia * (1 + np.max(np.abs(beta))):
+                break
+        self.coeficientes = beta
+        return True
+
+    def esperados(self):
+        """Conteo esperado de cada número (100 filas) en cada día de la semana (7 columnas)."""
+        return np.exp(self.X @ self.coeficientes).reshape(N_NUMEROS, 7)
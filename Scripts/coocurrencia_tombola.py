@@ -0,0 +1,186 @@
+# 📦 Importaciones
+import argparse
+import sys
+
+import numpy as np
+
+from datos_tombola import RUTA_EXCEL
+from bits_tombola import contar_bits
+from incidencia_tombola import N_NUMEROS, cargar_incidencia
+
+# ⚙️ Candidatos de triples que se cuentan por bloque (acota la memoria del AND)
+BLOQUE_TRIPLES = 4096
+
+
+class IndiceCoocurrencia:
+    """
+    Índice de números que salieron el mismo día.
+
+    - bits: (100, palabras) uint64; el bit d del número n indica si n salió
+      el día d (días de sorteo en orden cronológico, 64 por palabra).
+    - pares: (100, 100) int64; [i, j] = días en que salieron i y j juntos
+      (la diagonal es la cantidad de días en que salió cada número).
+
+    Ambos se actualizan sumando días con agregar(), sin recorrer la historia.
+    Las consultas sobre un rango de días (por ejemplo las últimas N semanas)
+    se responden con AND y conteo de bits sobre las palabras del rango.
+    """
+
+    def __init__(self):
+        self.fechas = np.array([], dtype="datetime64[D]")
+        self.bits = np.zeros((N_NUMEROS, 0), dtype=np.uint64)
+        self.pares = np.zeros((N_NUMEROS, N_NUMEROS), dtype=np.int64)
+
+    @classmethod
+    def desde_incidencia(cls, incidencia):
+        indice = cls()
+        indice.agregar(incidencia.fechas, incidencia.conteos)
+        return indice
+
+    @property
+    def n_dias(self):
+        return len(self.fechas)
+
+    def agregar(self, fechas, conteos):
+        """Suma días nuevos (posteriores a los ya indexados): fechas (m,) y conteos o presencia (m, 100)."""
+        fechas = np.asarray(fechas, dtype="datetime64[D]")
+        if not len(fechas):
+            return
+        if self.n_dias and fechas[0] <= self.fechas[-1]:
+            raise ValueError(f"Los días nuevos deben ser posteriores a {self.fechas[-1]}.")
+        presencia = np.asarray(conteos) > 0
+
+        # Palabras nuevas con lugar para los días que llegan (capacidad duplicada)
+        desde = self.n_dias
+        palabras = (desde + len(fechas) + 63) // 64
+        if palabras > self.bits.shape[1]:
+            capacidad = max(palabras, 2 * self.bits.shape[1])
+            self.bits = np.concatenate(
+                [self.bits, np.zeros((N_NUMEROS, capacidad - self.bits.shape[1]), dtype=np.uint64)], axis=1)
+        dias, numeros = np.nonzero(presencia)
+        dias = dias + desde
+        np.bitwise_or.at(self.bits, (numeros, dias >> 6), np.left_shift(np.uint64(1), (dias & 63).astype(np.uint64)))
+
+        uno = presencia.astype(np.int64)
+        self.pares += uno.T @ uno
+        self.fechas = np.concatenate([self.fechas, fechas])
+
+    # 📅 Rangos de días
+
+    def rango_semanas(self, n_semanas):
+        """(desde, hasta) de los días de las últimas n_semanas semanas (lunes a domingo) del índice."""
+        if not self.n_dias:
+            return 0, 0
+        # El 1970-01-01 fue jueves (3)
+        ultimo = self.fechas[-1]
+        lunes = ultimo - np.timedelta64(int((ultimo.astype(np.int64) + 3) % 7), "D")
+        inicio = lunes - np.timedelta64(7 * (n_semanas - 1), "D")
+        return int(np.searchsorted(self.fechas, inicio, side="left")), self.n_dias
+
+    def _palabras(self, desde, hasta):
+        """Palabras (100, w) que cubren los días [desde, hasta), con los bits de afuera en 0."""
+        hasta = self.n_dias if hasta is None else min(hasta, self.n_dias)
+        if hasta <= desde:
+            return np.zeros((N_NUMEROS, 0), dtype=np.uint64)
+        primera, ultima = desde >> 6, (hasta + 63) >> 6
+        mascara = np.full(ultima - primera, np.iinfo(np.uint64).max, dtype=np.uint64)
+        mascara[0] &= np.uint64(np.iinfo(np.uint64).max) << np.uint64(desde & 63)
+        if hasta & 63:
+            mascara[-1] &= np.uint64(np.iinfo(np.uint64).max) >> np.uint64(64 - (hasta & 63))
+        return self.bits[:, primera:ultima] & mascara
+
+    # 🔍 Consultas
+
+    def pares_rango(self, desde=0, hasta=None):
+        """Matriz de pares (100, 100) de los días [desde, hasta); sin rango, la acumulada."""
+        if desde == 0 and (hasta is None or hasta >= self.n_dias):
+            return self.pares
+        palabras = self._palabras(desde, hasta)
+        return np.stack([contar_bits(palabras & palabras[i]) for i in range(N_NUMEROS)])
+
+    def socios(self, numero, k=10, desde=0, hasta=None):
+        """
+        Los k números que más días salieron junto con numero en [desde, hasta),
+        como lista de (número, días), de mayor a menor (empates por número).
+        """
+        if desde == 0 and (hasta is None or hasta >= self.n_dias):
+            juntos = self.pares[numero].copy()
+        else:
+            palabras = self._palabras(desde, hasta)
+            juntos = contar_bits(palabras & palabras[numero])
+        juntos[numero] = 0
+        orden = np.argsort(-juntos, kind="stable")[:k]
+        return [(int(n), int(juntos[n])) for n in orden if juntos[n] > 0]
+
+    def pares_frecuentes(self, soporte=1, desde=0, hasta=None):
+        """Pares (i < j) que salieron juntos al menos soporte días: lista de (i, j, días), de mayor a menor."""
+        pares = self.pares_rango(desde, hasta)
+        i, j = np.nonzero(np.triu(pares >= soporte, k=1))
+        orden = np.lexsort((j, i, -pares[i, j]))
+        return [(int(a), int(b), int(pares[a, b])) for a, b in zip(i[orden], j[orden])]
+
+    def triples_frecuentes(self, soporte=1, desde=0, hasta=None):
+        """
+        Triples (i < j < l) que salieron juntos al menos soporte días: lista de
+        (i, j, l, días), de mayor a menor. Como en Apriori, solo se cuentan los
+        triples cuyos tres pares ya superan el soporte, y cada conteo es el
+        AND de los tres bitsets.
+        """
+        palabras = self._palabras(desde, hasta if hasta is not None else self.n_dias)
+        frecuentes = np.triu(self.pares_rango(desde, hasta) >= soporte, k=1)
+        i, j = np.nonzero(frecuentes)
+        # Candidatos: l > j con (i, l) y (j, l) también frecuentes
+        candidatos = frecuentes[i] & frecuentes[j]
+        par, l = np.nonzero(candidatos)
+        i, j = i[par], j[par]
+
+        dias = np.empty(len(l), dtype=np.int64)
+        for inicio in range(0, len(l), BLOQUE_TRIPLES):
+            tramo = slice(inicio, inicio + BLOQUE_TRIPLES)
+            dias[tramo] = contar_bits(palabras[i[tramo]] & palabras[j[tramo]] & palabras[l[tramo]])
+        validos = dias >= soporte
+        i, j, l, dias = i[validos], j[validos], l[validos], dias[validos]
+        orden = np.lexsort((l, j, i, -dias))
+        return [(int(a), int(b), int(c), int(d)) for a, b, c, d in zip(i[orden], j[orden], l[orden], dias[orden])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Números que salen juntos el mismo día.")
+    parser.add_argument("--numero", type=int, default=None, help="Mostrar los socios más frecuentes de este número.")
+    parser.add_argument("--semanas", type=int, default=None,
+                        help="Contar solo las últimas N semanas (por defecto, toda la historia).")
+    parser.add_argument("--soporte", type=int, default=2, help="Días mínimos juntos para pares y triples.")
+    parser.add_argument("--triples", action="store_true", help="Buscar también triples frecuentes.")
+    parser.add_argument("-k", type=int, default=10, help="Cantidad de resultados a mostrar.")
+    args = parser.parse_args()
+    if args.numero is not None and not 0 <= args.numero < N_NUMEROS:
+        parser.error(f"--numero debe estar entre 0 y {N_NUMEROS - 1}.")
+
+    try:
+        incidencia = cargar_incidencia(RUTA_EXCEL)
+    except FileNotFoundError:
+        print("❌ Error: No se encontró el archivo 'tombola.xlsx' en la carpeta 'data'.")
+        sys.exit(1)
+
+    indice = IndiceCoocurrencia.desde_incidencia(incidencia)
+    desde, hasta = indice.rango_semanas(args.semanas) if args.semanas else (0, indice.n_dias)
+    periodo = f"últimas {args.semanas} semanas" if args.semanas else "toda la historia"
+    print(f"📅 {hasta - desde} días de sorteo ({periodo})")
+
+    if args.numero is not None:
+        print(f"🤝 Socios de {args.numero:02d}:")
+        for numero, dias in indice.socios(args.numero, args.k, desde, hasta):
+            print(f"  {numero:02d}: {dias} días")
+        return
+
+    print(f"🔗 Pares más frecuentes (soporte >= {args.soporte}):")
+    for i, j, dias in indice.pares_frecuentes(args.soporte, desde, hasta)[:args.k]:
+        print(f"  {i:02d}-{j:02d}: {dias} días")
+    if args.triples:
+        print(f"🔗 Triples más frecuentes (soporte >= {args.soporte}):")
+        for i, j, l, dias in indice.triples_frecuentes(args.soporte, desde, hasta)[:args.k]:
+            print(f"  {i:02d}-{j:02d}-{l:02d}: {dias} días")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# 📦 Importaciones
+import hashlib
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# 📁 Rutas por defecto
+RUTA_EXCEL = os.path.join("data", "tombola.xlsx")
+CARPETA_CACHE = os.path.join("data", "cache")
+
+# 🔖 Versión del formato de la caché (cambiarla invalida las cachés anteriores)
+VERSION_CACHE = 5
+
+# 🧠 Datos ya cargados en este proceso, para que varios modelos ejecutados en
+# el mismo intérprete no vuelvan a leer la caché del disco
+_memoria = {}
+
+
+def en_memoria(clave, construir):
+    """Devuelve el objeto recordado para clave o lo construye con construir() y lo recuerda."""
+    if clave not in _memoria:
+        _memoria[clave] = construir()
+    return _memoria[clave]
+
+
+def hash_archivo(ruta, tam_bloque=1 << 20):
+    """Devuelve el SHA-256 (hex) del contenido del archivo."""
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(tam_bloque), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def clave_archivo(ruta):
+    """Hash del contenido del archivo, recordado mientras no cambien su tamaño ni su fecha de modificación."""
+    info = os.stat(ruta)
+    firma = ("hash", os.path.abspath(ruta), info.st_size, info.st_mtime_ns)
+    return en_memoria(firma, lambda: hash_archivo(ruta))
+
+
+def leer_archivo(ruta_excel):
+    """
+    Lee y valida el archivo de sorteos (todas las hojas del Excel, o un CSV)
+    en bloques, con la ingesta de ingesta_tombola. Avisa si se descartaron
+    filas o días; el detalle se ve con `python Scripts/ingesta_tombola.py`.
+    """
+    from ingesta_tombola import leer_sorteos
+
+    df, reporte = leer_sorteos(ruta_excel)
+    if reporte.rechazadas or reporte.descartados or reporte.hojas_omitidas:
+        print(f"⚠️ {os.path.basename(ruta_excel)}: {reporte.resumen()}")
+    return df
+
+
+def _prefijo_cache(ruta_excel):
+    """
+    Nombre del Excel más un hash corto de su ruta absoluta, para que dos
+    archivos con el mismo nombre en carpetas distintas no compartan cachés.
+    """
+    base = os.path.splitext(os.path.basename(ruta_excel))[0]
+    lugar = hashlib.sha256(os.path.abspath(ruta_excel).encode("utf-8")).hexdigest()[:8]
+    return f"{base}_{lugar}"
+
+
+def ruta_cache(ruta_excel, clave, sufijo="", extension="npz", carpeta=CARPETA_CACHE):
+    """Ruta del archivo de caché para el Excel dado y su hash de contenido."""
+    return os.path.join(carpeta, f"{_prefijo_cache(ruta_excel)}_v{VERSION_CACHE}_{clave[:16]}{sufijo}.{extension}")
+
+
+def _guardar_cache(df, ruta):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "wb") as f:
+        np.savez(
+            f,
+            fecha=df["Fecha"].values.astype("datetime64[D]").astype(np.int32),
+            posicion=df["Posicion"].values.astype(np.int16),
+            numero=df["Numero"].values.astype(np.int16),
+        )
+    os.replace(temporal, ruta)
+
+
+def _leer_cache(ruta):
+    with np.load(ruta) as datos:
+        fecha = datos["fecha"].astype("datetime64[D]").astype("datetime64[ns]")
+        return pd.DataFrame({
+            "Fecha": fecha,
+            "Posicion": datos["posicion"].astype(np.int64),
+            "Numero": datos["numero"].astype(np.int64),
+        })
+
+
+def _borrar_caches_viejas(ruta_excel, clave, carpeta=CARPETA_CACHE):
+    """Elimina las cachés de este Excel que correspondan a otro contenido o versión."""
+    prefijo = _prefijo_cache(ruta_excel)
+    vigente = f"{prefijo}_v{VERSION_CACHE}_{clave[:16]}"
+    # Solo los nombres con el formato exacto de este archivo (no los de
+    # otro Excel cuyo nombre empiece igual, como tombola_vespertina)
+    propia = re.compile(rf"^{re.escape(prefijo)}_v\d+_[0-9a-f]{{16}}")
+    try:
+        nombres = os.listdir(carpeta)
+    except OSError:
+        return
+    for nombre in nombres:
+        if propia.match(nombre) and not nombre.startswith(vigente):
+            try:
+                os.remove(os.path.join(carpeta, nombre))
+            except OSError:
+                pass
+
+
+def cargar_sorteos(ruta_excel=RUTA_EXCEL, usar_cache=True):
+    """
+    Carga los sorteos limpios (Fecha, Posicion, Numero).
+
+    La primera vez lee y valida el Excel (ver leer_archivo) y lo convierte
+    a una caché columnar tipada en data/cache/, identificada por el hash
+    del contenido del archivo; las siguientes lecturas usan esa caché hasta
+    que el Excel cambie.
+    Lanza FileNotFoundError si el Excel no existe.
+    """
+    if not os.path.exists(ruta_excel):
+        raise FileNotFoundError(ruta_excel)
+    if not usar_cache:
+        return leer_archivo(ruta_excel)
+    return cargar_sorteos_con_clave(ruta_excel, clave_archivo(ruta_excel))
+
+
+def cargar_sorteos_con_clave(ruta_excel, clave):
+    """Igual que cargar_sorteos, pero con el hash del Excel ya calculado."""
+    df = en_memoria(("sorteos", os.path.abspath(ruta_excel), clave),
+                    lambda: _cargar_sorteos_con_clave(ruta_excel, clave))
+    return df.copy()  # cada modelo puede agregar columnas sin afectar a los demás
+
+
+def _cargar_sorteos_con_clave(ruta_excel, clave):
+    ruta = ruta_cache(ruta_excel, clave)
+    if os.path.exists(ruta):
+        try:
+            return _leer_cache(ruta)
+        except (OSError, ValueError, KeyError):
+            pass  # caché corrupta: se reconstruye
+
+    df = leer_archivo(ruta_excel)
+    _guardar_cache(df, ruta)
+    _borrar_caches_viejas(ruta_excel, clave)
+    return df
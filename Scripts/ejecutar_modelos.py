@@ -0,0 +1,114 @@
+# 📦 Importaciones
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from datos_tombola import RUTA_EXCEL, cargar_sorteos
+from incidencia_tombola import cargar_incidencia
+from traza_tombola import VARIABLE_ENTORNO
+
+# 📁 Carpetas
+CARPETA_SCRIPTS = os.path.dirname(os.path.abspath(__file__))
+CARPETA_PROYECTO = os.path.dirname(CARPETA_SCRIPTS)
+
+# 🗂️ Modelos disponibles: nombre -> (script, costoso)
+MODELOS = {
+    "frecuencia": ("analisis_frecuencia_tombola.py", False),
+    "rf": ("modelo_rf_binario_tombola.py", True),
+    "xgb": ("modelo_xgb_binario_tombola.py", True),
+    "lgb": ("modelo_lgb_binario_tombola.py", True),
+    "prophet": ("modelo_prophet_tombola.py", True),
+    "arima": ("modelo_arima_binario_tombola.py", True),
+    "lstm": ("modelo_lstm_tombola.py", True),
+    "markov": ("modelo_markov_tombola.py", False),
+    "poisson": ("modelo_poisson_conteo_tombola.py", False),
+    "binomial_negativa": ("modelo_binomial_negativa_conteo_tombola.py", False),
+    "kmeans": ("modelo_kmeans_tombola.py", False),
+    "dbscan": ("modelo_dbscan_tombola.py", False),
+}
+
+
+def ejecutar_modelo(nombre, entorno=None):
+    """
+    Ejecuta el script del modelo en su propio proceso (con sus opciones por
+    defecto, desde la raíz del proyecto), así ningún script comparte con
+    otro sys.argv, la carpeta actual, los filtros de warnings o el logging.
+    Devuelve (nombre, segundos, error o None).
+    """
+    script = os.path.join(CARPETA_SCRIPTS, MODELOS[nombre][0])
+    print(f"▶️ {nombre}: iniciando")
+    inicio = time.perf_counter()
+    error = None
+    try:
+        codigo = subprocess.run([sys.executable, script], cwd=CARPETA_PROYECTO, env=entorno).returncode
+        if codigo != 0:
+            error = f"terminó con código {codigo}"
+    except OSError as e:
+        error = f"{type(e).__name__}: {e}"
+    segundos = time.perf_counter() - inicio
+    print(f"⏹️ {nombre}: {'error' if error else 'listo'} en {segundos:.1f} s")
+    return nombre, segundos, error
+
+
+def ejecutar(nombres, concurrencia=2, entorno=None):
+    """
+    Corre los modelos, cada uno en su proceso, con a lo sumo concurrencia a
+    la vez. Los costosos se lanzan primero y los baratos ocupan los lugares
+    que quedan libres. Devuelve los resultados en el orden pedido.
+    """
+    orden = sorted(nombres, key=lambda nombre: not MODELOS[nombre][1])
+    with ThreadPoolExecutor(max_workers=max(1, concurrencia)) as pool:
+        resultados = {nombre: r for nombre, *r in pool.map(lambda nombre: ejecutar_modelo(nombre, entorno), orden)}
+    return [(nombre, *resultados[nombre]) for nombre in nombres]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Ejecuta varios modelos a la vez, preparando los datos una sola vez."
+    )
+    parser.add_argument("modelos", nargs="*", metavar="modelo",
+                        help=f"Modelos a ejecutar (por defecto, todos): {', '.join(MODELOS)}.")
+    parser.add_argument("--concurrencia", type=int, default=2,
+                        help="Cantidad máxima de modelos corriendo a la vez.")
+    parser.add_argument("--traza", action="store_true",
+                        help="Guardar la traza por etapas de cada modelo (.traza.jsonl junto a su salida).")
+    args = parser.parse_args()
+    desconocidos = [nombre for nombre in args.modelos if nombre not in MODELOS]
+    if desconocidos:
+        parser.error(f"modelos desconocidos: {', '.join(desconocidos)}")
+    nombres = list(dict.fromkeys(args.modelos)) or list(MODELOS)
+
+    # Los scripts usan rutas relativas a la raíz del proyecto (también la caché)
+    os.chdir(CARPETA_PROYECTO)
+    entorno = dict(os.environ)
+    if args.traza:
+        entorno[VARIABLE_ENTORNO] = "1"
+
+    # 📥 Preparar los datos una vez: cada script los toma de la caché en disco
+    inicio = time.perf_counter()
+    try:
+        cargar_sorteos(RUTA_EXCEL)
+        cargar_incidencia(RUTA_EXCEL)
+    except FileNotFoundError:
+        print("❌ Error: No se encontró el archivo 'tombola.xlsx' en la carpeta 'data'.")
+        sys.exit(1)
+    print(f"✅ Datos preparados en {time.perf_counter() - inicio:.2f} s")
+
+    resultados = ejecutar(nombres, args.concurrencia, entorno)
+
+    # ⏱️ Resumen
+    print("\n⏱️ Tiempo por modelo:")
+    for nombre, segundos, error in resultados:
+        estado = f"❌ {error}" if error else "✅"
+        print(f"  {nombre:<18} {segundos:8.1f} s  {estado}")
+    print(f"  {'total (reloj)':<18} {time.perf_counter() - inicio:8.1f} s")
+
+    if any(error for _, _, error in resultados):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
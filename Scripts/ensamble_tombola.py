@@ -0,0 +1,213 @@
+# 📦 Importaciones
+import argparse
+import glob
+import os
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from datos_tombola import RUTA_EXCEL
+from incidencia_tombola import N_NUMEROS, cargar_incidencia
+from frecuencia_tombola import top_k
+from evaluacion_tombola import PATRON_PREDICCIONES, leer_predicciones, nombre_modelo, presencia_semanal, puntuar, resumir
+from puntajes_tombola import (DTYPE_PUNTAJES, guardar_puntajes, leer_puntajes, primeros, rangos_de_orden,
+                              ruta_puntajes, tabla_puntajes)
+
+# ⚙️ Métodos de fusión y valores por defecto
+METODOS = ("borda", "rrf", "puntaje")
+PROFUNDIDAD = 10     # puestos de cada modelo que votan
+CONSTANTE_RRF = 60   # c en 1 / (c + puesto)
+SUAVIZADO = 10.0     # aciertos "ficticios" que acercan el peso a 1 con poca historia
+
+# Las salidas de este script no se vuelven a usar como entrada
+PREFIJO_SALIDA = "ensamble_"
+
+
+def cargar_modelos(rutas, semanas, k=PROFUNDIDAD):
+    """
+    Puestos y puntajes guardados de cada modelo, alineados a las semanas del
+    calendario. Devuelve (nombres, rangos, puntajes): rangos uint8 (modelos,
+    semanas, 100) con 0 = sin puesto, y puntajes float32 con NaN donde el
+    modelo no guardó puntajes. Si existe <modelo>.puntajes.npy y corresponde
+    al CSV (ver puntajes_vigentes) se usa esa tabla (los 100 puestos y
+    puntajes); si no, los primeros k números del CSV.
+    """
+    nombres = [nombre_modelo(ruta) for ruta in rutas]
+    rangos = np.zeros((len(rutas), len(semanas), N_NUMEROS), dtype=np.uint8)
+    puntajes = np.full((len(rutas), len(semanas), N_NUMEROS), np.nan, dtype=np.float32)
+
+    def indices(inicios):
+        indice = (np.asarray(inicios, dtype="datetime64[D]") - semanas[0]).astype(np.int64) // 7
+        return indice, (indice >= 0) & (indice < len(semanas))
+
+    for m, ruta in enumerate(rutas):
+        _, inicios, predicciones = leer_predicciones([ruta], k)
+        if os.path.exists(ruta_puntajes(ruta)):
+            try:
+                tabla = leer_puntajes(ruta_puntajes(ruta))
+            except (OSError, ValueError):
+                tabla = None
+            if tabla is not None and puntajes_vigentes(tabla, inicios, predicciones):
+                indice, validas = indices(tabla["semana_inicio"][::N_NUMEROS])
+                rangos[m, indice[validas]] = tabla["rango"].reshape(-1, N_NUMEROS)[validas]
+                puntajes[m, indice[validas]] = tabla["puntaje"].reshape(-1, N_NUMEROS)[validas]
+                continue
+            print(f"⚠️ {nombres[m]}: la tabla de puntajes no corresponde al CSV (se usa el CSV). "
+                  f"Volver a correr el modelo con --puntajes para actualizarla.")
+        indice, validas = indices(inicios)
+        # De atrás hacia adelante, para que un número repetido quede con su mejor puesto
+        for posicion in range(k - 1, -1, -1):
+            numeros = predicciones[:, posicion]
+            filas = validas & (numeros >= 0)
+            rangos[m, indice[filas], numeros[filas]] = posicion + 1
+    return nombres, rangos, puntajes
+
+
+def puntajes_vigentes(tabla, inicios, predicciones):
+    """
+    True si la tabla de puntajes acompaña al CSV del modelo: las mismas
+    semanas, en el mismo orden, y los mismos primeros k números en cada una
+    (k = columnas de predicciones). Una tabla que quedó de una corrida
+    anterior con --puntajes no pasa este control.
+    """
+    if tabla.dtype != DTYPE_PUNTAJES or len(tabla) != len(inicios) * N_NUMEROS:
+        return False
+    if not np.array_equal(np.asarray(tabla["semana_inicio"])[::N_NUMEROS], inicios):
+        return False
+    return np.array_equal(primeros(tabla, predicciones.shape[1]), predicciones)
+
+
+def pesos_por_aciertos(rangos, presencia, k=PROFUNDIDAD, suavizado=SUAVIZADO):
+    """
+    Peso de cada modelo en cada semana (modelos, semanas): su lift acumulado
+    (aciertos / aciertos esperados al azar) con las predicciones cuyo
+    resultado ya se conocía al cierre de esa semana, suavizado hacia 1.
+    La predicción de la semana w apunta a la w + 1, así que el peso de la
+    semana w solo usa las predicciones de semanas anteriores a w.
+    """
+    elegidos = (rangos > 0) & (rangos <= k)
+    objetivo = presencia[1:]
+    aciertos = (elegidos[:, :-1] & objetivo).sum(axis=2)
+    esperado = elegidos[:, :-1].sum(axis=2) * objetivo.sum(axis=1) / N_NUMEROS
+    ceros = np.zeros((len(rangos), 1))
+    aciertos = np.concatenate([ceros, np.cumsum(aciertos, axis=1)], axis=1)
+    esperado = np.concatenate([ceros, np.cumsum(esperado, axis=1)], axis=1)
+    return (aciertos + suavizado) / (esperado + suavizado)
+
+
+def aportes(metodo, rangos, puntajes, profundidad=PROFUNDIDAD, c=CONSTANTE_RRF):
+    """
+    Voto de cada modelo a cada número (modelos, semanas, 100):
+
+    - borda: profundidad + 1 - puesto para los primeros `profundidad` puestos.
+    - rrf: 1 / (c + puesto) (reciprocal rank fusion), con los mismos puestos.
+    - puntaje: el puntaje del modelo llevado a [0, 1] por semana (mínimo a 0,
+      máximo a 1); los modelos sin puntajes guardados votan con borda / profundidad.
+    """
+    puestos = rangos.astype(np.float32)
+    en_lista = (rangos > 0) & (rangos <= profundidad)
+    borda = np.where(en_lista, profundidad + 1 - puestos, 0).astype(np.float32)
+    if metodo == "borda":
+        return borda
+    if metodo == "rrf":
+        return np.where(en_lista, 1 / (c + puestos), 0).astype(np.float32)
+
+    # Semanas sin puntajes (todo NaN) o con todos iguales no votan
+    with warnings.catch_warnings(), np.errstate(invalid="ignore", divide="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+        minimo = np.nanmin(puntajes, axis=2, keepdims=True)
+        rango = np.nanmax(puntajes, axis=2, keepdims=True) - minimo
+        normalizados = np.where(rango > 0, (puntajes - minimo) / rango, 0.0)
+    normalizados = np.nan_to_num(normalizados, nan=0.0)
+    con_puntajes = ~np.isnan(puntajes).all(axis=(1, 2))
+    return np.where(con_puntajes[:, None, None], normalizados, borda / profundidad).astype(np.float32)
+
+
+def fusionar(metodo, rangos, puntajes, pesos, profundidad=PROFUNDIDAD, c=CONSTANTE_RRF):
+    """Puntaje combinado (semanas, 100): suma de los aportes de cada modelo por su peso."""
+    return np.einsum("ms,msn->sn", pesos.astype(np.float32), aportes(metodo, rangos, puntajes, profundidad, c))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Combina las predicciones semanales ya guardadas de varios modelos (sin volver a correrlos)."
+    )
+    parser.add_argument("archivos", nargs="*",
+                        help=f"CSV de predicciones o patrones (por defecto {PATRON_PREDICCIONES}, "
+                             f"sin los '{PREFIJO_SALIDA}*').")
+    parser.add_argument("--metodo", choices=METODOS, default="rrf", help="Regla de fusión.")
+    parser.add_argument("--pesos", choices=("uniformes", "aciertos"), default="aciertos",
+                        help="Pesos iguales o aprendidos del lift acumulado de cada modelo.")
+    parser.add_argument("--profundidad", type=int, default=PROFUNDIDAD,
+                        help="Puestos de cada modelo que cuentan en borda y en el cálculo de aciertos.")
+    parser.add_argument("--c", type=float, default=CONSTANTE_RRF, help="Constante de rrf.")
+    parser.add_argument("--suavizado", type=float, default=SUAVIZADO,
+                        help="Suavizado de los pesos por aciertos (más grande = más cerca de iguales).")
+    parser.add_argument("--salida", default=None,
+                        help=f"CSV del ensamble (por defecto data/{PREFIJO_SALIDA}<metodo>_tombola.csv).")
+    parser.add_argument("--puntajes", action="store_true",
+                        help="Guardar además la tabla de puntajes combinados (<salida>.puntajes.npy).")
+    parser.add_argument("--evaluar", action="store_true",
+                        help="Mostrar el lift del ensamble junto al de los modelos de entrada.")
+    args = parser.parse_args()
+
+    ruta_csv = args.salida or os.path.join("data", f"{PREFIJO_SALIDA}{args.metodo}_tombola.csv")
+    patrones = args.archivos or [PATRON_PREDICCIONES]
+    rutas = sorted({ruta for patron in patrones for ruta in glob.glob(patron)})
+    if not args.archivos:
+        rutas = [ruta for ruta in rutas if not os.path.basename(ruta).startswith(PREFIJO_SALIDA)]
+    rutas = [ruta for ruta in rutas if os.path.abspath(ruta) != os.path.abspath(ruta_csv)]
+
+    try:
+        incidencia = cargar_incidencia(RUTA_EXCEL)
+    except FileNotFoundError:
+        print("❌ Error: No se encontró el archivo 'tombola.xlsx' en la carpeta 'data'.")
+        sys.exit(1)
+
+    semanas, presencia = presencia_semanal(incidencia)
+    nombres, rangos, puntajes = cargar_modelos(rutas, semanas, args.profundidad)
+    # Se descartan los CSV sin predicciones semanales
+    activos = rangos.any(axis=(1, 2))
+    if not activos.any():
+        print("❌ Error: No se encontraron predicciones semanales para combinar.")
+        sys.exit(1)
+    nombres = [nombre for nombre, activo in zip(nombres, activos) if activo]
+    rutas = [ruta for ruta, activo in zip(rutas, activos) if activo]
+    rangos, puntajes = rangos[activos], puntajes[activos]
+
+    if args.pesos == "aciertos":
+        pesos = pesos_por_aciertos(rangos, presencia, args.profundidad, args.suavizado)
+    else:
+        pesos = np.ones(rangos.shape[:2])
+    combinados = fusionar(args.metodo, rangos, puntajes, pesos, args.profundidad, args.c)
+
+    # 🔮 Top 10 de cada semana (empates por número ascendente, sin los que nadie votó)
+    predicciones = top_k(combinados, k=10)
+    df = pd.DataFrame({
+        "semana_inicio": semanas.astype(str),
+        "semana_fin": (semanas + np.timedelta64(6, "D")).astype(str),
+        "prediccion": [str(prediccion) if prediccion else "" for prediccion in predicciones],
+    })
+    df.to_csv(ruta_csv, index=False)
+    if args.puntajes:
+        orden = np.argsort(-combinados, axis=1, kind="stable")
+        rangos_ensamble = rangos_de_orden(orden, np.take_along_axis(combinados, orden, axis=1) > 0)
+        guardar_puntajes(ruta_puntajes(ruta_csv), tabla_puntajes(semanas, combinados, rangos_ensamble))
+
+    print(f"🧩 {len(nombres)} modelos: {', '.join(nombres)}")
+    if args.pesos == "aciertos":
+        ultimos = pd.Series(pesos[:, -1], index=nombres).sort_values(ascending=False)
+        print("⚖️ Pesos de la última semana:")
+        print(ultimos.to_string(float_format=lambda x: f"{x:.3f}"))
+    print(f"✅ Ensamble '{args.metodo}' de {len(df)} semanas guardado en '{ruta_csv}'")
+
+    if args.evaluar:
+        modelos, inicios, matriz = leer_predicciones(rutas + [ruta_csv])
+        print(resumir(puntuar(modelos, inicios, matriz, incidencia)).to_string(
+            index=False, float_format=lambda x: f"{x:.3f}"))
+
+
+if __name__ == "__main__":
+    main()
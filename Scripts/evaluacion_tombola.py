@@ -0,0 +1,185 @@
+# 📦 Importaciones
+import argparse
+import glob
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from datos_tombola import RUTA_EXCEL
+from incidencia_tombola import N_NUMEROS, cargar_incidencia
+from frecuencia_tombola import conteos_acumulados
+from bits_tombola import aciertos as contar_aciertos, cantidad, empaquetar, mascaras_de_listas
+
+# 📁 Rutas por defecto
+PATRON_PREDICCIONES = os.path.join("data", "*_tombola.csv")
+RUTA_SEMANAS = os.path.join("data", "evaluacion_tombola_semanas.csv")
+RUTA_RESUMEN = os.path.join("data", "evaluacion_tombola_resumen.csv")
+
+# 📏 Filas por bloque al cruzar predicciones con sorteos (acota la memoria)
+FILAS_POR_BLOQUE = 1 << 16
+
+
+def nombre_modelo(ruta):
+    """data/modelo_rf_binario_tombola.csv -> modelo_rf_binario."""
+    base = os.path.splitext(os.path.basename(ruta))[0]
+    return base[:-len("_tombola")] if base.endswith("_tombola") else base
+
+
+def parsear_predicciones(textos, k=10):
+    """
+    Convierte textos "[n1, n2, ...]" en una matriz int16 (filas, k) con los
+    primeros k números de cada fila; las posiciones vacías o inválidas son -1.
+    """
+    limpios = (pd.Series(textos, dtype=object).fillna("").astype(str)
+               .str.strip("[] ").str.replace(" ", "", regex=False))
+    if not (limpios.str.len() > 0).any():
+        return np.full((len(limpios), k), -1, dtype=np.int16)
+
+    # Las listas sin corchetes son líneas CSV: el lector de pandas (en C) las
+    # separa todas de una vez; una línea vacía es una predicción vacía
+    ancho = int(limpios.str.count(",").max()) + 1
+    tabla = pd.read_csv(io.StringIO("\n".join(limpios) + "\n"), header=None, names=range(ancho),
+                        usecols=range(min(k, ancho)), skip_blank_lines=False)
+    numeros = np.array(tabla.apply(pd.to_numeric, errors="coerce").reindex(columns=range(k)), dtype=np.float64)
+    numeros[~((numeros >= 0) & (numeros < N_NUMEROS))] = -1
+    return numeros.astype(np.int16)
+
+
+def leer_predicciones(rutas, k=10):
+    """
+    Lee los CSV semanales (semana_inicio, semana_fin, prediccion) y los une.
+    Devuelve (modelos, inicios, predicciones): nombre de modelo por fila,
+    datetime64[D] del inicio de semana y la matriz de parsear_predicciones.
+    Los CSV sin esas columnas se omiten.
+    """
+    tablas = []
+    for ruta in rutas:
+        df = pd.read_csv(ruta, dtype={"prediccion": object})
+        if not {"semana_inicio", "prediccion"} <= set(df.columns):
+            continue
+        df = df[["semana_inicio", "prediccion"]].assign(modelo=nombre_modelo(ruta))
+        tablas.append(df)
+    if not tablas:
+        return np.array([], dtype=object), np.array([], dtype="datetime64[D]"), np.zeros((0, k), dtype=np.int16)
+    todas = pd.concat(tablas, ignore_index=True)
+    inicios = pd.to_datetime(todas["semana_inicio"]).values.astype("datetime64[D]")
+    return todas["modelo"].to_numpy(dtype=object), inicios, parsear_predicciones(todas["prediccion"], k)
+
+
+def presencia_semanal(incidencia):
+    """
+    (inicios, presencia): lunes de cada semana con sorteos y matriz booleana
+    (n_semanas, 100) con los números que salieron en esa semana.
+    """
+    inicios, _, cortes = incidencia.semanas()
+    acumulados = conteos_acumulados(incidencia)
+    desde = np.concatenate(([0], cortes[:-1])).astype(np.intp)
+    return inicios, (acumulados[cortes] - acumulados[desde]) > 0
+
+
+def puntuar(modelos, inicios, predicciones, incidencia):
+    """
+    Cruza cada predicción semanal con los números que salieron la semana
+    siguiente (la que predice). Devuelve un DataFrame por modelo y semana con:
+
+    - predichos: números distintos de la predicción.
+    - sorteados: números distintos que salieron en la semana objetivo.
+    - aciertos: predichos que salieron (hits@k).
+    - precision: aciertos / predichos.
+    - esperado: aciertos esperados eligiendo al azar la misma cantidad de
+      números (predichos * sorteados / 100); lift = aciertos / esperado.
+
+    Las semanas objetivo sin sorteos (p. ej. la que aún no ocurrió) se omiten.
+    """
+    semanas, presencia = presencia_semanal(incidencia)
+    objetivo = inicios + np.timedelta64(7, "D")
+    if len(semanas):
+        indice = (objetivo - semanas[0]).astype(np.int64) // 7
+    else:
+        indice = np.full(len(objetivo), -1, dtype=np.int64)
+    validas = (indice >= 0) & (indice < len(semanas))
+    validas[validas] &= presencia[indice[validas]].any(axis=1)
+
+    filas = np.flatnonzero(validas)
+    # Conjuntos de 128 bits: cada predicción y cada semana objetivo en dos
+    # uint64 (los números repetidos cuentan una sola vez)
+    objetivos = empaquetar(presencia)[indice[filas]]
+    predichos = np.zeros(len(filas), dtype=np.int64)
+    aciertos = np.zeros(len(filas), dtype=np.int64)
+    for desde in range(0, len(filas), FILAS_POR_BLOQUE):
+        tramo = slice(desde, desde + FILAS_POR_BLOQUE)
+        elegidos = mascaras_de_listas(predicciones[filas[tramo]])
+        predichos[tramo] = cantidad(elegidos)
+        aciertos[tramo] = contar_aciertos(elegidos, objetivos[tramo])
+
+    sorteados = cantidad(objetivos)
+    esperado = predichos * sorteados / N_NUMEROS
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(predichos > 0, aciertos / predichos, np.nan)
+        lift = np.where(esperado > 0, aciertos / esperado, np.nan)
+    return pd.DataFrame({
+        "modelo": modelos[filas],
+        "semana_inicio": inicios[filas].astype(str),
+        "semana_objetivo": objetivo[filas].astype(str),
+        "predichos": predichos,
+        "sorteados": sorteados,
+        "aciertos": aciertos,
+        "precision": precision,
+        "esperado": esperado,
+        "lift": lift,
+    })
+
+
+def resumir(puntajes):
+    """Totales por modelo: precisión y lift sobre todas sus semanas, ordenado por lift."""
+    resumen = puntajes.groupby("modelo", sort=False).agg(
+        semanas=("aciertos", "size"),
+        aciertos=("aciertos", "sum"),
+        aciertos_por_semana=("aciertos", "mean"),
+        predichos=("predichos", "sum"),
+        esperado=("esperado", "sum"),
+    )
+    resumen["precision"] = resumen["aciertos"] / resumen["predichos"].where(resumen["predichos"] > 0)
+    resumen["lift"] = resumen["aciertos"] / resumen["esperado"].where(resumen["esperado"] > 0)
+    return resumen.drop(columns="predichos").sort_values("lift", ascending=False).reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Aciertos, precisión y lift de las predicciones semanales de todos los modelos."
+    )
+    parser.add_argument("archivos", nargs="*",
+                        help=f"CSV de predicciones o patrones (por defecto {PATRON_PREDICCIONES}).")
+    parser.add_argument("--k", type=int, default=10, help="Números de cada predicción a evaluar.")
+    parser.add_argument("--salida", default=RUTA_SEMANAS, help="CSV con el detalle por modelo y semana.")
+    parser.add_argument("--resumen", default=RUTA_RESUMEN, help="CSV con el resumen por modelo.")
+    args = parser.parse_args()
+
+    rutas = sorted({ruta for patron in (args.archivos or [PATRON_PREDICCIONES]) for ruta in glob.glob(patron)})
+    try:
+        incidencia = cargar_incidencia(RUTA_EXCEL)
+    except FileNotFoundError:
+        print("❌ Error: No se encontró el archivo 'tombola.xlsx' en la carpeta 'data'.")
+        sys.exit(1)
+
+    modelos, inicios, predicciones = leer_predicciones(rutas, args.k)
+    if len(modelos) == 0:
+        print("❌ Error: No se encontraron archivos de predicciones semanales.")
+        sys.exit(1)
+
+    puntajes = puntuar(modelos, inicios, predicciones, incidencia)
+    resumen = resumir(puntajes)
+    puntajes.to_csv(args.salida, index=False)
+    resumen.to_csv(args.resumen, index=False)
+
+    print(f"📊 {len(puntajes)} semanas evaluadas de {resumen.shape[0]} modelos "
+          f"({len(modelos) - len(puntajes)} sin sorteos en la semana objetivo)")
+    print(resumen.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+    print(f"\n✅ Detalle guardado en '{args.salida}' y resumen en '{args.resumen}'")
+
+
+if __name__ == "__main__":
+    main()
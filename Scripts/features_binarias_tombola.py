@@ -0,0 +1,78 @@
+# 📦 Importaciones
+import numpy as np
+import pandas as pd
+
+from incidencia_tombola import N_NUMEROS
+
+# 🧱 Columnas de entrada de los clasificadores binarios
+COLUMNAS = ["numero", "dia_semana", "frecuencia_pasada"]
+
+
+class TablaBinaria:
+    """
+    Dataset binario completo (una fila por día de sorteo y número, en orden
+    cronológico) construido una sola vez. Las filas de los primeros n días
+    son las primeras n * 100, así que el set de entrenamiento de cada semana
+    es una rebanada de estos arreglos y no una reconstrucción.
+
+    - numero (int8), dia_semana (int8), frecuencia_pasada (int32): features.
+    - salio (int8): 1 si el número salió ese día.
+    - acumulados (int32, (n_dias + 1, 100)): frecuencia de cada número antes
+      de cada día; la fila n es la frecuencia tras los primeros n días.
+    """
+
+    def __init__(self, numero, dia_semana, frecuencia_pasada, salio, acumulados):
+        self.numero = numero
+        self.dia_semana = dia_semana
+        self.frecuencia_pasada = frecuencia_pasada
+        self.salio = salio
+        self.acumulados = acumulados
+
+    def hasta(self, n_dias):
+        """(X, y) con las filas de los primeros n_dias días de sorteo."""
+        return self.rango(0, n_dias)
+
+    def rango(self, desde_dia, hasta_dia):
+        """(X, y) con las filas de los días de sorteo desde_dia <= i < hasta_dia."""
+        inicio, fin = desde_dia * N_NUMEROS, hasta_dia * N_NUMEROS
+        X = pd.DataFrame({
+            "numero": self.numero[inicio:fin],
+            "dia_semana": self.dia_semana[inicio:fin],
+            "frecuencia_pasada": self.frecuencia_pasada[inicio:fin]
+        }, columns=COLUMNAS)
+        return X, pd.Series(self.salio[inicio:fin], name="salio")
+
+    def frecuencia_actual(self, n_dias):
+        """Frecuencia de cada número (0..99) tras los primeros n_dias días."""
+        return self.acumulados[n_dias]
+
+    def X_prediccion(self, n_dias, dia_semana):
+        """Features de los 100 números para predecir un día con los datos de los primeros n_dias días."""
+        return pd.DataFrame({
+            "numero": np.arange(N_NUMEROS, dtype=np.int8),
+            "dia_semana": np.full(N_NUMEROS, dia_semana, dtype=np.int8),
+            "frecuencia_pasada": self.acumulados[n_dias]
+        }, columns=COLUMNAS)
+
+
+def construir_tabla_binaria(incidencia, contar_repeticiones=True):
+    """
+    Construye la TablaBinaria a partir de la matriz de incidencia con
+    broadcasting y sumas acumuladas.
+
+    Con contar_repeticiones=True la frecuencia pasada suma todas las
+    apariciones (un número repetido en el día cuenta dos veces); con False
+    cuenta los días en que el número salió.
+    """
+    n_dias = incidencia.n_dias
+    presencia = incidencia.presencia
+    eventos = incidencia.conteos if contar_repeticiones else presencia
+
+    acumulados = np.zeros((n_dias + 1, N_NUMEROS), dtype=np.int32)
+    np.cumsum(eventos, axis=0, dtype=np.int32, out=acumulados[1:])
+
+    numero = np.broadcast_to(np.arange(N_NUMEROS, dtype=np.int8), (n_dias, N_NUMEROS)).ravel()
+    dia_semana = np.broadcast_to(incidencia.dia_semana.astype(np.int8)[:, None], (n_dias, N_NUMEROS)).ravel()
+    frecuencia_pasada = acumulados[:-1].ravel()
+    salio = presencia.astype(np.int8).ravel()
+    return TablaBinaria(numero, dia_semana, frecuencia_pasada, salio, acumulados)
@@ -0,0 +1,79 @@
+# 📦 Importaciones
+import numpy as np
+
+from incidencia_tombola import N_NUMEROS
+
+
+def conteos_acumulados(incidencia):
+    """
+    Sumas prefijas por número: fila i = apariciones de cada número en los
+    primeros i días de sorteo. Forma (n_dias + 1, 100), la fila 0 es cero.
+    """
+    acumulados = np.zeros((incidencia.n_dias + 1, N_NUMEROS), dtype=np.int64)
+    np.cumsum(incidencia.conteos, axis=0, dtype=np.int64, out=acumulados[1:])
+    return acumulados
+
+
+def conteos_semanales(incidencia, ventana_dias=None, vida_media_dias=None, acumulados=None):
+    """
+    Frecuencia de cada número al cierre de cada semana del backtest, para
+    todas las semanas a la vez. Devuelve (inicios, fines, conteos), con
+    conteos de forma (n_semanas, 100).
+
+    - Sin opciones: conteo acumulado desde el primer sorteo.
+    - ventana_dias: solo los sorteos de los últimos ventana_dias días
+      (incluido el fin de semana).
+    - vida_media_dias: conteo con decaimiento exponencial; un sorteo de hace
+      vida_media_dias días pesa la mitad que uno del día de cierre.
+    """
+    if ventana_dias is not None and vida_media_dias is not None:
+        raise ValueError("Usar ventana_dias o vida_media_dias, no ambos.")
+
+    inicios, fines, cortes = incidencia.semanas()
+    if vida_media_dias is not None:
+        return inicios, fines, _conteos_con_decaimiento(incidencia, fines, cortes, vida_media_dias)
+
+    if acumulados is None:
+        acumulados = conteos_acumulados(incidencia)
+    conteos = acumulados[cortes]
+    if ventana_dias is not None:
+        desde = np.searchsorted(incidencia.fechas, fines - np.timedelta64(ventana_dias - 1, "D"), side="left")
+        conteos = conteos - acumulados[desde]
+    return inicios, fines, conteos
+
+
+def _conteos_con_decaimiento(incidencia, fines, cortes, vida_media_dias):
+    """Suma de conteos ponderados por 0.5 ** (días hasta el cierre / vida media)."""
+    factor = 0.5 ** (1.0 / vida_media_dias)
+    n_semanas = len(fines)
+    if n_semanas == 0:
+        return np.zeros((0, N_NUMEROS))
+
+    # Cada día se pondera respecto del cierre de su propia semana (a lo sumo 6
+    # días de distancia, sin riesgo de desbordes) y se suma por semana.
+    semana_dia = np.searchsorted(cortes, np.arange(incidencia.n_dias), side="right")
+    dias_al_cierre = (fines[semana_dia] - incidencia.fechas).astype(np.int64)
+    ponderados = incidencia.conteos * (factor ** dias_al_cierre)[:, None]
+    acumulados = np.zeros((incidencia.n_dias + 1, N_NUMEROS))
+    np.cumsum(ponderados, axis=0, out=acumulados[1:])
+    por_semana = acumulados[cortes] - acumulados[np.concatenate(([0], cortes[:-1]))]
+
+    # Recurrencia semana a semana: lo anterior decae 7 días y se suma lo nuevo
+    factor_semana = factor ** 7
+    for i in range(1, n_semanas):
+        por_semana[i] += factor_semana * por_semana[i - 1]
+    return por_semana
+
+
+def top_k(puntajes, k=10, solo_positivos=True):
+    """
+    Los k números de mayor puntaje por fila, en una sola pasada vectorizada.
+    Los empates se resuelven por número ascendente. Con solo_positivos se
+    omiten los números con puntaje 0 (nunca salieron en el período).
+    Devuelve una lista de listas de enteros, una por fila.
+    """
+    orden = np.argsort(-puntajes, axis=1, kind="stable")[:, :k]
+    if not solo_positivos:
+        return orden.tolist()
+    validos = np.take_along_axis(puntajes, orden, axis=1) > 0
+    return [fila[mascara].tolist() for fila, mascara in zip(orden, validos)]
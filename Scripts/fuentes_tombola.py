@@ -0,0 +1,230 @@
+# 📦 Importaciones
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from ejecutar_modelos import CARPETA_PROYECTO, CARPETA_SCRIPTS, MODELOS
+from backtest_paralelo_tombola import VARIABLES_HILOS
+from benchmark_tombola import enlazar_archivo, medir_proceso, separar_variante
+from traza_tombola import VARIABLE_ENTORNO
+
+# 📁 Rutas
+CARPETA_FUENTES = os.path.join(CARPETA_PROYECTO, "data", "fuentes")
+NOMBRE_RESUMEN = "resumen_fuentes.csv"
+
+# 🗂️ Archivos de sorteos que se toman de una carpeta
+EXTENSIONES = (".xlsx", ".xlsm", ".csv")
+
+# Ejecuta un script como __main__ con un tope de memoria virtual (RLIMIT_AS,
+# en bytes; 0 = sin tope) aplicado dentro del proceso hijo antes de importar
+# nada. argv: -c <tope> <script> [opciones...]
+LANZADOR = (
+    "import runpy, sys\n"
+    "tope = int(sys.argv[1])\n"
+    "if tope:\n"
+    "    import resource\n"
+    "    resource.setrlimit(resource.RLIMIT_AS, (tope, tope))\n"
+    "sys.argv = sys.argv[2:]\n"
+    "runpy.run_path(sys.argv[0], run_name='__main__')\n"
+)
+
+COLUMNAS = ["fuente", "modelo", "segundos", "memoria_mb", "estado"]
+
+
+def nombre_fuente(ruta):
+    """data/historicos/Tómbola Noche.xlsx -> Tómbola_Noche (apto para nombre de carpeta)."""
+    return re.sub(r"[^\w.-]+", "_", os.path.splitext(os.path.basename(ruta))[0]).strip("._") or "fuente"
+
+
+def descubrir_fuentes(entradas=(), manifiesto=None):
+    """
+    {fuente: ruta absoluta} a partir de archivos, carpetas (todos sus
+    archivos de sorteos) y un manifiesto CSV con columnas fuente y archivo
+    (rutas relativas a la carpeta del manifiesto). Lanza ValueError si dos
+    fuentes quedan con el mismo nombre o falta un archivo.
+    """
+    pares = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            for nombre in sorted(os.listdir(entrada)):
+                ruta = os.path.join(entrada, nombre)
+                if (os.path.isfile(ruta) and os.path.splitext(nombre)[1].lower() in EXTENSIONES
+                        and not nombre.startswith(("~$", "."))):
+                    pares.append((nombre_fuente(ruta), ruta))
+        else:
+            pares.append((nombre_fuente(entrada), entrada))
+    if manifiesto is not None:
+        base = os.path.dirname(os.path.abspath(manifiesto))
+        tabla = pd.read_csv(manifiesto, dtype=str).fillna("")
+        if not {"fuente", "archivo"} <= set(tabla.columns):
+            raise ValueError(f"El manifiesto '{manifiesto}' debe tener las columnas fuente y archivo.")
+        for fuente, archivo in zip(tabla["fuente"], tabla["archivo"]):
+            ruta = archivo if os.path.isabs(archivo) else os.path.join(base, archivo)
+            pares.append((nombre_fuente(fuente or archivo), ruta))
+
+    fuentes = {}
+    for fuente, ruta in pares:
+        if not os.path.isfile(ruta):
+            raise ValueError(f"No se encontró el archivo de la fuente '{fuente}': {ruta}")
+        if fuente in fuentes:
+            raise ValueError(f"Fuente repetida: '{fuente}' ({fuentes[fuente]} y {ruta})")
+        fuentes[fuente] = os.path.abspath(ruta)
+    return fuentes
+
+
+def entorno_trabajo(hilos, traza=False):
+    """Entorno de cada proceso: scripts importables y hilos de BLAS/OpenMP limitados."""
+    entorno = dict(os.environ)
+    entorno["PYTHONPATH"] = os.pathsep.join(filter(None, [CARPETA_SCRIPTS, entorno.get("PYTHONPATH")]))
+    entorno.update({variable: str(hilos) for variable in VARIABLES_HILOS})
+    if traza:
+        entorno[VARIABLE_ENTORNO] = "1"
+    return entorno
+
+
+def preparar_fuente(carpeta, ruta, entorno, limite_segundos=None):
+    """
+    Arma la carpeta de proyecto de la fuente (data/tombola.xlsx enlazado al
+    archivo original, o copiado si no se pueden crear enlaces) y construye su caché de datos una sola vez, antes de
+    que corran sus modelos. Devuelve (segundos, memoria_mb, estado).
+    """
+    os.makedirs(os.path.join(carpeta, "data"), exist_ok=True)
+    os.makedirs(os.path.join(carpeta, "registros"), exist_ok=True)
+    enlazar_archivo(ruta, os.path.join(carpeta, "data", "tombola.xlsx"))
+    comando = [sys.executable, "-c", "from incidencia_tombola import cargar_incidencia; cargar_incidencia()"]
+    with open(os.path.join(carpeta, "registros", "datos.log"), "wb") as registro:
+        return medir_proceso(comando, carpeta, limite_segundos, registro, entorno)
+
+
+def ejecutar_trabajo(carpeta, variante, entorno, limite_segundos=None, limite_memoria_mb=None):
+    """Corre un modelo sobre la fuente de carpeta, con sus límites. Devuelve (segundos, memoria_mb, estado)."""
+    nombre, opciones = separar_variante(variante)
+    tope = int(limite_memoria_mb * 1024 * 1024) if limite_memoria_mb else 0
+    comando = [sys.executable, "-c", LANZADOR, str(tope), os.path.join(CARPETA_SCRIPTS, MODELOS[nombre][0])] + opciones
+    archivo = re.sub(r"[^\w.-]+", "_", variante) + ".log"
+    with open(os.path.join(carpeta, "registros", archivo), "wb") as registro:
+        return medir_proceso(comando, carpeta, limite_segundos, registro, entorno)
+
+
+def ejecutar_fuentes(fuentes, variantes, carpeta_salida=CARPETA_FUENTES, trabajadores=None, hilos=1,
+                     limite_segundos=None, limite_memoria_mb=None, traza=False):
+    """
+    Corre cada (fuente, modelo) en un pool de `trabajadores` procesos a la
+    vez. Primero se preparan los datos de todas las fuentes en paralelo;
+    después se lanzan los modelos, los costosos primero. Las salidas de cada
+    fuente quedan en <carpeta_salida>/<fuente>/data/. Devuelve las filas del
+    resumen (fuente, modelo, segundos, memoria_mb, estado).
+    """
+    trabajadores = trabajadores or max(1, (os.cpu_count() or 1) // hilos)
+    entorno = entorno_trabajo(hilos, traza)
+    carpetas = {fuente: os.path.join(carpeta_salida, fuente) for fuente in fuentes}
+
+    def reportar(fuente, modelo, medicion):
+        segundos, memoria_mb, estado = medicion
+        print(f"  {fuente:<24} {modelo:<30} {segundos:8.1f} s {memoria_mb:7.0f} MB  {estado}")
+        return {"fuente": fuente, "modelo": modelo, "segundos": round(segundos, 3),
+                "memoria_mb": round(memoria_mb, 1), "estado": estado}
+
+    filas = []
+    with ThreadPoolExecutor(max_workers=trabajadores) as pool:
+        # 📥 Datos de cada fuente (validación e índices en caché)
+        preparadas = {fuente: pool.submit(preparar_fuente, carpetas[fuente], ruta, entorno, limite_segundos)
+                      for fuente, ruta in fuentes.items()}
+        listas = []
+        for fuente, futuro in preparadas.items():
+            try:
+                medicion = futuro.result()
+            except OSError as e:
+                medicion = (0.0, 0.0, f"error {e}")
+            filas.append(reportar(fuente, "datos", medicion))
+            if medicion[2] == "ok":
+                listas.append(fuente)
+
+        # 🔁 Modelos: los costosos primero, intercalando fuentes
+        trabajos = sorted(((fuente, variante) for variante in variantes for fuente in listas),
+                          key=lambda trabajo: not MODELOS[separar_variante(trabajo[1])[0]][1])
+        futuros = [(fuente, variante, pool.submit(ejecutar_trabajo, carpetas[fuente], variante, entorno,
+                                                  limite_segundos, limite_memoria_mb))
+                   for fuente, variante in trabajos]
+        for fuente, variante, futuro in futuros:
+            try:
+                medicion = futuro.result()
+            except OSError as e:
+                medicion = (0.0, 0.0, f"error {e}")
+            filas.append(reportar(fuente, variante, medicion))
+    return filas
+
+
+def guardar_resumen(filas, ruta):
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.DictWriter(f, fieldnames=COLUMNAS)
+        escritor.writeheader()
+        escritor.writerows(filas)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Corre los modelos sobre varias fuentes de sorteos en paralelo, con salidas separadas por fuente."
+    )
+    parser.add_argument("entradas", nargs="*",
+                        help="Archivos de sorteos (Excel o CSV) o carpetas con ellos; cada archivo es una fuente.")
+    parser.add_argument("--manifiesto", default=None,
+                        help="CSV con columnas fuente y archivo (rutas relativas al manifiesto).")
+    parser.add_argument("--modelos", nargs="+", metavar="modelo[:opciones]", default=None,
+                        help=f"Modelos a correr en cada fuente, con opciones opcionales (p. ej. 'arima:--warm-start'). "
+                             f"Por defecto, todos: {', '.join(MODELOS)}.")
+    parser.add_argument("--salida", default=CARPETA_FUENTES,
+                        help="Carpeta con una subcarpeta de proyecto por fuente.")
+    parser.add_argument("--trabajadores", type=int, default=None,
+                        help="Trabajos simultáneos (por defecto, núcleos / hilos por trabajo).")
+    parser.add_argument("--hilos", type=int, default=1,
+                        help="Hilos de BLAS/OpenMP por trabajo.")
+    parser.add_argument("--limite-segundos", type=float, default=None,
+                        help="Cortar cada trabajo que supere este tiempo.")
+    parser.add_argument("--limite-memoria-mb", type=float, default=None,
+                        help="Tope de memoria virtual de cada trabajo (RLIMIT_AS; solo en sistemas POSIX).")
+    parser.add_argument("--traza", action="store_true",
+                        help="Guardar la traza por etapas de cada modelo (.traza.jsonl junto a su salida).")
+    args = parser.parse_args()
+
+    if not args.entradas and args.manifiesto is None:
+        parser.error("indicar archivos, carpetas o --manifiesto")
+    if args.hilos < 1:
+        parser.error("--hilos debe ser al menos 1")
+    if args.limite_memoria_mb and sys.platform == "win32":
+        parser.error("--limite-memoria-mb no está disponible en Windows")
+    variantes = list(dict.fromkeys(args.modelos or MODELOS))
+    desconocidos = [v for v in variantes if separar_variante(v)[0] not in MODELOS]
+    if desconocidos:
+        parser.error(f"modelos desconocidos: {', '.join(desconocidos)}")
+    try:
+        fuentes = descubrir_fuentes(args.entradas, args.manifiesto)
+    except ValueError as e:
+        parser.error(str(e))
+    if not fuentes:
+        parser.error("no se encontraron archivos de sorteos")
+
+    salida = os.path.abspath(args.salida)
+    print(f"🗂️ {len(fuentes)} fuentes x {len(variantes)} modelos -> '{salida}'")
+    inicio = time.perf_counter()
+    filas = ejecutar_fuentes(fuentes, variantes, salida, args.trabajadores, args.hilos,
+                             args.limite_segundos, args.limite_memoria_mb, args.traza)
+    ruta_resumen = os.path.join(salida, NOMBRE_RESUMEN)
+    guardar_resumen(filas, ruta_resumen)
+
+    errores = [fila for fila in filas if fila["estado"] != "ok"]
+    print(f"\n⏱️ {len(filas)} trabajos en {time.perf_counter() - inicio:.1f} s "
+          f"({len(errores)} con error o límite); resumen en '{ruta_resumen}'")
+    if errores:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# 📦 Importaciones
+import os
+
+import numpy as np
+import pandas as pd
+
+from datos_tombola import RUTA_EXCEL, cargar_sorteos_con_clave, clave_archivo, en_memoria, ruta_cache
+
+# 🎯 Cantidad de números posibles (00 a 99)
+N_NUMEROS = 100
+
+
+class MatrizIncidencia:
+    """
+    Matriz densa día × número con la cantidad de veces que salió cada número
+    en cada día de sorteo.
+
+    - fechas: datetime64[D] de cada día con sorteo, en orden cronológico.
+    - conteos: uint8 de forma (n_dias, 100); puede ser un memmap de solo lectura.
+    - dia_semana: uint8 con el día de la semana de cada fecha (lunes = 0).
+    """
+
+    def __init__(self, fechas, conteos):
+        self.fechas = np.asarray(fechas, dtype="datetime64[D]")
+        self.conteos = conteos
+        # El 1970-01-01 fue jueves (3)
+        self.dia_semana = ((self.fechas.astype(np.int64) + 3) % 7).astype(np.uint8)
+
+    @property
+    def n_dias(self):
+        return len(self.fechas)
+
+    @property
+    def presencia(self):
+        """Matriz booleana (n_dias, 100): True si el número salió ese día."""
+        return self.conteos > 0
+
+    def fechas_pandas(self):
+        return pd.DatetimeIndex(self.fechas.astype("datetime64[ns]"))
+
+    def dias_hasta(self, fecha):
+        """Cantidad de días de sorteo con fecha <= fecha (límite para rebanar filas)."""
+        return int(np.searchsorted(self.fechas, np.datetime64(fecha, "D"), side="right"))
+
+    def semanas(self):
+        """
+        Semanas del backtest (lunes a domingo) desde la semana del primer
+        sorteo hasta la del último. Devuelve (inicios, fines, cortes), donde
+        cortes[i] es la cantidad de días de sorteo con fecha <= fines[i].
+        """
+        if self.n_dias == 0:
+            vacio = np.array([], dtype="datetime64[D]")
+            return vacio, vacio, np.array([], dtype=np.intp)
+        primera = self.fechas[0] - np.timedelta64(int(self.dia_semana[0]), "D")
+        inicios = np.arange(primera, self.fechas[-1] + np.timedelta64(1, "D"), np.timedelta64(7, "D"))
+        fines = inicios + np.timedelta64(6, "D")
+        cortes = np.searchsorted(self.fechas, fines, side="right")
+        return inicios, fines, cortes
+
+    def calendario_diario(self):
+        """
+        Presencia (0.0 / 1.0) sobre el calendario completo, del primer al último
+        día de sorteo, con los días sin sorteo en 0. Columnas 0..99.
+        """
+        diario = pd.DataFrame(
+            self.presencia.astype(float), index=self.fechas_pandas(), columns=range(N_NUMEROS)
+        )
+        calendario = pd.date_range(diario.index.min(), diario.index.max(), freq="D")
+        return diario.reindex(calendario, fill_value=0.0)
+
+    def guardar(self, ruta_conteos, ruta_fechas):
+        """Guarda la matriz como .npy (apto para memmap) junto a su índice de fechas."""
+        os.makedirs(os.path.dirname(ruta_conteos) or ".", exist_ok=True)
+        for ruta, arreglo in ((ruta_fechas, self.fechas.astype(np.int32)), (ruta_conteos, self.conteos)):
+            temporal = f"{ruta}.{os.getpid()}.tmp"
+            with open(temporal, "wb") as f:
+                np.save(f, np.ascontiguousarray(arreglo))
+            os.replace(temporal, ruta)
+
+    @classmethod
+    def cargar(cls, ruta_conteos, ruta_fechas, mmap=True):
+        """Abre una matriz guardada; con mmap=True los conteos no se copian a memoria."""
+        fechas = np.load(ruta_fechas).astype("datetime64[D]")
+        conteos = np.load(ruta_conteos, mmap_mode="r" if mmap else None)
+        if conteos.shape != (len(fechas), N_NUMEROS):
+            raise ValueError(f"Matriz de incidencia inconsistente: {conteos.shape}")
+        return cls(fechas, conteos)
+
+
+def construir_incidencia(df):
+    """Construye la matriz de incidencia a partir de un DataFrame limpio (Fecha, Numero)."""
+    validos = df["Numero"].between(0, N_NUMEROS - 1)
+    fechas_dia = df.loc[validos, "Fecha"].values.astype("datetime64[D]")
+    numeros = df.loc[validos, "Numero"].values.astype(np.intp)
+
+    fechas, fila = np.unique(fechas_dia, return_inverse=True)
+    conteos = np.zeros((len(fechas), N_NUMEROS), dtype=np.uint8)
+    np.add.at(conteos, (fila, numeros), 1)
+    return MatrizIncidencia(fechas, conteos)
+
+
+def cargar_incidencia(ruta_excel=RUTA_EXCEL, mmap=True):
+    """
+    Devuelve la matriz de incidencia del Excel, leyéndola (memory-mapped) de
+    data/cache/ si existe para el contenido actual del archivo, o
+    construyéndola y guardándola en caso contrario.
+    Lanza FileNotFoundError si el Excel no existe.
+    """
+    if not os.path.exists(ruta_excel):
+        raise FileNotFoundError(ruta_excel)
+
+    clave = clave_archivo(ruta_excel)
+    return en_memoria(("incidencia", os.path.abspath(ruta_excel), clave, mmap),
+                      lambda: _cargar_incidencia_con_clave(ruta_excel, clave, mmap))
+
+
+def _cargar_incidencia_con_clave(ruta_excel, clave, mmap):
+    ruta_conteos = ruta_cache(ruta_excel, clave, sufijo="_incidencia", extension="npy")
+    ruta_fechas = ruta_cache(ruta_excel, clave, sufijo="_fechas", extension="npy")
+    if os.path.exists(ruta_conteos) and os.path.exists(ruta_fechas):
+        try:
+            return MatrizIncidencia.cargar(ruta_conteos, ruta_fechas, mmap=mmap)
+        except (OSError, ValueError):
+            pass  # caché corrupta: se reconstruye
+
+    incidencia = construir_incidencia(cargar_sorteos_con_clave(ruta_excel, clave))
+    incidencia.guardar(ruta_conteos, ruta_fechas)
+    if mmap:
+        return MatrizIncidencia.cargar(ruta_conteos, ruta_fechas, mmap=True)
+    return incidencia
@@ -0,0 +1,401 @@
+# 📦 Importaciones
+import argparse
+import os
+import sys
+import unicodedata
+import zipfile
+from collections import Counter
+from datetime import datetime
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from incidencia_tombola import N_NUMEROS
+
+# ⚙️ Filas que se leen y validan por bloque (acota la memoria de la lectura)
+FILAS_POR_BLOQUE = 50_000
+NUMEROS_POR_DIA = 10
+# Detalle de rechazos que se guarda (los conteos por motivo son siempre completos)
+LIMITE_DETALLE = 10_000
+
+# 🧾 Motivos de rechazo o aviso
+# - Por fila (la fila se descarta): fecha_invalida, numero_invalido, numero_fuera_de_rango.
+# - Por día: dia_duplicado (una misma fecha y posición aparece más de una
+#   vez, en el mismo tramo de filas, en otro bloque u otra hoja, o una fecha
+#   sin Posicion tiene más de NUMEROS_POR_DIA filas; si se descarta, se
+#   quitan las filas repetidas y quedan las primeras),
+#   dia_incompleto (distinta cantidad de números que NUMEROS_POR_DIA) y
+#   numeros_repetidos (algún número salió más de una vez ese día). Se
+#   descartan los días con los motivos de `descartar`; los demás quedan como
+#   avisos.
+MOTIVOS_FILA = ("fecha_invalida", "numero_invalido", "numero_fuera_de_rango")
+MOTIVOS_DIA = ("dia_duplicado", "dia_incompleto", "numeros_repetidos")
+DESCARTAR = ("dia_duplicado",)
+
+EXTENSIONES_CSV = (".csv", ".txt")
+
+# 📅 Formatos aceptados para las fechas escritas como texto, en orden de
+# prueba: el día va primero (dd/mm/aaaa, como en las planillas de la
+# tómbola) salvo que la fecha empiece por el año (ISO). Otros formatos se
+# indican con formato_fecha / --formato-fecha
+FORMATOS_FECHA = (
+    "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y", "%d/%m/%y",
+    "%d/%m/%Y %H:%M", "%d/%m/%Y %H:%M:%S",
+    "%Y-%m-%d", "%Y/%m/%d",
+    "%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S",
+)
+
+
+def _normalizar(nombre):
+    """'Posición ' -> 'posicion'."""
+    texto = unicodedata.normalize("NFKD", str(nombre or "")).encode("ascii", "ignore").decode()
+    return texto.strip().lower()
+
+
+def _columnas(encabezado):
+    """Índices de Fecha, Posicion y Numero en el encabezado (Posicion puede faltar); None si no es una hoja de sorteos."""
+    nombres = [_normalizar(nombre) for nombre in encabezado]
+    if "fecha" not in nombres or "numero" not in nombres:
+        return None
+    return {columna: nombres.index(columna) if columna in nombres else None
+            for columna in ("fecha", "posicion", "numero")}
+
+
+def formato_fecha(texto):
+    """Primer formato de FORMATOS_FECHA que lee el texto completo, o None si ninguno."""
+    texto = texto.strip()
+    for formato in FORMATOS_FECHA:
+        try:
+            datetime.strptime(texto, formato)
+        except ValueError:
+            continue
+        return formato
+    return None
+
+
+def _fechas(valores, formato):
+    """
+    Fechas de un bloque como datetime64[D] (NaT si no son válidas). Las
+    celdas de fecha se toman como están, los números son fechas seriales de
+    Excel (celdas sin formato de fecha) y los textos se leen todos con el
+    mismo formato (sin formato, quedan NaT).
+    """
+    textos = valores.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+    seriales = valores.map(lambda v: isinstance(v, (int, float, np.number)) and not isinstance(v, bool))
+    seriales = seriales.to_numpy(dtype=bool)
+    fechas = pd.to_datetime(valores.where(~(textos | seriales)), errors="coerce")
+    if textos.any() and formato is not None:
+        fechas[textos] = pd.to_datetime(valores[textos].str.strip(), format=formato, errors="coerce")
+    if seriales.any():
+        fechas[seriales] = pd.to_datetime(pd.to_numeric(valores[seriales]), unit="D", origin="1899-12-30",
+                                          errors="coerce")
+    return fechas.to_numpy().astype("datetime64[D]")
+
+
+def bloques_excel(ruta, filas=FILAS_POR_BLOQUE):
+    """
+    Recorre todas las hojas del Excel en modo solo lectura (openpyxl, sin
+    cargar el libro entero). Devuelve (hoja, primera_fila, bloque) con
+    bloques de a lo sumo `filas` filas como DataFrame (fecha, posicion,
+    numero) sin convertir, o (hoja, None, None) para las hojas sin columnas
+    Fecha y Numero.
+    """
+    from openpyxl import load_workbook
+
+    libro = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        for hoja in libro.worksheets:
+            filas_hoja = hoja.iter_rows(values_only=True)
+            columnas = _columnas(next(filas_hoja, ()))
+            if columnas is None:
+                yield hoja.title, None, None
+                continue
+            primera = 2
+            while True:
+                bloque = list(islice(filas_hoja, filas))
+                if not bloque:
+                    break
+                valores = {
+                    columna: [fila[i] if i is not None and i < len(fila) else None for fila in bloque]
+                    for columna, i in columnas.items()
+                }
+                yield hoja.title, primera, pd.DataFrame(valores)
+                primera += len(bloque)
+    finally:
+        libro.close()
+
+
+def bloques_csv(ruta, filas=FILAS_POR_BLOQUE):
+    """Como bloques_excel, para un CSV exportado (una sola "hoja" con el nombre del archivo)."""
+    hoja = os.path.basename(ruta)
+    encabezado = pd.read_csv(ruta, nrows=0).columns
+    columnas = _columnas(encabezado)
+    if columnas is None:
+        yield hoja, None, None
+        return
+    primera = 2
+    for bloque in pd.read_csv(ruta, chunksize=filas, dtype=str, header=0, names=range(len(encabezado))):
+        yield hoja, primera, pd.DataFrame({
+            columna: bloque[i] if i is not None else None for columna, i in columnas.items()
+        })
+        primera += len(bloque)
+
+
+class Reporte:
+    """Resumen de una ingesta: filas leídas, días aceptados y rechazos o avisos por motivo."""
+
+    def __init__(self, ruta, descartar=DESCARTAR):
+        self.ruta = ruta
+        self.descartar = tuple(descartar)
+        self.hojas = []
+        self.hojas_omitidas = []
+        self.filas = 0
+        self.vacias = 0
+        self.aceptadas = 0
+        self.dias = 0
+        # Filas por motivo de fila; días por motivo de día
+        self.conteos = Counter()
+        self.detalle = []
+
+    def registrar(self, hoja, filas, motivo, valores):
+        """Anota el motivo para las filas dadas (números de fila del archivo) con su valor."""
+        self.conteos[motivo] += len(filas)
+        libres = LIMITE_DETALLE - len(self.detalle)
+        for fila, valor in islice(zip(filas, valores), max(libres, 0)):
+            self.detalle.append({"hoja": hoja, "fila": int(fila), "motivo": motivo, "valor": str(valor)})
+
+    @property
+    def rechazadas(self):
+        return sum(self.conteos[motivo] for motivo in MOTIVOS_FILA)
+
+    @property
+    def descartados(self):
+        """Días con motivos de `descartar` (días descartados, o con filas repetidas quitadas)."""
+        return sum(self.conteos[motivo] for motivo in self.descartar)
+
+    def rechazos(self):
+        """DataFrame (hoja, fila, motivo, valor) con el detalle (hasta LIMITE_DETALLE entradas)."""
+        detalle = pd.DataFrame(self.detalle, columns=["hoja", "fila", "motivo", "valor"])
+        orden_hoja = detalle["hoja"].map({hoja: i for i, hoja in enumerate(self.hojas)})
+        orden = np.lexsort((detalle["fila"].to_numpy(), orden_hoja.to_numpy()))
+        return detalle.iloc[orden].reset_index(drop=True)
+
+    def resumen(self):
+        partes = [f"{self.aceptadas} filas aceptadas de {self.filas} en {self.dias} días "
+                  f"({len(self.hojas)} hoja{'s' if len(self.hojas) != 1 else ''})"]
+        for motivo in MOTIVOS_FILA:
+            if self.conteos[motivo]:
+                partes.append(f"{motivo}: {self.conteos[motivo]} filas")
+        for motivo in MOTIVOS_DIA:
+            if self.conteos[motivo]:
+                if motivo not in self.descartar:
+                    accion = "avisos"
+                elif motivo == "dia_duplicado":
+                    accion = "filas repetidas descartadas"
+                else:
+                    accion = "descartados"
+                partes.append(f"{motivo}: {self.conteos[motivo]} días ({accion})")
+        if self.hojas_omitidas:
+            partes.append(f"hojas sin Fecha/Numero: {', '.join(self.hojas_omitidas)}")
+        return "; ".join(partes)
+
+
+class Ingesta:
+    """
+    Valida y acumula los bloques de filas de uno o más archivos.
+
+    Las filas se validan por bloque (vectorizado) y las aceptadas se
+    acumulan como arreglos compactos (14 bytes por fila, no objetos). Los
+    días se controlan al final, agrupando por fecha: un día puede venir
+    repartido en varios tramos, bloques u hojas (por ejemplo, un CSV
+    ordenado por posición y fecha) y se junta igual.
+    """
+
+    def __init__(self, ruta, numeros_por_dia=NUMEROS_POR_DIA, descartar=DESCARTAR, formato_fecha=None):
+        desconocidos = set(descartar) - set(MOTIVOS_DIA)
+        if desconocidos:
+            raise ValueError(f"Motivos de descarte desconocidos: {', '.join(sorted(desconocidos))}")
+        self.numeros_por_dia = numeros_por_dia
+        self.reporte = Reporte(ruta, descartar)
+        # Formato de las fechas escritas como texto: el indicado o, si no, el
+        # de la primera fecha de cada hoja, el mismo para todos sus bloques
+        self.formato_fecha = formato_fecha
+        self.formatos = {}
+        # (hoja, fila, dia, posicion, numero) por bloque; posicion -1 si falta
+        self.partes = []
+
+    def agregar(self, hoja, primera_fila, bloque):
+        """Valida un bloque (fecha, posicion, numero) cuyas filas empiezan en primera_fila."""
+        filas = primera_fila + np.arange(len(bloque))
+
+        # Filas vacías (sin fecha ni número): no cuentan como leídas ni como rechazo
+        vacias = bloque["fecha"].isna().to_numpy() & bloque["numero"].isna().to_numpy()
+        self.reporte.vacias += int(vacias.sum())
+        bloque, filas = bloque[~vacias], filas[~vacias]
+        self.reporte.filas += len(bloque)
+
+        fechas = _fechas(bloque["fecha"], self._formato(hoja, bloque["fecha"]))
+        numeros = pd.to_numeric(bloque["numero"], errors="coerce").to_numpy(dtype=np.float64)
+        posiciones = pd.to_numeric(bloque["posicion"], errors="coerce").to_numpy(dtype=np.float64)
+
+        malas_fechas = np.isnat(fechas)
+        invalidos = ~malas_fechas & (np.isnan(numeros) | (numeros != np.round(numeros)))
+        fuera = ~malas_fechas & ~invalidos & ((numeros < 0) | (numeros >= N_NUMEROS))
+        for motivo, mascara in (("fecha_invalida", malas_fechas), ("numero_invalido", invalidos),
+                                ("numero_fuera_de_rango", fuera)):
+            if mascara.any():
+                columna = "fecha" if motivo == "fecha_invalida" else "numero"
+                self.reporte.registrar(hoja, filas[mascara], motivo, bloque[columna].to_numpy()[mascara])
+
+        validas = ~(malas_fechas | invalidos | fuera)
+        if not validas.any():
+            return
+        self.partes.append((
+            np.full(int(validas.sum()), self.reporte.hojas.index(hoja), dtype=np.int16),
+            filas[validas].astype(np.int32),
+            fechas[validas].astype(np.int64).astype(np.int32),
+            np.nan_to_num(posiciones[validas], nan=-1).astype(np.int16),
+            numeros[validas].astype(np.int16),
+        ))
+
+    def _formato(self, hoja, valores):
+        if self.formato_fecha is not None:
+            return self.formato_fecha
+        if self.formatos.get(hoja) is None:
+            textos = (v for v in valores if isinstance(v, str))
+            self.formatos[hoja] = next(filter(None, map(formato_fecha, textos)), None)
+        return self.formatos[hoja]
+
+    def _registrar_dias(self, motivo, hojas, filas, dias):
+        """Anota el motivo para los días dados, cada uno en su fila de referencia (hoja, fila)."""
+        fechas_texto = dias.astype("datetime64[D]").astype(str)
+        for indice in np.unique(hojas):
+            de_hoja = hojas == indice
+            self.reporte.registrar(self.reporte.hojas[indice], filas[de_hoja], motivo, fechas_texto[de_hoja])
+
+    def resultado(self):
+        """DataFrame (Fecha, Posicion, Numero) de los días aceptados, en orden cronológico y de posición."""
+        if self.partes:
+            hojas, filas, dias, posiciones, numeros = (np.concatenate(columna) for columna in zip(*self.partes))
+        else:
+            hojas, filas, dias, posiciones, numeros = (np.zeros(0, dtype=tipo) for tipo in
+                                                       (np.int16, np.int32, np.int32, np.int16, np.int16))
+
+        # 📅 Filas agrupadas por fecha, en el orden en que aparecieron en el archivo
+        orden = np.argsort(dias, kind="stable")
+        hojas, filas, dias, posiciones, numeros = (a[orden] for a in (hojas, filas, dias, posiciones, numeros))
+        nuevo = np.ones(len(dias), dtype=bool)
+        nuevo[1:] = dias[1:] != dias[:-1]
+        inicios = np.flatnonzero(nuevo)
+        grupo = np.repeat(np.arange(len(inicios)), np.diff(np.append(inicios, len(dias))))
+
+        # Si falta la posición se usa el orden de aparición dentro del día
+        orden_dia = np.arange(len(dias)) - inicios[grupo] + 1
+        sintetica = posiciones < 0
+        posiciones = np.where(sintetica, orden_dia, posiciones)
+
+        # 🔁 dia_duplicado: una (Fecha, Posicion) que ya apareció antes o,
+        # sin posición en el archivo, una fila más allá de numeros_por_dia
+        # (un día pegado dos veces en una hoja sin Posicion). El día se
+        # informa en la primera fila repetida
+        por_posicion = np.lexsort((np.arange(len(dias)), posiciones, dias))
+        repetida = sintetica & (orden_dia > self.numeros_por_dia)
+        repetida[por_posicion[1:]] |= ((dias[por_posicion[1:]] == dias[por_posicion[:-1]])
+                                       & (posiciones[por_posicion[1:]] == posiciones[por_posicion[:-1]]))
+        if repetida.any():
+            primeras = np.flatnonzero(repetida)
+            primeras = primeras[np.unique(grupo[primeras], return_index=True)[1]]
+            self._registrar_dias("dia_duplicado", hojas[primeras], filas[primeras], dias[primeras])
+        conservar = ~repetida if "dia_duplicado" in self.reporte.descartar else np.ones(len(dias), dtype=bool)
+
+        # 📋 Días incompletos o con números repetidos, sobre las filas que quedan
+        tamanos = np.bincount(grupo[conservar], minlength=len(inicios))
+        distintos = np.bincount(np.unique(grupo[conservar] * N_NUMEROS + numeros[conservar]) // N_NUMEROS,
+                                minlength=len(inicios))
+        dia_conservado = tamanos > 0
+        for motivo, mascara in (("dia_incompleto", dia_conservado & (tamanos != self.numeros_por_dia)),
+                                ("numeros_repetidos", distintos < tamanos)):
+            if mascara.any():
+                self._registrar_dias(motivo, hojas[inicios[mascara]], filas[inicios[mascara]],
+                                     dias[inicios[mascara]])
+                if motivo in self.reporte.descartar:
+                    dia_conservado &= ~mascara
+        conservar &= dia_conservado[grupo]
+        self.reporte.aceptadas = int(conservar.sum())
+        self.reporte.dias = int(dia_conservado.sum())
+
+        dias, posiciones, numeros = dias[conservar], posiciones[conservar], numeros[conservar]
+        orden = np.lexsort((posiciones, dias))
+        return pd.DataFrame({
+            "Fecha": dias[orden].astype("datetime64[D]").astype("datetime64[ns]"),
+            "Posicion": posiciones[orden].astype(np.int64),
+            "Numero": numeros[orden].astype(np.int64),
+        })
+
+
+def leer_sorteos(rutas, filas=FILAS_POR_BLOQUE, numeros_por_dia=NUMEROS_POR_DIA, descartar=DESCARTAR,
+                 formato_fecha=None):
+    """
+    Lee y valida uno o más archivos de sorteos (Excel de una o varias hojas,
+    o CSV) en bloques. Devuelve (df, reporte) con df limpio (Fecha, Posicion,
+    Numero) en orden cronológico. formato_fecha (p. ej. "%d/%m/%Y") fija el
+    formato de las fechas escritas como texto; por defecto se toma, para cada
+    hoja, el primero de FORMATOS_FECHA que lee su primera fecha.
+    """
+    rutas = [rutas] if isinstance(rutas, (str, os.PathLike)) else list(rutas)
+    ingesta = Ingesta(", ".join(map(str, rutas)), numeros_por_dia, descartar, formato_fecha)
+    for ruta in rutas:
+        if not os.path.exists(ruta):
+            raise FileNotFoundError(ruta)
+        # Por la extensión del archivo real (un enlace data/tombola.xlsx puede
+        # apuntar a un CSV) o por el contenido (una copia de un CSV con ese
+        # nombre): los .xlsx y .xlsm son archivos ZIP
+        extension = os.path.splitext(os.path.realpath(ruta))[1].lower()
+        es_csv = extension in EXTENSIONES_CSV or not zipfile.is_zipfile(ruta)
+        leer = bloques_csv if es_csv else bloques_excel
+        for hoja, primera, bloque in leer(ruta, filas):
+            if bloque is None:
+                ingesta.reporte.hojas_omitidas.append(hoja)
+                continue
+            if hoja not in ingesta.reporte.hojas:
+                ingesta.reporte.hojas.append(hoja)
+            ingesta.agregar(hoja, primera, bloque)
+    return ingesta.resultado(), ingesta.reporte
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Valida archivos de sorteos (Excel o CSV) y muestra los rechazos.")
+    parser.add_argument("archivos", nargs="*", default=[os.path.join("data", "tombola.xlsx")],
+                        help="Excel (todas sus hojas) o CSV; por defecto data/tombola.xlsx.")
+    parser.add_argument("--descartar", nargs="*", choices=MOTIVOS_DIA, default=list(DESCARTAR),
+                        help="Motivos por día que descartan el día (los demás solo se informan).")
+    parser.add_argument("--numeros-por-dia", type=int, default=NUMEROS_POR_DIA,
+                        help="Números esperados por día de sorteo.")
+    parser.add_argument("--formato-fecha", default=None,
+                        help="Formato de las fechas escritas como texto (p. ej. '%%m/%%d/%%Y'); por defecto, "
+                             "el de la primera fecha de cada hoja entre dd/mm/aaaa (y variantes) y aaaa-mm-dd.")
+    parser.add_argument("--filas", type=int, default=FILAS_POR_BLOQUE, help="Filas por bloque de lectura.")
+    parser.add_argument("--rechazos", default=None, help="CSV donde guardar el detalle de rechazos y avisos.")
+    args = parser.parse_args()
+
+    try:
+        df, reporte = leer_sorteos(args.archivos, args.filas, args.numeros_por_dia, args.descartar,
+                                   args.formato_fecha)
+    except FileNotFoundError as e:
+        print(f"❌ Error: No se encontró el archivo '{e}'.")
+        sys.exit(1)
+
+    print(f"📥 {reporte.resumen()}")
+    if len(df):
+        print(f"📅 Del {df['Fecha'].min().date()} al {df['Fecha'].max().date()}")
+    detalle = reporte.rechazos()
+    if len(detalle):
+        print(detalle.head(10).to_string(index=False))
+    if args.rechazos:
+        detalle.to_csv(args.rechazos, index=False)
+        print(f"✅ Detalle guardado en '{args.rechazos}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# 📦 Importaciones
+import numpy as np
+
+from incidencia_tombola import N_NUMEROS
+
+
+def transiciones_del_dia(df):
+    """
+    Transiciones entre números consecutivos de un mismo día (según Posicion)
+    a partir de un DataFrame limpio y ordenado. Devuelve (fechas, origen,
+    destino) como arreglos, con la fecha del día de cada transición.
+    """
+    fechas = df["Fecha"].values.astype("datetime64[D]")
+    numeros = df["Numero"].values.astype(np.intp)
+    mismo_dia = fechas[1:] == fechas[:-1]
+    return fechas[1:][mismo_dia], numeros[:-1][mismo_dia], numeros[1:][mismo_dia]
+
+
+def _orden(conteos):
+    """Clave única por número: mayor conteo primero y, a igual conteo, el número menor."""
+    return conteos.astype(np.int64) * N_NUMEROS + (N_NUMEROS - 1 - np.arange(N_NUMEROS))
+
+
+def mejores(conteos, k):
+    """Los k números de mayor conteo (> 0), ordenados, usando argpartition."""
+    candidatos = np.flatnonzero(conteos > 0)
+    clave = _orden(conteos)[candidatos]
+    if len(candidatos) > k:
+        elegidos = np.argpartition(-clave, k - 1)[:k]
+        candidatos, clave = candidatos[elegidos], clave[elegidos]
+    return candidatos[np.argsort(-clave)].tolist()
+
+
+class MarkovIncremental:
+    """
+    Cadena de Markov de primer orden sobre números consecutivos del mismo día.
+
+    - transiciones: matriz (100, 100) de enteros; [i, j] = veces que j salió
+      inmediatamente después de i.
+    - frecuencia: conteo acumulado de cada número, para completar la predicción.
+
+    Ambas se actualizan a medida que se consumen sorteos, así que cada
+    predicción solo usa datos anteriores a ella.
+    """
+
+    def __init__(self):
+        self.transiciones = np.zeros((N_NUMEROS, N_NUMEROS), dtype=np.int64)
+        self.frecuencia = np.zeros(N_NUMEROS, dtype=np.int64)
+
+    def consumir(self, origen, destino, numeros):
+        """Agrega transiciones (origen -> destino) y números sorteados nuevos."""
+        np.add.at(self.transiciones, (origen, destino), 1)
+        self.frecuencia += np.bincount(numeros, minlength=N_NUMEROS)
+
+    def predecir(self, ultimo_numero, k=10):
+        """
+        Los k sucesores más frecuentes de ultimo_numero, completados con los
+        números de mayor frecuencia global que no estén ya en la lista.
+        """
+        prediccion = mejores(self.transiciones[ultimo_numero], k)
+        if len(prediccion) < k:
+            for num in mejores(self.frecuencia, k + len(prediccion)):
+                if num not in prediccion:
+                    prediccion.append(num)
+                if len(prediccion) == k:
+                    break
+        return prediccion
+
+    def puntajes(self, ultimo_numero):
+        """
+        (puntajes, orden) de los 100 números después de ultimo_numero. orden
+        es el de predecir con k = 100 (sucesores y luego el resto por
+        frecuencia global); el puntaje es la cantidad de transiciones más la
+        proporción de la frecuencia global, que queda entre 0 y 1.
+        """
+        sucesores = self.transiciones[ultimo_numero]
+        resto = np.flatnonzero((sucesores == 0) & (self.frecuencia > 0))
+        resto = resto[np.argsort(-_orden(self.frecuencia)[resto])]
+        orden = np.concatenate([mejores(sucesores, N_NUMEROS), resto]).astype(np.intp)
+        puntajes = sucesores + self.frecuencia / (self.frecuencia.sum() + 1)
+        return puntajes, orden
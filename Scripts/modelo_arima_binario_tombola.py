@@ -1,99 +1,172 @@
 # 📦 Importaciones
 import os
-import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import timedelta
 import warnings
+import argparse
+import statsmodels
 from statsmodels.tsa.arima.model import ARIMA
+from incidencia_tombola import cargar_incidencia
+from backtest_paralelo_tombola import (EjecutorTareas, agregar_argumento_trabajadores, ejecutar_semanas,
+                                       fila_semana, lista_semanas)
+from traza_tombola import Traza
+from cache_modelos_tombola import CacheModelos, agregar_argumento_cache
+from puntajes_tombola import agregar_argumento_puntajes
+from salida_incremental_tombola import SalidaIncremental, agregar_argumento_solo_nuevas, configuracion
 
 # 🚫 Silenciar warnings
 warnings.filterwarnings("ignore")
 
+# ⚙️ Opciones
+parser = argparse.ArgumentParser(description="Predicción semanal con ARIMA por número.")
+parser.add_argument("--warm-start", action="store_true",
+                    help="Recorrer las semanas en orden, iniciando cada ajuste con los parámetros de la "
+                         "semana anterior y repartiendo los 100 números entre los trabajadores.")
+agregar_argumento_trabajadores(parser)
+agregar_argumento_solo_nuevas(parser)
+agregar_argumento_cache(parser)
+agregar_argumento_puntajes(parser)
+args = parser.parse_args()
+
 # 📁 Rutas
 ruta_excel = os.path.join("data", "tombola.xlsx")
 ruta_csv = os.path.join("data", "modelo_arima_binario_tombola.csv")
 
+# ⏱️ Medición por etapas (con TOMBOLA_TRAZA=1)
+traza = Traza(ruta_csv)
+
 # 📥 Cargar datos
 try:
-    df = pd.read_excel(ruta_excel)
+    with traza.etapa("cargar_datos"):
+        incidencia = cargar_incidencia(ruta_excel)
     print("✅ Archivo cargado correctamente.")
 except FileNotFoundError:
     print("❌ Error: No se encontró el archivo 'tombola.xlsx'.")
     exit()
 
-# 🧹 Preprocesamiento
-df.dropna(subset=["Fecha", "Numero"], inplace=True)
-df["Fecha"] = pd.to_datetime(df["Fecha"])
-df.sort_values("Fecha", inplace=True)
-
 # 📅 Rango de semanas
-fecha_inicio = df["Fecha"].min().date()
-fecha_fin = df["Fecha"].max().date()
-inicio_primera_semana = fecha_inicio - timedelta(days=fecha_inicio.weekday())
-
-# 📦 Lista de resultados
-resultados = []
-
-fecha_actual = inicio_primera_semana
-while fecha_actual <= fecha_fin:
-    inicio_semana = fecha_actual
+fecha_inicio = incidencia.fechas[0].item()
+fecha_fin = incidencia.fechas[-1].item()
+
+# 🗓️ Series diarias binarias de los 100 números (días sin sorteo = 0)
+with traza.etapa("construir_features"):
+    calendario = incidencia.calendario_diario()
+
+
+# 🗄️ Ajustes ya hechos con los mismos datos, orden y parámetros iniciales
+cache = CacheModelos("arima", {"order": [2, 0, 2], "pasos": 6, "statsmodels": statsmodels.__version__},
+                     incidencia, args.cache_mb)
+
+
+def ajustar_numero(tarea):
+    """
+    Ajusta el ARIMA(2,0,2) de un número con el calendario hasta el último de
+    los primeros n_dias días de sorteo. tarea = (numero, n_dias,
+    parametros_iniciales o None). Devuelve (numero, promedio del pronóstico a
+    6 días, parámetros) o (numero, None, None) si no hay datos suficientes o
+    el ajuste falla.
+    """
+    numero, n_dias, parametros_iniciales = tarea
+    clave = cache.clave(n_dias, numero=numero, inicio=parametros_iniciales)
+    guardado = cache.leer(clave)
+    if guardado is not None:
+        return guardado["ajuste"]
+    with traza.etapa("ajuste", numero=numero, dias=n_dias):
+        ajuste = _ajustar_numero(tarea)
+    cache.guardar(clave, ajuste=ajuste)
+    return ajuste
+
+
+def _ajustar_numero(tarea):
+    numero, n_dias, parametros_iniciales = tarea
+    serie = calendario[numero].iloc[:filas_hasta(n_dias)]
+
+    # Requiere al menos 3 días donde haya salido
+    if serie.sum() < 3:
+        return numero, None, None
+    try:
+        modelo = ARIMA(serie, order=(2,0,2)).fit(start_params=parametros_iniciales)
+        # Solo se reutilizan como punto de partida los parámetros de ajustes que convergieron
+        convergio = modelo.mle_retvals is None or modelo.mle_retvals.get("converged", True)
+        return numero, modelo.forecast(steps=6).mean(), np.asarray(modelo.params) if convergio else None
+    except:
+        return numero, None, None
+
+
+def filas_hasta(n_dias):
+    """Filas del calendario diario hasta el último sorteo dentro de los primeros n_dias días."""
+    return int((incidencia.fechas[n_dias - 1] - incidencia.fechas[0]).astype(int)) + 1
+
+
+def fila_ajustes(inicio_semana, ajustes):
+    """Fila semanal con el top 10 por pronóstico medio y el pronóstico de cada número."""
+    predicciones = [(numero, pred) for numero, pred, _ in ajustes if pred is not None]
+    predicciones.sort(key=lambda x: x[1], reverse=True)
+    orden = [num for num, _ in predicciones]
+    puntajes = np.full(100, np.nan)
+    for numero, pred in predicciones:
+        puntajes[numero] = pred
+    return fila_semana(inicio_semana, str(orden[:10]) if orden else "", puntajes=puntajes, orden=orden)
+
+
+def predecir_semana(inicio_semana):
+    """Ajusta un ARIMA por número con los datos hasta el fin de la semana y devuelve el top 10."""
+    with traza.etapa("semana", semana=inicio_semana):
+        return _predecir_semana(inicio_semana)
+
+
+def _predecir_semana(inicio_semana):
     fin_semana = inicio_semana + timedelta(days=6)
-    fin_semana_dt = datetime.combine(fin_semana, datetime.min.time())
-
-    # Filtrar datos hasta el fin de esa semana
-    df_hist = df[df["Fecha"] <= fin_semana_dt]
-
-    if df_hist.empty:
-        resultados.append({
-            "semana_inicio": inicio_semana.strftime("%Y-%m-%d"),
-            "semana_fin": fin_semana.strftime("%Y-%m-%d"),
-            "prediccion": ""
-        })
-        fecha_actual += timedelta(days=7)
-        continue
-
-    # Crear base de fechas para ARIMA
-    fechas = pd.date_range(start=df_hist["Fecha"].min(), end=df_hist["Fecha"].max(), freq='D')
-    df_base = pd.DataFrame({'Fecha': fechas})
-
-    predicciones = []
-
-    for numero in range(100):
-        df_num = df_hist.copy()
-        df_num["presente"] = df_num["Numero"].apply(lambda x: 1 if x == numero else 0)
-
-        df_diario = df_num.groupby("Fecha")["presente"].max().reset_index()
-        df_serie = pd.merge(df_base, df_diario, on="Fecha", how="left").fillna(0)
-        df_serie.set_index("Fecha", inplace=True)
-
-        # Requiere al menos 10 días donde haya salido
-        if df_serie["presente"].sum() >= 3:
-            try:
-                modelo = ARIMA(df_serie["presente"], order=(2,0,2)).fit()
-                pred = modelo.forecast(steps=6).mean()
-                predicciones.append((numero, pred))
-            except:
+
+    # Días de sorteo hasta el fin de esa semana
+    n_dias = incidencia.dias_hasta(fin_semana)
+    if n_dias == 0:
+        return fila_semana(inicio_semana, "")
+
+    ajustes = [ajustar_numero((numero, n_dias, None)) for numero in range(100)]
+    return fila_ajustes(inicio_semana, ajustes)
+
+
+def predecir_con_warm_start(semanas, trabajadores):
+    """
+    Recorre las semanas en orden. Cada semana reparte los 100 ajustes entre
+    los trabajadores y usa como punto de partida los parámetros estimados
+    para ese número la semana anterior.
+    """
+    resultados = []
+    parametros = {}
+    with EjecutorTareas(trabajadores) as ejecutor:
+        for inicio_semana in semanas:
+            n_dias = incidencia.dias_hasta(inicio_semana + timedelta(days=6))
+            if n_dias == 0:
+                resultados.append(fila_semana(inicio_semana, ""))
                 continue
 
-    # Ordenar y seleccionar top 10
-    if predicciones:
-        predicciones.sort(key=lambda x: x[1], reverse=True)
-        top_10 = [num for num, _ in predicciones[:10]]
-        prediccion_str = str(top_10)
-    else:
-        prediccion_str = ""
-
-    # Agregar resultado semanal
-    resultados.append({
-        "semana_inicio": inicio_semana.strftime("%Y-%m-%d"),
-        "semana_fin": fin_semana.strftime("%Y-%m-%d"),
-        "prediccion": prediccion_str
-    })
-
-    # Avanzar a la siguiente semana
-    fecha_actual += timedelta(days=7)
-
-# 💾 Guardar CSV
-df_resultado = pd.DataFrame(resultados)
-df_resultado.to_csv(ruta_csv, index=False)
-print(f"\n✅ Resultados guardados en: {ruta_csv}")
+            with traza.etapa("semana", semana=inicio_semana):
+                tareas = [(numero, n_dias, parametros.get(numero)) for numero in range(100)]
+                ajustes = ejecutor.map(ajustar_numero, tareas)
+                for numero, _, params in ajustes:
+                    if params is not None:
+                        parametros[numero] = params
+                resultados.append(fila_ajustes(inicio_semana, ajustes))
+    return resultados
+
+
+if __name__ == "__main__":
+    # 🧾 Con --solo-nuevas se calculan solo las semanas que faltan o cambiaron
+    # (con --warm-start, la cadena de ajustes arranca en frío en la primera de ellas)
+    salida = SalidaIncremental(ruta_csv, incidencia, configuracion(args), args.solo_nuevas, args.puntajes)
+    semanas = salida.pendientes(lista_semanas(fecha_inicio, fecha_fin))
+
+    # 📦 Resultados semanales (en orden de semana, en serie o en paralelo)
+    with traza.etapa("backtest"):
+        if args.warm_start:
+            resultados = predecir_con_warm_start(semanas, args.trabajadores)
+        else:
+            resultados = ejecutar_semanas(predecir_semana, semanas, args.trabajadores)
+
+    # 💾 Guardar CSV
+    with traza.etapa("guardar_csv"):
+        salida.guardar(resultados)
+    cache.recortar()
+    print(f"\n✅ {len(resultados)} semanas calculadas; resultados guardados en: {ruta_csv}")
@@ -1,49 +1,68 @@
 # 📦 Importación de librerías
-import pandas as pd
 import numpy as np
-import statsmodels.api as sm
 import os
+import argparse
+from incidencia_tombola import cargar_incidencia
+from frecuencia_tombola import top_k
+from conteo_glm_tombola import GLMConteo, conteos_por_dia
+from backtest_paralelo_tombola import fila_semana
+from salida_incremental_tombola import SalidaIncremental, agregar_argumento_solo_nuevas, configuracion
+from puntajes_tombola import agregar_argumento_puntajes
+from traza_tombola import Traza
 
-# 📁 Ruta del archivo
-ruta_archivo = os.path.join("data", "tombola.xlsx")
-
-# 📥 Carga del archivo
-df = pd.read_excel(ruta_archivo)
-df.dropna(subset=["Numero", "Fecha"], inplace=True)
+# ⚙️ Opciones
+parser = argparse.ArgumentParser(description="Predicción semanal con regresión binomial negativa de conteos.")
+agregar_argumento_solo_nuevas(parser)
+agregar_argumento_puntajes(parser)
+args = parser.parse_args()
 
-# 🧹 Preprocesamiento
-df["Fecha"] = pd.to_datetime(df["Fecha"])
-df["dia_semana"] = df["Fecha"].dt.dayofweek
-df["Numero"] = df["Numero"].astype(int)
+# 📁 Rutas
+ruta_archivo = os.path.join("data", "tombola.xlsx")
+ruta_csv = os.path.join("data", "modelo_binomial_negativa_conteo_tombola.csv")
 
-# 📊 Crear dataset agregado con conteos por número y día de la semana
-conteo_df = df.groupby(["Numero", "dia_semana"]).size().reset_index(name="conteo")
+# ⏱️ Medición por etapas (con TOMBOLA_TRAZA=1)
+traza = Traza(ruta_csv)
 
-# 🔄 Expandir todos los números del 0 al 99 y días de la semana 0–6 (para evitar valores faltantes)
-todos_numeros = pd.DataFrame([(n, d) for n in range(100) for d in range(7)], columns=["Numero", "dia_semana"])
-conteo_df = todos_numeros.merge(conteo_df, on=["Numero", "dia_semana"], how="left").fillna(0)
-conteo_df["conteo"] = conteo_df["conteo"].astype(int)
+# 📥 Cargar la matriz de incidencia (desde la caché si el Excel no cambió)
+with traza.etapa("cargar_datos"):
+    incidencia = cargar_incidencia(ruta_archivo)
 
-# 🧠 Variables independientes (con constante)
-X = conteo_df[["Numero", "dia_semana"]]
-X = sm.add_constant(X)
+# 🧾 Con --solo-nuevas solo se ajustan las semanas que faltan o cambiaron
+salida = SalidaIncremental(ruta_csv, incidencia, configuracion(args), args.solo_nuevas, args.puntajes)
 
-# 🎯 Variable dependiente
-y = conteo_df["conteo"]
+# 📅 Walk-forward semanal: la tabla de conteos por número y día de la semana
+# (el estadístico suficiente del modelo) se actualiza con los días de cada
+# semana y el ajuste arranca de los coeficientes de la semana anterior
+glm = GLMConteo("binomial_negativa")
+conteos = np.zeros((100, 7))
+inicios, _, cortes = incidencia.semanas()
+predicciones_semana = []
+desde = 0
 
-# ⚙️ Modelo de regresión Binomial Negativa
-modelo = sm.GLM(y, X, family=sm.families.NegativeBinomial())
-resultado = modelo.fit()
+with traza.etapa("backtest"):
+    for inicio, corte in zip(inicios.astype("datetime64[D]").tolist(), cortes):
+        conteos += conteos_por_dia(incidencia.conteos[desde:corte], incidencia.dia_semana[desde:corte])
+        desde = corte
+        if not salida.es_pendiente(inicio.strftime("%Y-%m-%d")):
+            continue
 
-# 🔍 Predecir conteos esperados
-conteo_df["predicho"] = resultado.predict(X)
+        with traza.etapa("entrenar", semana=inicio):
+            ajustado = glm.ajustar(conteos)
+        if not ajustado:
+            predicciones_semana.append(fila_semana(inicio, ""))
+            continue
 
-# 📈 Agrupar predicciones por número
-predicciones_agrupadas = conteo_df.groupby("Numero")["predicho"].sum().sort_values(ascending=False)
+        # 📈 Conteo esperado de cada número en la semana siguiente (suma sobre días)
+        esperados = glm.esperados().sum(axis=1)
+        orden = top_k(esperados[None, :], k=100, solo_positivos=False)[0]
+        predicciones_semana.append(fila_semana(inicio, str(orden[:10]), puntajes=esperados, orden=orden))
 
-# 🏆 Top 10 números más probables
-top_10_nb = predicciones_agrupadas.head(10).index.tolist()
+# 💾 Guardar CSV
+with traza.etapa("guardar_csv"):
+    salida.guardar(predicciones_semana)
 
 # ✅ Resultado
-print("📈 Predicción de aparición por Regresión Binomial Negativa:")
-print(top_10_nb)
+print(f"🧾 Semanas calculadas: {len(predicciones_semana)}; guardadas en '{ruta_csv}'")
+if predicciones_semana:
+    print("📈 Predicción de aparición por Regresión Binomial Negativa (última semana):")
+    print(predicciones_semana[-1]["prediccion"])
@@ -1,44 +1,75 @@
 # 📦 Importación de librerías
-import pandas as pd
 import numpy as np
-from sklearn.cluster import DBSCAN
-from sklearn.preprocessing import StandardScaler
 import os
+import argparse
+from incidencia_tombola import cargar_incidencia
+from conteo_glm_tombola import conteos_por_dia
+from agrupamiento_tombola import DBSCANIncremental, escalar, orden_en_cluster
+from backtest_paralelo_tombola import fila_semana
+from salida_incremental_tombola import SalidaIncremental, agregar_argumento_solo_nuevas, configuracion
+from puntajes_tombola import agregar_argumento_puntajes
+from traza_tombola import Traza
 
-# 📁 Ruta al archivo
+# ⚙️ Opciones
+parser = argparse.ArgumentParser(description="Predicción semanal por agrupamiento DBSCAN (frecuencia por día).")
+agregar_argumento_solo_nuevas(parser)
+agregar_argumento_puntajes(parser)
+args = parser.parse_args()
+
+# 📁 Rutas
 ruta_archivo = os.path.join("data", "tombola.xlsx")
+ruta_csv = os.path.join("data", "modelo_dbscan_tombola.csv")
+
+# ⏱️ Medición por etapas (con TOMBOLA_TRAZA=1)
+traza = Traza(ruta_csv)
 
-# 📥 Cargar archivo
-df = pd.read_excel(ruta_archivo)
-df.dropna(subset=["Numero", "Fecha"], inplace=True)
+# 📥 Cargar la matriz de incidencia (desde la caché si el Excel no cambió)
+with traza.etapa("cargar_datos"):
+    incidencia = cargar_incidencia(ruta_archivo)
 
-# 🧹 Preprocesamiento
-df["Fecha"] = pd.to_datetime(df["Fecha"])
-df["dia_semana"] = df["Fecha"].dt.dayofweek
-df["Numero"] = df["Numero"].astype(int)
+# 🧾 Con --solo-nuevas solo se agrupan las semanas que faltan o cambiaron
+salida = SalidaIncremental(ruta_csv, incidencia, configuracion(args), args.solo_nuevas, args.puntajes)
 
-# 📊 Crear tabla dinámica: número vs. frecuencia por día de la semana
-tabla = pd.crosstab(df["Numero"], df["dia_semana"])
+# 📅 Walk-forward semanal: la tabla número vs. frecuencia por día de la
+# semana se actualiza con los días de cada semana; DBSCAN solo vuelve a
+# agrupar cuando cambia el grafo de vecinos
+dbscan = DBSCANIncremental(eps=1.5, min_samples=2)
+tabla = np.zeros((100, 7))
+inicios, _, cortes = incidencia.semanas()
+predicciones_semana = []
+desde = 0
 
-# ⚖️ Escalar los datos
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(tabla)
+with traza.etapa("backtest"):
+    for inicio, corte in zip(inicios.astype("datetime64[D]").tolist(), cortes):
+        tabla += conteos_por_dia(incidencia.conteos[desde:corte], incidencia.dia_semana[desde:corte])
+        desde = corte
+        if not salida.es_pendiente(inicio.strftime("%Y-%m-%d")):
+            continue
 
-# 📌 Aplicar DBSCAN
-dbscan = DBSCAN(eps=1.5, min_samples=2)
-labels = dbscan.fit_predict(X_scaled)
+        # ⚖️ Escalar los números que ya salieron (las filas del crosstab)
+        totales = tabla.sum(axis=1)
+        presentes = np.flatnonzero(totales)
+        with traza.etapa("entrenar", semana=inicio):
+            labels = dbscan.ajustar(escalar(tabla[presentes]))
 
-# ➕ Añadir etiquetas a los datos
-tabla["cluster"] = labels
+        # 📤 Cluster principal: el más numeroso que no sea ruido (-1)
+        agrupados = labels[labels >= 0]
+        if not len(agrupados):
+            predicciones_semana.append(fila_semana(inicio, ""))
+            continue
+        cluster_principal = np.bincount(agrupados).argmax()
 
-# 📤 Filtrar el cluster principal (el más numeroso que no sea ruido -1)
-cluster_counts = tabla["cluster"].value_counts()
-cluster_principal = cluster_counts[cluster_counts.index != -1].idxmax()
+        # 🏆 Números del cluster principal, de mayor a menor frecuencia
+        puntajes, orden = orden_en_cluster(totales[presentes], presentes, labels, cluster_principal)
+        predicciones_semana.append(fila_semana(inicio, str(orden[:10]), puntajes=puntajes, orden=orden))
 
-# 🏆 Top 10 números más frecuentes dentro del cluster principal
-numeros_cluster = tabla[tabla["cluster"] == cluster_principal].drop("cluster", axis=1)
-top_10_dbscan = numeros_cluster.sum(axis=1).sort_values(ascending=False).head(10).index.tolist()
+# 💾 Guardar CSV
+with traza.etapa("guardar_csv"):
+    salida.guardar(predicciones_semana)
 
 # ✅ Resultado
-print("🔍 Predicción por agrupamiento DBSCAN (detectando densidad):")
-print(top_10_dbscan)
+print(f"🧾 Semanas calculadas: {len(predicciones_semana)} "
+      f"({dbscan.reutilizadas} sin cambios en el grafo de vecinos); guardadas en '{ruta_csv}'")
+if predicciones_semana:
+    print("🔍 Predicción por agrupamiento DBSCAN (detectando densidad, última semana):")
+    print(predicciones_semana[-1]["prediccion"])
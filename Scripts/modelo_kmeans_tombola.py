@@ -1,39 +1,80 @@
 # 📦 Importación de librerías
-import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans
 import os
+import argparse
+from incidencia_tombola import cargar_incidencia
+from conteo_glm_tombola import conteos_por_dia
+from agrupamiento_tombola import KMeansIncremental, orden_en_cluster
+from backtest_paralelo_tombola import fila_semana
+from salida_incremental_tombola import SalidaIncremental, agregar_argumento_solo_nuevas, configuracion
+from puntajes_tombola import agregar_argumento_puntajes
+from traza_tombola import Traza
 
-# 📁 Ruta al archivo
+# ⚙️ Opciones
+parser = argparse.ArgumentParser(description="Predicción semanal por agrupamiento K-Means (frecuencia por día).")
+parser.add_argument("--refit-cada", type=int, default=1,
+                    help="Semanas entre agrupamientos completos (por defecto, todas; 0 = solo el primero). "
+                         "Con más de 1, las semanas intermedias parten de los centroides de la anterior: "
+                         "es más rápido pero aproximado, porque puede llegar a otro óptimo local y "
+                         "elegir otro cluster que el agrupamiento completo.")
+agregar_argumento_solo_nuevas(parser)
+agregar_argumento_puntajes(parser)
+args = parser.parse_args()
+
+# 📁 Rutas
 ruta_archivo = os.path.join("data", "tombola.xlsx")
+ruta_csv = os.path.join("data", "modelo_kmeans_tombola.csv")
+
+# ⏱️ Medición por etapas (con TOMBOLA_TRAZA=1)
+traza = Traza(ruta_csv)
+
+# 📥 Cargar la matriz de incidencia (desde la caché si el Excel no cambió)
+with traza.etapa("cargar_datos"):
+    incidencia = cargar_incidencia(ruta_archivo)
 
-# 📥 Cargar archivo
-df = pd.read_excel(ruta_archivo)
-df.dropna(subset=["Numero", "Fecha"], inplace=True)
+# 🧾 Con --solo-nuevas solo se agrupan las semanas que faltan o cambiaron.
+# Los centroides se encadenan de semana en semana, así que la cadena
+# arranca siempre desde la primera semana
+salida = SalidaIncremental(ruta_csv, incidencia, configuracion(args), args.solo_nuevas, args.puntajes)
 
-# 🧹 Preprocesamiento
-df["Fecha"] = pd.to_datetime(df["Fecha"])
-df["dia_semana"] = df["Fecha"].dt.dayofweek
-df["Numero"] = df["Numero"].astype(int)
+# 📅 Walk-forward semanal: la tabla número vs. frecuencia por día de la
+# semana se actualiza con los días de cada semana y K-Means (3 clusters) se
+# ajusta completo (o, con --refit-cada > 1, parte de los centroides anteriores)
+kmeans = KMeansIncremental(n_clusters=3, random_state=42, n_init=10, refit_cada=args.refit_cada)
+tabla = np.zeros((100, 7))
+inicios, _, cortes = incidencia.semanas()
+predicciones_semana = []
+desde = 0
 
-# 📊 Crear tabla dinámica: número vs. frecuencia por día de la semana
-tabla = pd.crosstab(df["Numero"], df["dia_semana"])
+with traza.etapa("backtest"):
+    for inicio, corte in zip(inicios.astype("datetime64[D]").tolist(), cortes):
+        tabla += conteos_por_dia(incidencia.conteos[desde:corte], incidencia.dia_semana[desde:corte])
+        desde = corte
 
-# 🔢 Aplicar K-Means (con 3 clusters, puedes ajustar)
-kmeans = KMeans(n_clusters=3, random_state=42, n_init=10)
-clusters = kmeans.fit_predict(tabla)
+        # 🔢 Solo los números que ya salieron (las filas del crosstab)
+        totales = tabla.sum(axis=1)
+        presentes = np.flatnonzero(totales)
+        with traza.etapa("entrenar", semana=inicio):
+            clusters = kmeans.ajustar(tabla[presentes])
+        if not salida.es_pendiente(inicio.strftime("%Y-%m-%d")):
+            continue
+        if clusters is None:
+            predicciones_semana.append(fila_semana(inicio, ""))
+            continue
 
-# ➕ Agregar los clusters a la tabla
-tabla["cluster"] = clusters
+        # 📌 Elegimos el cluster con la mayor frecuencia acumulada
+        mejor_cluster = np.bincount(clusters, weights=totales[presentes], minlength=3).argmax()
 
-# 📌 Elegimos el cluster con la mayor frecuencia promedio
-cluster_promedios = tabla.groupby("cluster").sum().mean(axis=1)
-mejor_cluster = cluster_promedios.idxmax()
+        # 🏆 Números del mejor cluster, de mayor a menor frecuencia
+        puntajes, orden = orden_en_cluster(totales[presentes], presentes, clusters, mejor_cluster)
+        predicciones_semana.append(fila_semana(inicio, str(orden[:10]), puntajes=puntajes, orden=orden))
 
-# 🏆 Seleccionar los 10 números con mayor frecuencia dentro del mejor cluster
-numeros_cluster = tabla[tabla["cluster"] == mejor_cluster].drop("cluster", axis=1)
-top_10_kmeans = numeros_cluster.sum(axis=1).sort_values(ascending=False).head(10).index.tolist()
+# 💾 Guardar CSV
+with traza.etapa("guardar_csv"):
+    salida.guardar(predicciones_semana)
 
 # ✅ Resultado
-print("🧠 Predicción por agrupamiento K-Means (basado en frecuencia por día):")
-print(top_10_kmeans)
+print(f"🧾 Semanas calculadas: {len(predicciones_semana)}; guardadas en '{ruta_csv}'")
+if predicciones_semana:
+    print("🧠 Predicción por agrupamiento K-Means (basado en frecuencia por día, última semana):")
+    print(predicciones_semana[-1]["prediccion"])
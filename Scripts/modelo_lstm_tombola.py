@@ -1,108 +1,174 @@
 import os
+import argparse
 import pandas as pd
 import numpy as np
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Embedding, Input
 from sklearn.preprocessing import LabelEncoder
-from tensorflow.keras.utils import to_categorical
-from datetime import datetime, timedelta
+from datetime import timedelta
+from datos_tombola import cargar_sorteos, clave_archivo
+from incidencia_tombola import cargar_incidencia
+from modelos_numpy_tombola import LSTMNumpy, metadatos, ruta_exportado
+from traza_tombola import Traza
+from salida_incremental_tombola import SalidaIncremental, agregar_argumento_solo_nuevas
+
+# ⚙️ Opciones
+parser = argparse.ArgumentParser(description="Predicción semanal con LSTM.")
+parser.add_argument("--solo-prediccion", action="store_true",
+                    help="No reentrenar: usar los pesos exportados en data/exportados/lstm.npz "
+                         "(solo NumPy) o, si no existen, el modelo data/modelo_lstm_tombola.h5.")
+agregar_argumento_solo_nuevas(parser)
+args = parser.parse_args()
+
+# 📁 Rutas
+ruta_archivo = os.path.join("data", "tombola.xlsx")
+ruta_modelo = os.path.join("data", "modelo_lstm_tombola.h5")
+ruta_clases = os.path.join("data", "modelo_lstm_tombola_clases.npy")
+ruta_numpy = ruta_exportado("lstm")
+ruta_csv = os.path.join("data", "modelo_lstm_tombola.csv")
+
+# ⏱️ Medición por etapas (con TOMBOLA_TRAZA=1)
+traza = Traza(ruta_csv)
 
 # 📁 Cargar archivo y preparar datos para el modelo LSTM
-ruta_archivo = os.path.join("data", "tombola.xlsx")
 try:
-    df = pd.read_excel(ruta_archivo)
+    with traza.etapa("cargar_datos"):
+        df = cargar_sorteos(ruta_archivo)
+        incidencia = cargar_incidencia(ruta_archivo)
 except FileNotFoundError:
     print("❌ Error: No se encontró el archivo 'tombola.xlsx' en la carpeta 'data'.")
     exit()
 
-df['Fecha'] = pd.to_datetime(df['Fecha'])
-df.dropna(subset=["Numero"], inplace=True)  # Eliminar filas sin número
-
 # Agrupar en secuencias por fecha
-secuencias = df.groupby('Fecha')['Numero'].apply(list).reset_index()
-secuencias = secuencias[secuencias['Numero'].apply(len) == 10]  # Solo días con 10 números
-
-# Preparar datos para el modelo
-X = []
-y = []
-for secuencia in secuencias['Numero']:
-    for i in range(len(secuencia) - 1):
-        X.append(secuencia[i])
-        y.append(secuencia[i + 1])
-
-todos_los_numeros = sorted(list(set(X + y)))
-encoder = LabelEncoder()
-encoder.fit(todos_los_numeros)
+with traza.etapa("construir_features"):
+    secuencias = df.groupby('Fecha')['Numero'].apply(list).reset_index()
+    secuencias = secuencias[secuencias['Numero'].apply(len) == 10]  # Solo días con 10 números
+
+    # Preparar datos para el modelo
+    X = []
+    y = []
+    for secuencia in secuencias['Numero']:
+        for i in range(len(secuencia) - 1):
+            X.append(secuencia[i])
+            y.append(secuencia[i + 1])
 
-X_encoded = encoder.transform(X)
-y_encoded = encoder.transform(y)
-y_encoded = to_categorical(y_encoded, num_classes=len(encoder.classes_))
-
-# 🧠 Definir y entrenar modelo LSTM
-model = Sequential()
-model.add(Input(shape=(1,)))
-model.add(Embedding(input_dim=len(encoder.classes_), output_dim=64))
-model.add(LSTM(64))
-model.add(Dense(len(encoder.classes_), activation='softmax'))
-
-model.compile(loss='categorical_crossentropy', optimizer='adam', metrics=['accuracy'])
+encoder = LabelEncoder()
 
-X_encoded = np.array(X_encoded)
-model.fit(X_encoded, y_encoded, epochs=20, verbose=0)
-
-# 💾 Guardar el modelo entrenado
-ruta_modelo = os.path.join("data", "modelo_lstm_tombola.h5")
-model.save(ruta_modelo)
+# Los pesos exportados sirven si corresponden al .h5 actual (o si no hay .h5)
+numpy_vigente = os.path.exists(ruta_numpy) and (
+    not os.path.exists(ruta_modelo) or metadatos(ruta_numpy).get("clave") == clave_archivo(ruta_modelo)
+)
+
+if args.solo_prediccion and numpy_vigente:
+    # ⚡ Pesos exportados: inferencia solo con NumPy, sin importar TensorFlow
+    lstm_numpy = LSTMNumpy.cargar(ruta_numpy)
+    encoder.classes_ = lstm_numpy.clases
+    predecir_probas = lstm_numpy.probabilidades
+elif args.solo_prediccion:
+    # 📦 Reutilizar el modelo entrenado (y las clases con las que se entrenó)
+    if not os.path.exists(ruta_modelo):
+        print(f"❌ Error: No se encontró el modelo '{ruta_modelo}'. Ejecutar sin --solo-prediccion para entrenarlo.")
+        exit()
+    from tensorflow.keras.models import load_model
+    model = load_model(ruta_modelo, compile=False)
+    if os.path.exists(ruta_clases):
+        encoder.classes_ = np.load(ruta_clases)
+    else:
+        encoder.fit(sorted(set(X + y)))
+    if model.output_shape[-1] != len(encoder.classes_):
+        print("❌ Error: El modelo guardado no corresponde a los números de los datos actuales. Reentrenar.")
+        exit()
+    predecir_probas = lambda entrada: model(entrada.reshape(-1, 1), training=False).numpy()
+else:
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import LSTM, Dense, Embedding, Input
+    from tensorflow.keras.utils import to_categorical
+
+    todos_los_numeros = sorted(list(set(X + y)))
+    encoder.fit(todos_los_numeros)
+
+    X_encoded = encoder.transform(X)
+    y_encoded = encoder.transform(y)
+    y_encoded = to_categorical(y_encoded, num_classes=len(encoder.classes_))
+
+    # 🧠 Definir y entrenar modelo LSTM
+    model = Sequential()
+    model.add(Input(shape=(1,)))
+    model.add(Embedding(input_dim=len(encoder.classes_), output_dim=64))
+    model.add(LSTM(64))
+    model.add(Dense(len(encoder.classes_), activation='softmax'))
+
+    model.compile(loss='categorical_crossentropy', optimizer='adam', metrics=['accuracy'])
+
+    X_encoded = np.array(X_encoded)
+    with traza.etapa("entrenar"):
+        model.fit(X_encoded, y_encoded, epochs=20, verbose=0)
+
+    # 💾 Guardar el modelo entrenado y las clases del encoder
+    model.save(ruta_modelo)
+    np.save(ruta_clases, encoder.classes_)
+    LSTMNumpy.desde_keras(model, encoder.classes_).guardar(ruta_numpy, clave=clave_archivo(ruta_modelo))
+    predecir_probas = lambda entrada: model(entrada.reshape(-1, 1), training=False).numpy()
 
 # --- Predicciones Semanales y CSV ---
-ruta_csv = os.path.join("data", "modelo_lstm_tombola.csv")
+
+# 🧾 Con --solo-nuevas solo se predicen las semanas que faltan o cambiaron; las
+# filas guardadas valen mientras el modelo sea el mismo (reentrenar recalcula todo).
+# Sin el .h5, la clave es la del modelo del que se exportaron los pesos.
+clave_modelo = clave_archivo(ruta_modelo) if os.path.exists(ruta_modelo) else metadatos(ruta_numpy)["clave"]
+salida = SalidaIncremental(ruta_csv, incidencia, {"modelo": clave_modelo}, args.solo_nuevas)
 
 fecha_inicio_datos = secuencias["Fecha"].min().date()
 fecha_fin_datos = secuencias["Fecha"].max().date()
 inicio_primera_semana = fecha_inicio_datos - timedelta(days=fecha_inicio_datos.weekday())
 
-lista_resultados = []
-fecha_actual_prediccion = inicio_primera_semana
+# 📅 Semanas con al menos una secuencia hasta su fin, y el último número de
+# la última secuencia disponible en cada una
+fechas_secuencias = secuencias["Fecha"].values.astype("datetime64[D]")
+ultimos_numeros = np.array([secuencia[-1] for secuencia in secuencias["Numero"]])
 
+semanas = []
+entradas = []
+fecha_actual_prediccion = inicio_primera_semana
 while fecha_actual_prediccion <= fecha_fin_datos:
-    inicio_semana = fecha_actual_prediccion
-    fin_semana = inicio_semana + timedelta(days=6)
-    fin_semana_datetime = datetime.combine(fin_semana, datetime.min.time())
-
-    # Filtrar secuencias hasta fin de semana
-    secuencias_filtradas = secuencias[secuencias["Fecha"] <= fin_semana_datetime]
-
-    if secuencias_filtradas.empty:
-        fecha_actual_prediccion += timedelta(days=7)
-        continue
-
-    # Último número de la última secuencia
-    ultimo_numero = secuencias_filtradas['Numero'].iloc[-1][-1]
-
-    entrada = np.array([encoder.transform([ultimo_numero])[0]])
+    fin_semana = fecha_actual_prediccion + timedelta(days=6)
+    n_secuencias = np.searchsorted(fechas_secuencias, np.datetime64(fin_semana, "D"), side="right")
+    if n_secuencias > 0 and salida.es_pendiente(fecha_actual_prediccion.strftime('%Y-%m-%d')):
+        semanas.append(fecha_actual_prediccion)
+        entradas.append(ultimos_numeros[n_secuencias - 1])
+    fecha_actual_prediccion += timedelta(days=7)
 
-    predicciones = []
-    for _ in range(10):
-        pred = model.predict(entrada, verbose=0)
-        pred_num = int(encoder.inverse_transform([np.argmax(pred)])[0])  # convertir a int
-        predicciones.append(pred_num)
-        entrada = np.array([encoder.transform([pred_num])[0]])
+# 🔮 Inferencia por lotes: todas las semanas avanzan juntas, un paso a la vez
+predicciones = np.zeros((len(semanas), 10), dtype=int)
+# Con --solo-prediccion el modelo puede no conocer números que recién aparecen en los datos
+desconocidos = np.setdiff1d(entradas, encoder.classes_)
+if len(desconocidos):
+    print(f"❌ Error: El modelo guardado no conoce los números {', '.join(f'{n:02d}' for n in desconocidos)}. "
+          f"Ejecutar sin --solo-prediccion para reentrenarlo.")
+    exit()
+if semanas:
+    with traza.etapa("predecir", semanas=len(semanas)):
+        entrada = encoder.transform(entradas)
+        for paso in range(10):
+            probas = predecir_probas(entrada)
+            entrada = np.argmax(probas, axis=1)
+            predicciones[:, paso] = encoder.inverse_transform(entrada)
 
+lista_resultados = []
+for inicio_semana, prediccion in zip(semanas, predicciones):
+    fin_semana = inicio_semana + timedelta(days=6)
     nuevo_registro = {
         'semana_inicio': inicio_semana.strftime('%Y-%m-%d'),
         'semana_fin': fin_semana.strftime('%Y-%m-%d'),
-        'prediccion': str(predicciones)  # mantiene formato [n1, n2, ...]
+        'prediccion': str(prediccion.tolist())  # mantiene formato [n1, n2, ...]
     }
     lista_resultados.append(nuevo_registro)
 
-    fecha_actual_prediccion += timedelta(days=7)
-
 df_predicciones = pd.DataFrame(lista_resultados)
 
-if os.path.exists(ruta_csv):
+if os.path.exists(ruta_csv) and not args.solo_nuevas:
     print("⚠️ El archivo de predicciones ya existía y será sobrescrito.")
 
-df_predicciones.to_csv(ruta_csv, index=False)
+with traza.etapa("guardar_csv"):
+    salida.guardar(df_predicciones)
 
 print(f"✅ Se han generado predicciones semanales con LSTM y se han guardado en '{ruta_csv}'")
 print(f"📅 Total de predicciones generadas: {len(df_predicciones)}")
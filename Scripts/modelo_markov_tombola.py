@@ -1,68 +1,84 @@
 # 📦 Importación de librerías
-import pandas as pd
+import numpy as np
 import os
-from collections import defaultdict, Counter
+import argparse
 from datetime import timedelta
+from datos_tombola import cargar_sorteos
+from incidencia_tombola import cargar_incidencia
+from markov_tombola import MarkovIncremental, transiciones_del_dia
+from backtest_paralelo_tombola import fila_semana, lista_semanas
+from traza_tombola import Traza
+from salida_incremental_tombola import SalidaIncremental, agregar_argumento_solo_nuevas, configuracion
+from puntajes_tombola import agregar_argumento_puntajes
+
+# ⚙️ Opciones
+parser = argparse.ArgumentParser(description="Predicción semanal con cadena de Markov.")
+agregar_argumento_solo_nuevas(parser)
+agregar_argumento_puntajes(parser)
+args = parser.parse_args()
 
 # 📁 Ruta del archivo
 ruta_archivo = os.path.join("data", "tombola.xlsx")
+csv_path = os.path.join("data", "modelo_markov_tombola.csv")
 
-# 📥 Cargar el archivo
-df = pd.read_excel(ruta_archivo)
-df.dropna(subset=["Numero", "Fecha"], inplace=True)
-df["Fecha"] = pd.to_datetime(df["Fecha"])
-df["Numero"] = df["Numero"].astype(int)
+# ⏱️ Medición por etapas (con TOMBOLA_TRAZA=1)
+traza = Traza(csv_path)
 
-# 🔁 Ordenar por fecha para mantener el orden cronológico
-df = df.sort_values("Fecha")
+# 📥 Cargar los sorteos (ya vienen en orden cronológico)
+with traza.etapa("cargar_datos"):
+    df = cargar_sorteos(ruta_archivo)
+    incidencia = cargar_incidencia(ruta_archivo)
 
-# 🔧 Crear matriz de transición de Markov
-transiciones = defaultdict(list)
-for _, grupo in df.groupby("Fecha"):
-    numeros_dia = grupo["Numero"].tolist()
-    for i in range(len(numeros_dia) - 1):
-        transiciones[numeros_dia[i]].append(numeros_dia[i + 1])
+# 🧾 Con --solo-nuevas solo se predicen las semanas que faltan o cambiaron
+# (las anteriores se consumen igual para armar la matriz, que es barato)
+salida = SalidaIncremental(csv_path, incidencia, configuracion(args), args.solo_nuevas, args.puntajes)
 
-# 🔢 Contar transiciones
-matriz_markov = {num: Counter(siguientes) for num, siguientes in transiciones.items()}
+# 🔧 Transiciones entre números consecutivos del mismo día
+with traza.etapa("construir_features"):
+    fechas_trans, origen, destino = transiciones_del_dia(df)
+fechas_sorteo = df["Fecha"].values.astype("datetime64[D]")
+numeros = df["Numero"].values.astype(np.intp)
 
-# 📅 Generar predicciones semana por semana
+# 📅 Generar predicciones semana por semana, en una sola pasada: la matriz
+# de Markov y la frecuencia global solo incluyen sorteos hasta el fin de
+# cada semana (sin datos futuros)
+markov = MarkovIncremental()
 predicciones_semana = []
-fechas_inicio = pd.date_range(df["Fecha"].min(), df["Fecha"].max(), freq="W-MON")
+consumidas = 0   # transiciones ya agregadas a la matriz
+sorteados = 0    # números ya agregados a la frecuencia global
 
-for inicio in fechas_inicio:
-    fin = inicio + timedelta(days=6)
+for inicio in lista_semanas(fechas_sorteo[0].item(), fechas_sorteo[-1].item()):
+    fin = np.datetime64(inicio + timedelta(days=6), "D")
 
-    # Tomar el último número antes o en la semana actual
-    df_semana = df[df["Fecha"] <= fin]
-    if df_semana.empty:
-        continue
-    ultimo_numero = df_semana.iloc[-1]["Numero"]
+    # Consumir los sorteos de esta semana
+    with traza.etapa("entrenar", semana=inicio):
+        hasta_trans = int(np.searchsorted(fechas_trans, fin, side="right"))
+        hasta_sorteo = int(np.searchsorted(fechas_sorteo, fin, side="right"))
+        markov.consumir(origen[consumidas:hasta_trans], destino[consumidas:hasta_trans],
+                        numeros[sorteados:hasta_sorteo])
+        consumidas, sorteados = hasta_trans, hasta_sorteo
 
-    # Obtener predicciones iniciales (máximo 10) de la matriz Markov
-    if ultimo_numero in matriz_markov:
-        prediccion = [num for num, _ in matriz_markov[ultimo_numero].most_common(10)]
-    else:
-        prediccion = []
+    if sorteados == 0 or not salida.es_pendiente(inicio.strftime("%Y-%m-%d")):
+        continue
 
-    # Completar hasta 10 números usando los más frecuentes globales
-    top_global = df["Numero"].value_counts().index.tolist()
-    for num in top_global:
-        if num not in prediccion:
-            prediccion.append(num)
-        if len(prediccion) == 10:
-            break
+    # Tomar el último número antes o en la semana actual y completar hasta
+    # 10 números con los más frecuentes hasta ese momento
+    with traza.etapa("predecir", semana=inicio):
+        ultimo_numero = numeros[sorteados - 1]
+        prediccion = markov.predecir(ultimo_numero, k=10)
 
-    predicciones_semana.append({
-        "semana_inicio": inicio.date(),
-        "semana_fin": fin.date(),
-        "prediccion": str(prediccion)  # Guardar como lista con corchetes
-    })
+    if args.puntajes:
+        puntajes, orden = markov.puntajes(ultimo_numero)
+        predicciones_semana.append(fila_semana(inicio, str(prediccion), puntajes=puntajes, orden=orden))
+    else:
+        predicciones_semana.append(fila_semana(inicio, str(prediccion)))  # Guardar como lista con corchetes
 
 # 💾 Guardar en CSV
-csv_path = os.path.join("data", "modelo_markov_tombola.csv")
-pd.DataFrame(predicciones_semana).to_csv(csv_path, index=False)
+with traza.etapa("guardar_csv"):
+    salida.guardar(predicciones_semana)
 
 # 📤 Mostrar última predicción
-print("📅 Última predicción generada:")
-print(predicciones_semana[-1])
+print(f"🧾 Semanas calculadas: {len(predicciones_semana)}")
+if predicciones_semana:
+    print("📅 Última predicción generada:")
+    print({clave: valor for clave, valor in predicciones_semana[-1].items() if clave != "puntajes"})
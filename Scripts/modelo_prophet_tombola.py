@@ -1,101 +1,230 @@
 # 📦 Importaciones
 import pandas as pd
+import numpy as np
+import prophet
 from prophet import Prophet
 import os
 import logging
 import warnings
-from datetime import datetime, timedelta
+import argparse
+import time
+from datetime import timedelta
+from incidencia_tombola import cargar_incidencia
+from backtest_paralelo_tombola import (EjecutorTareas, agregar_argumento_trabajadores, ejecutar_semanas,
+                                       fila_semana, lista_semanas)
+from traza_tombola import Traza
+from cache_modelos_tombola import CacheModelos, agregar_argumento_cache
+from puntajes_tombola import agregar_argumento_puntajes
+from salida_incremental_tombola import SalidaIncremental, agregar_argumento_solo_nuevas, configuracion
 
 # 🔕 Silenciar logs
 logging.getLogger("cmdstanpy").setLevel(logging.CRITICAL)
 logging.getLogger("prophet").setLevel(logging.CRITICAL)
 warnings.filterwarnings("ignore")
 
+# ⚙️ Opciones
+parser = argparse.ArgumentParser(description="Predicción semanal con Prophet por número.")
+parser.add_argument("--warm-start", action="store_true",
+                    help="Recorrer las semanas en orden, iniciando cada ajuste con los parámetros de la "
+                         "semana anterior y repartiendo los 100 números entre los trabajadores.")
+agregar_argumento_trabajadores(parser)
+agregar_argumento_solo_nuevas(parser)
+agregar_argumento_cache(parser)
+agregar_argumento_puntajes(parser)
+args = parser.parse_args()
+
 # 📁 Rutas
 ruta_archivo = os.path.join("data", "tombola.xlsx")
 ruta_csv = os.path.join("data", "modelo_prophet_tombola.csv")
+ruta_tiempos = os.path.join("data", "modelo_prophet_tombola_tiempos.csv")
+
+# ⏱️ Medición por etapas (con TOMBOLA_TRAZA=1)
+traza = Traza(ruta_csv)
 
 # 📥 Cargar datos
 try:
-    df = pd.read_excel(ruta_archivo)
+    with traza.etapa("cargar_datos"):
+        incidencia = cargar_incidencia(ruta_archivo)
     print("✅ Archivo cargado correctamente.")
 except FileNotFoundError:
     print("❌ Error: archivo no encontrado.")
     exit()
 
-# 🧹 Preprocesamiento
-df.dropna(subset=["Numero", "Fecha"], inplace=True)
-df["Fecha"] = pd.to_datetime(df["Fecha"])
-df["Numero"] = df["Numero"].astype(int)
-
 # 📅 Definir el rango de semanas
-fecha_inicio = df["Fecha"].min().date()
-fecha_fin = df["Fecha"].max().date()
-inicio_primera_semana = fecha_inicio - timedelta(days=fecha_inicio.weekday())
+fecha_inicio = incidencia.fechas[0].item()
+fecha_fin = incidencia.fechas[-1].item()
+fechas_sorteo = incidencia.fechas_pandas()
 
-# 📦 Resultados semanales
-resultados = []
 
-fecha_actual = inicio_primera_semana
-while fecha_actual <= fecha_fin:
-    inicio_semana = fecha_actual
-    fin_semana = inicio_semana + timedelta(days=6)
-    fin_semana_dt = datetime.combine(fin_semana, datetime.min.time())
-    
-    # 🔍 Filtrar datos hasta el fin de la semana
-    df_hist = df[df["Fecha"] <= fin_semana_dt]
-    
-    if df_hist.empty:
-        resultados.append({
-            "semana_inicio": inicio_semana.strftime('%Y-%m-%d'),
-            "semana_fin": fin_semana.strftime('%Y-%m-%d'),
-            "prediccion": ""
-        })
-        fecha_actual += timedelta(days=7)
-        continue
+def parametros_iniciales(modelo):
+    """Parámetros ajustados de un Prophet en el formato de init de Stan."""
+    init = {}
+    for nombre in ["k", "m", "sigma_obs"]:
+        init[nombre] = modelo.params[nombre][0][0]
+    for nombre in ["delta", "beta"]:
+        init[nombre] = modelo.params[nombre][0]
+    return init
 
-    # 🔮 Modelar con Prophet para cada número
-    promedios_yhat = {}
-    
-    for numero in range(100):
-        df_num = df_hist.copy()
-        df_num["y"] = (df_num["Numero"] == numero).astype(int)
-        df_num = df_num.groupby("Fecha").agg({"y": "sum"}).reset_index()
-        df_num.rename(columns={"Fecha": "ds"}, inplace=True)
 
-        if df_num["y"].sum() < 3:
-            continue  # muy pocos datos
+def _init_compatible(init, n_dias):
+    """El init sirve si la cantidad de changepoints (que crece con la historia hasta 25) no cambió."""
+    tam_historia = int(n_dias * 0.8)
+    n_changepoints = max(min(25, tam_historia - 1), 1)
+    return len(init["delta"]) == n_changepoints
 
-        try:
-            modelo = Prophet(daily_seasonality=True, weekly_seasonality=True, yearly_seasonality=False)
-            modelo.fit(df_num)
 
-            futuro = modelo.make_future_dataframe(periods=6)
-            pred = modelo.predict(futuro)
+def _ajustar_prophet(df_num, init):
+    modelo = Prophet(daily_seasonality=True, weekly_seasonality=True, yearly_seasonality=False)
+    if init is None:
+        modelo.fit(df_num)
+    else:
+        modelo.fit(df_num, init=init)
+    return modelo
+
+
+# 🗄️ Ajustes ya hechos con los mismos datos y el mismo init
+cache = CacheModelos("prophet", {"daily_seasonality": True, "weekly_seasonality": True,
+                                 "yearly_seasonality": False, "periodos": 6, "prophet": prophet.__version__},
+                     incidencia, args.cache_mb)
+
+
+def ajustar_numero(tarea):
+    """
+    Ajusta el Prophet de un número con los primeros n_dias días de sorteo.
+    tarea = (numero, n_dias, init o None). Si el init de la semana anterior no
+    es compatible (por ejemplo, cambió la cantidad de changepoints) se ajusta
+    en frío. Devuelve (numero, promedio de yhat a 6 días, init para la semana
+    siguiente, segundos de ajuste, si se usó init); yhat es None si no se
+    pudo ajustar. Un ajuste sacado de la caché informa los segundos del
+    ajuste original.
+    """
+    numero, n_dias, init = tarea
+    clave = cache.clave(n_dias, numero=numero, init=init)
+    guardado = cache.leer(clave)
+    if guardado is not None:
+        return guardado["ajuste"]
+    with traza.etapa("ajuste", numero=numero, dias=n_dias):
+        ajuste = _ajustar_numero(tarea)
+    cache.guardar(clave, ajuste=ajuste)
+    return ajuste
+
+
+def _ajustar_numero(tarea):
+    numero, n_dias, init = tarea
+    if init is not None and not _init_compatible(init, n_dias):
+        init = None
+    df_num = pd.DataFrame({
+        "ds": fechas_sorteo[:n_dias],
+        "y": incidencia.conteos[:n_dias, numero].astype(int)
+    })
 
-            yhat_promedio = pred.tail(6)["yhat"].mean()
-            promedios_yhat[numero] = yhat_promedio
+    if df_num["y"].sum() < 3:
+        return numero, None, None, 0.0, False  # muy pocos datos
+
+    inicio = time.perf_counter()
+    try:
+        try:
+            modelo = _ajustar_prophet(df_num, init)
         except:
-            continue
+            if init is None:
+                raise
+            init = None
+            modelo = _ajustar_prophet(df_num, None)
 
-    # 📊 Top 10 de esa semana
-    if promedios_yhat:
-        top10 = sorted(promedios_yhat, key=promedios_yhat.get, reverse=True)[:10]
-        prediccion = str(top10)
-    else:
-        prediccion = ""
+        futuro = modelo.make_future_dataframe(periods=6)
+        pred = modelo.predict(futuro)
+        yhat_promedio = pred.tail(6)["yhat"].mean()
+        return numero, yhat_promedio, parametros_iniciales(modelo), time.perf_counter() - inicio, init is not None
+    except:
+        return numero, None, None, time.perf_counter() - inicio, False
 
-    # 💾 Guardar resultados
-    resultados.append({
-        "semana_inicio": inicio_semana.strftime('%Y-%m-%d'),
-        "semana_fin": fin_semana.strftime('%Y-%m-%d'),
-        "prediccion": prediccion
-    })
 
-    # ➡️ Avanzar una semana
-    fecha_actual += timedelta(days=7)
+def fila_ajustes(inicio_semana, ajustes):
+    """Fila semanal con el top 10 por yhat medio y el yhat medio de cada número."""
+    promedios_yhat = {numero: yhat for numero, yhat, *_ in ajustes if yhat is not None}
+    orden = sorted(promedios_yhat, key=promedios_yhat.get, reverse=True)
+    puntajes = np.full(100, np.nan)
+    puntajes[list(promedios_yhat)] = list(promedios_yhat.values())
+    return fila_semana(inicio_semana, str(orden[:10]) if orden else "", puntajes=puntajes, orden=orden)
+
+
+def predecir_semana(inicio_semana):
+    """Ajusta un Prophet por número con los datos hasta el fin de la semana y devuelve el top 10."""
+    with traza.etapa("semana", semana=inicio_semana):
+        return _predecir_semana(inicio_semana)
+
 
-# 📤 Guardar archivo CSV
-df_resultado = pd.DataFrame(resultados)
-df_resultado.to_csv(ruta_csv, index=False)
-print(f"\n✅ Resultados semanales guardados en '{ruta_csv}'")
+def _predecir_semana(inicio_semana):
+    fin_semana = inicio_semana + timedelta(days=6)
+
+    # 🔍 Días de sorteo hasta el fin de la semana
+    n_dias = incidencia.dias_hasta(fin_semana)
+    if n_dias == 0:
+        return fila_semana(inicio_semana, "")
+
+    # 🔮 Modelar con Prophet para cada número
+    ajustes = [ajustar_numero((numero, n_dias, None)) for numero in range(100)]
+    return fila_ajustes(inicio_semana, ajustes)
+
+
+def predecir_con_warm_start(semanas, trabajadores):
+    """
+    Recorre las semanas en orden, reparte los 100 ajustes de cada semana
+    entre los trabajadores e inicia cada uno con los parámetros de ese número
+    en la semana anterior. Devuelve (resultados, tiempos por número).
+    """
+    resultados = []
+    tiempos = []
+    inits = {}
+    with EjecutorTareas(trabajadores) as ejecutor:
+        for inicio_semana in semanas:
+            n_dias = incidencia.dias_hasta(inicio_semana + timedelta(days=6))
+            if n_dias == 0:
+                resultados.append(fila_semana(inicio_semana, ""))
+                continue
+
+            with traza.etapa("semana", semana=inicio_semana):
+                tareas = [(numero, n_dias, inits.get(numero)) for numero in range(100)]
+                ajustes = ejecutor.map(ajustar_numero, tareas)
+                for numero, yhat, init, segundos, uso_init in ajustes:
+                    if yhat is None and segundos == 0.0:
+                        continue  # número sin datos suficientes, no se ajustó
+                    tiempos.append({
+                        "semana_inicio": inicio_semana.strftime('%Y-%m-%d'),
+                        "numero": numero,
+                        "warm_start": uso_init,
+                        "segundos": round(segundos, 4)
+                    })
+                    if init is not None:
+                        inits[numero] = init
+                resultados.append(fila_ajustes(inicio_semana, ajustes))
+    return resultados, tiempos
+
+
+if __name__ == "__main__":
+    # 🧾 Con --solo-nuevas se calculan solo las semanas que faltan o cambiaron
+    # (con --warm-start, la cadena de ajustes arranca en frío en la primera de ellas)
+    salida = SalidaIncremental(ruta_csv, incidencia, configuracion(args), args.solo_nuevas, args.puntajes)
+    semanas = salida.pendientes(lista_semanas(fecha_inicio, fecha_fin))
+
+    # 📦 Resultados semanales (en orden de semana, en serie o en paralelo)
+    if args.warm_start:
+        with traza.etapa("backtest"):
+            resultados, tiempos = predecir_con_warm_start(semanas, args.trabajadores)
+
+        # ⏱️ Tiempo de ajuste por número y semana
+        df_tiempos = pd.DataFrame(tiempos, columns=["semana_inicio", "numero", "warm_start", "segundos"])
+        df_tiempos.to_csv(ruta_tiempos, index=False)
+        resumen = df_tiempos.groupby("warm_start")["segundos"].agg(["count", "mean", "sum"])
+        print("⏱️ Tiempo de ajuste por número (segundos):")
+        print(resumen.to_string())
+        print(f"⏱️ Detalle guardado en '{ruta_tiempos}'")
+    else:
+        with traza.etapa("backtest"):
+            resultados = ejecutar_semanas(predecir_semana, semanas, args.trabajadores)
+
+    # 📤 Guardar archivo CSV
+    with traza.etapa("guardar_csv"):
+        salida.guardar(resultados)
+    cache.recortar()
+    print(f"\n✅ {len(resultados)} semanas calculadas; resultados semanales guardados en '{ruta_csv}'")
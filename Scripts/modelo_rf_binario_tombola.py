@@ -1,115 +1,114 @@
 # 📦 Importaciones
 import pandas as pd
 import os
+import argparse
+import sklearn
 from datetime import datetime, timedelta
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 
 from sklearn.metrics import classification_report, accuracy_score
+from incidencia_tombola import cargar_incidencia
+from features_binarias_tombola import construir_tabla_binaria
+from backtest_paralelo_tombola import agregar_argumento_trabajadores, ejecutar_semanas, fila_semana, lista_semanas
+from traza_tombola import Traza
+from salida_incremental_tombola import SalidaIncremental, agregar_argumento_solo_nuevas, configuracion
+from cache_modelos_tombola import CacheModelos, agregar_argumento_cache
+from puntajes_tombola import agregar_argumento_puntajes
+
+# ⚙️ Opciones
+parser = argparse.ArgumentParser(description="Predicción semanal con Random Forest binario.")
+agregar_argumento_trabajadores(parser)
+agregar_argumento_solo_nuevas(parser)
+agregar_argumento_cache(parser)
+agregar_argumento_puntajes(parser)
+args = parser.parse_args()
 
 # 📁 Ruta
 ruta_excel = os.path.join("data", "tombola.xlsx")
 ruta_salida = os.path.join("data", "modelo_rf_binario_tombola.csv")
 
+# ⏱️ Medición por etapas (con TOMBOLA_TRAZA=1)
+traza = Traza(ruta_salida)
+
 # 📥 Cargar datos
 try:
-    df = pd.read_excel(ruta_excel)
+    with traza.etapa("cargar_datos"):
+        incidencia = cargar_incidencia(ruta_excel)
     print("✅ Archivo cargado correctamente.")
 except FileNotFoundError:
     print("❌ Error: archivo no encontrado.")
     exit()
 
-# 🧹 Preprocesamiento
-df.dropna(subset=["Fecha", "Numero"], inplace=True)
-df["Fecha"] = pd.to_datetime(df["Fecha"], errors='coerce')
-df.dropna(subset=["Fecha"], inplace=True)
+# 🧱 Dataset binario completo (una fila por día y número); la frecuencia
+# pasada cuenta los días en que el número salió antes de cada fila
+with traza.etapa("construir_features"):
+    tabla = construir_tabla_binaria(incidencia, contar_repeticiones=False)
 
-# 🧱 Dataset binario
-todos_los_numeros = list(range(100))
-fechas = sorted(df["Fecha"].dt.date.unique())
+# 🗄️ Probabilidades ya calculadas para los mismos datos e hiperparámetros
+cache = CacheModelos("rf", {"n_estimators": 100, "random_state": 42, "test_size": 0.2,
+                            "contar_repeticiones": False, "sklearn": sklearn.__version__},
+                     incidencia, args.cache_mb)
 
-datos_binarios = []
-for fecha in fechas:
-    numeros_dia = df[df["Fecha"].dt.date == fecha]["Numero"].tolist()
-    for numero in todos_los_numeros:
-        datos_binarios.append({
-            "fecha": fecha,
-            "numero": numero,
-            "salio": 1 if numero in numeros_dia else 0,
-            "dia_semana": pd.Timestamp(fecha).weekday()
-        })
+# 📅 Lógica de semanas
+fecha_inicio = incidencia.fechas[0].item()
+fecha_fin = incidencia.fechas[-1].item()
 
-df_binario = pd.DataFrame(datos_binarios)
 
-# 📅 Lógica de semanas
-fecha_inicio = df["Fecha"].min().date()
-fecha_fin = df["Fecha"].max().date()
-inicio_primera_semana = fecha_inicio - timedelta(days=fecha_inicio.weekday())
+def predecir_semana(inicio_semana):
+    """Entrena con los datos hasta el fin de la semana y predice la siguiente."""
+    with traza.etapa("semana", semana=inicio_semana):
+        return _predecir_semana(inicio_semana)
 
-# 📦 Resultados
-resultados = []
 
-fecha_actual = inicio_primera_semana
-while fecha_actual <= fecha_fin:
-    inicio_semana = fecha_actual
+def _predecir_semana(inicio_semana):
     fin_semana = inicio_semana + timedelta(days=6)
     siguiente_semana = fin_semana + timedelta(days=1)
 
-    # Datos hasta fin de semana actual
-    df_hist = df_binario[df_binario["fecha"] <= fin_semana]
-
-    if df_hist.empty:
-        resultados.append({
-            "semana_inicio": inicio_semana.strftime("%Y-%m-%d"),
-            "semana_fin": fin_semana.strftime("%Y-%m-%d"),
-            "prediccion": ""
-        })
-        fecha_actual += timedelta(days=7)
-        continue
-
-    # Frecuencia acumulada
-    frecuencia_historica = {num: 0 for num in todos_los_numeros}
-    frecuencias = []
-    for _, fila in df_hist.iterrows():
-        num = fila["numero"]
-        frecuencias.append(frecuencia_historica[num])
-        if fila["salio"] == 1:
-            frecuencia_historica[num] += 1
-    df_hist["frecuencia_pasada"] = frecuencias
-
-    # Entrenamiento
-    X = df_hist[["numero", "dia_semana", "frecuencia_pasada"]]
-    y = df_hist["salio"]
+    # Días de sorteo hasta fin de semana actual
+    n_dias = incidencia.dias_hasta(fin_semana)
+    if n_dias == 0:
+        return fila_semana(inicio_semana, "")
+
+    # Entrenamiento (rebanada de la tabla precomputada)
+    X, y = tabla.hasta(n_dias)
     if y.nunique() < 2:
-        prediccion = ""
+        return fila_semana(inicio_semana, "")
+
+    # Día de inicio de la próxima semana
+    dia_pred = pd.Timestamp(siguiente_semana).weekday()
+    X_pred = tabla.X_prediccion(n_dias, dia_pred)
+
+    clave = cache.clave(n_dias, dia_pred=dia_pred)
+    guardado = cache.leer(clave)
+    if guardado is not None:
+        probas = guardado["probas"]
     else:
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        modelo = RandomForestClassifier(n_estimators=100, random_state=42)
-        modelo.fit(X_train, y_train)
-
-        # Día de inicio de la próxima semana
-        dia_pred = pd.Timestamp(siguiente_semana).weekday()
-        X_pred = pd.DataFrame({
-            "numero": todos_los_numeros,
-            "dia_semana": [dia_pred] * 100,
-            "frecuencia_pasada": [frecuencia_historica[num] for num in todos_los_numeros]
-        })
-
-        probas = modelo.predict_proba(X_pred)[:, 1]
-        X_pred["probabilidad_salir"] = probas
-
-        top10 = X_pred.sort_values(by="probabilidad_salir", ascending=False).head(10)
-        prediccion = str(top10["numero"].tolist())
-
-    resultados.append({
-        "semana_inicio": inicio_semana.strftime("%Y-%m-%d"),
-        "semana_fin": fin_semana.strftime("%Y-%m-%d"),
-        "prediccion": prediccion
-    })
-
-    fecha_actual += timedelta(days=7)
-
-# 💾 Guardar CSV
-df_resultado = pd.DataFrame(resultados)
-df_resultado.to_csv(ruta_salida, index=False)
-print(f"\n✅ Resultados guardados en: {ruta_salida}")
+        with traza.etapa("entrenar", semana=inicio_semana):
+            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+            modelo = RandomForestClassifier(n_estimators=100, random_state=42)
+            modelo.fit(X_train, y_train)
+
+        with traza.etapa("predecir", semana=inicio_semana):
+            probas = modelo.predict_proba(X_pred)[:, 1]
+        cache.guardar(clave, probas=probas)
+    X_pred["probabilidad_salir"] = probas
+
+    orden = X_pred.sort_values(by="probabilidad_salir", ascending=False)["numero"].to_numpy()
+    return fila_semana(inicio_semana, str(orden[:10].tolist()), puntajes=probas, orden=orden)
+
+
+if __name__ == "__main__":
+    # 🧾 Con --solo-nuevas se calculan solo las semanas que faltan o cambiaron
+    salida = SalidaIncremental(ruta_salida, incidencia, configuracion(args), args.solo_nuevas, args.puntajes)
+    semanas = salida.pendientes(lista_semanas(fecha_inicio, fecha_fin))
+
+    # 📦 Resultados (en orden de semana, en serie o en paralelo)
+    with traza.etapa("backtest"):
+        resultados = ejecutar_semanas(predecir_semana, semanas, args.trabajadores)
+
+    # 💾 Guardar CSV
+    with traza.etapa("guardar_csv"):
+        salida.guardar(resultados)
+    cache.recortar()
+    print(f"\n✅ {len(resultados)} semanas calculadas; resultados guardados en: {ruta_salida}")
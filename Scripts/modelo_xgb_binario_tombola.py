@@ -1,119 +1,151 @@
 # 📦 Importaciones
-import pandas as pd
 import os
+import argparse
+import xgboost
 from xgboost import XGBClassifier
 from sklearn.model_selection import train_test_split
-from datetime import datetime, timedelta
+from datetime import timedelta
+from incidencia_tombola import cargar_incidencia
+from features_binarias_tombola import construir_tabla_binaria
+from boosting_incremental_tombola import BoostingIncremental
+from backtest_paralelo_tombola import agregar_argumento_trabajadores, ejecutar_semanas, fila_semana, lista_semanas
+from traza_tombola import Traza
+from cache_modelos_tombola import CacheModelos, agregar_argumento_cache
+from puntajes_tombola import agregar_argumento_puntajes
+from salida_incremental_tombola import SalidaIncremental, agregar_argumento_solo_nuevas, configuracion
+
+# ⚙️ Opciones
+parser = argparse.ArgumentParser(description="Predicción semanal con clasificación binaria.")
+parser.add_argument("--incremental", action="store_true",
+                    help="Continuar el booster de la semana anterior en lugar de reentrenar desde cero.")
+parser.add_argument("--arboles-por-semana", type=int, default=10,
+                    help="Árboles agregados por semana en modo incremental.")
+parser.add_argument("--refit-cada", type=int, default=13,
+                    help="Semanas entre reajustes completos en modo incremental (0 = solo el primero).")
+agregar_argumento_trabajadores(parser)
+agregar_argumento_solo_nuevas(parser)
+agregar_argumento_cache(parser)
+agregar_argumento_puntajes(parser)
+args = parser.parse_args()
+if args.incremental and args.trabajadores != 1:
+    parser.error("--incremental encadena las semanas y no admite --trabajadores distinto de 1.")
 
 # 📁 Rutas
 ruta_excel = os.path.join("data", "tombola.xlsx")
 ruta_csv = os.path.join("data", "modelo_xgb_binario_tombola.csv")
 
+# ⏱️ Medición por etapas (con TOMBOLA_TRAZA=1)
+traza = Traza(ruta_csv)
+
 # 📥 Cargar datos
 try:
-    df = pd.read_excel(ruta_excel)
+    with traza.etapa("cargar_datos"):
+        incidencia = cargar_incidencia(ruta_excel)
     print("✅ Archivo cargado correctamente.")
 except FileNotFoundError:
     print("❌ Error: archivo no encontrado.")
     exit()
 
-# 🧹 Preprocesamiento inicial
-df.dropna(subset=["Fecha", "Numero"], inplace=True)
-df["Fecha"] = pd.to_datetime(df["Fecha"], errors='coerce')
-df.dropna(subset=["Fecha"], inplace=True)
-df["Numero"] = df["Numero"].astype(int)
+# 🧱 Dataset binario completo (una fila por día y número), construido una sola vez
+with traza.etapa("construir_features"):
+    tabla = construir_tabla_binaria(incidencia)
 
 # 🎯 Variables auxiliares
-todos_los_numeros = list(range(0, 100))
-fecha_inicio = df["Fecha"].min().date()
-fecha_fin = df["Fecha"].max().date()
-inicio_primera_semana = fecha_inicio - timedelta(days=fecha_inicio.weekday())
+fecha_inicio = incidencia.fechas[0].item()
+fecha_fin = incidencia.fechas[-1].item()
 
-# 📦 Lista para almacenar resultados semanales
-resultados = []
+# 🗄️ Probabilidades ya calculadas para los mismos datos e hiperparámetros (modo no incremental)
+cache = CacheModelos("xgb", {"n_estimators": 100, "learning_rate": 0.1, "random_state": 42, "test_size": 0.2,
+                             "xgboost": xgboost.__version__},
+                     incidencia, args.cache_mb)
 
-fecha_actual = inicio_primera_semana
-while fecha_actual <= fecha_fin:
-    inicio_semana = fecha_actual
-    fin_semana = inicio_semana + timedelta(days=6)
-    fin_semana_datetime = datetime.combine(fin_semana, datetime.min.time())
-
-    # 📊 Filtrar datos hasta el final de esa semana
-    df_semanal = df[df["Fecha"] <= fin_semana_datetime]
-    if df_semanal.empty:
-        resultados.append({
-            "semana_inicio": inicio_semana.strftime('%Y-%m-%d'),
-            "semana_fin": fin_semana.strftime('%Y-%m-%d'),
-            "prediccion": ""
-        })
-        fecha_actual += timedelta(days=7)
-        continue
-
-    fechas = sorted(df_semanal["Fecha"].dt.date.unique())
-    datos_binarios = []
-    frecuencia_historica = {num: 0 for num in todos_los_numeros}
-
-    # ⚙️ Generar dataset binario histórico
-    for fecha in fechas:
-        numeros_dia = df_semanal[df_semanal["Fecha"].dt.date == fecha]["Numero"].tolist()
-        for numero in todos_los_numeros:
-            datos_binarios.append({
-                "fecha": fecha,
-                "numero": numero,
-                "salio": 1 if numero in numeros_dia else 0,
-                "dia_semana": pd.Timestamp(fecha).weekday(),
-                "frecuencia_pasada": frecuencia_historica[numero]
-            })
-        for num in numeros_dia:
-            frecuencia_historica[num] += 1
-
-    df_binario = pd.DataFrame(datos_binarios)
-
-    # Entrenar modelo
-    X = df_binario[["numero", "dia_semana", "frecuencia_pasada"]]
-    y = df_binario["salio"]
+# 🔁 Modelo que se reutiliza entre semanas en modo incremental
+modelo_incremental = BoostingIncremental("xgb", n_estimators=100, arboles_por_semana=args.arboles_por_semana,
+                                         refit_cada=args.refit_cada, learning_rate=0.1, random_state=42)
 
-    if y.nunique() < 2:
-        print(f"⚠️ Semana {inicio_semana} - No hay variedad de clases para entrenar.")
-        resultados.append({
-            "semana_inicio": inicio_semana.strftime('%Y-%m-%d'),
-            "semana_fin": fin_semana.strftime('%Y-%m-%d'),
-            "prediccion": ""
-        })
-        fecha_actual += timedelta(days=7)
-        continue
 
+def entrenar_desde_cero(n_dias):
+    """Entrena un modelo nuevo con los primeros n_dias días; None si hay una sola clase."""
+    # Dataset binario histórico: rebanada de la tabla precomputada
+    X, y = tabla.hasta(n_dias)
+    if y.nunique() < 2:
+        return None
     X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, shuffle=True, random_state=42)
     modelo = XGBClassifier(n_estimators=100, learning_rate=0.1, use_label_encoder=False, eval_metric='logloss', random_state=42)
     modelo.fit(X_train, y_train)
+    return modelo
+
+
+def orden_numeros(X_pred):
+    """Los 100 números de mayor a menor probabilidad_salir."""
+    return X_pred.sort_values(by="probabilidad_salir", ascending=False)["numero"].to_numpy()
+
+
+def predecir_semana(inicio_semana, incremental=False):
+    """Entrena con los datos hasta el fin de la semana y predice la siguiente."""
+    with traza.etapa("semana", semana=inicio_semana):
+        return _predecir_semana(inicio_semana, incremental)
+
+
+def _predecir_semana(inicio_semana, incremental):
+    fin_semana = inicio_semana + timedelta(days=6)
+
+    # 📊 Días de sorteo hasta el final de esa semana (filas de la matriz de incidencia)
+    n_dias = incidencia.dias_hasta(fin_semana)
+    if n_dias == 0:
+        return fila_semana(inicio_semana, "")
 
     # 🔮 Predecir para la semana siguiente
     siguiente_semana = fin_semana + timedelta(days=1)
     dia_semana = siguiente_semana.weekday()
 
-    X_pred = pd.DataFrame({
-        "numero": todos_los_numeros,
-        "dia_semana": [dia_semana] * 100,
-        "frecuencia_pasada": [frecuencia_historica[num] for num in todos_los_numeros]
-    })
+    X_pred = tabla.X_prediccion(n_dias, dia_semana)
 
-    probas = modelo.predict_proba(X_pred)[:, 1]
-    X_pred["probabilidad_salir"] = probas
-
-    top10 = X_pred.sort_values(by="probabilidad_salir", ascending=False).head(10)
-    mejores_numeros = top10["numero"].tolist()
+    clave = None if incremental else cache.clave(n_dias, dia_pred=dia_semana)
+    guardado = None if incremental else cache.leer(clave)
+    if guardado is not None:
+        X_pred["probabilidad_salir"] = guardado["probas"]
+        orden = orden_numeros(X_pred)
+        return fila_semana(inicio_semana, str(orden[:10].tolist()), puntajes=guardado["probas"], orden=orden)
 
-    # ✅ Guardar predicción semanal
-    resultados.append({
-        "semana_inicio": inicio_semana.strftime('%Y-%m-%d'),
-        "semana_fin": fin_semana.strftime('%Y-%m-%d'),
-        "prediccion": str(mejores_numeros)
-    })
+    # ⚙️ Entrenar modelo
+    with traza.etapa("entrenar", semana=inicio_semana):
+        if incremental:
+            # Continuar el booster anterior con los días nuevos (o reajustar según el calendario)
+            modelo = modelo_incremental if modelo_incremental.actualizar(tabla, n_dias) else None
+        else:
+            modelo = entrenar_desde_cero(n_dias)
 
-    # ➡️ Avanzar a la siguiente semana
-    fecha_actual += timedelta(days=7)
+    if modelo is None:
+        print(f"⚠️ Semana {inicio_semana} - No hay variedad de clases para entrenar.")
+        return fila_semana(inicio_semana, "")
 
-# 💾 Guardar resultados
-df_resultado = pd.DataFrame(resultados)
-df_resultado.to_csv(ruta_csv, index=False)
-print(f"\n✅ Predicciones semanales guardadas en '{ruta_csv}'")
+    with traza.etapa("predecir", semana=inicio_semana):
+        probas = modelo.predict_proba(X_pred)[:, 1]
+    if not incremental:
+        cache.guardar(clave, probas=probas)
+    X_pred["probabilidad_salir"] = probas
+    orden = orden_numeros(X_pred)
+
+    # ✅ Predicción semanal
+    return fila_semana(inicio_semana, str(orden[:10].tolist()), puntajes=probas, orden=orden)
+
+
+if __name__ == "__main__":
+    # 🧾 Con --solo-nuevas se calculan solo las semanas que faltan o cambiaron
+    # (en modo incremental, la cadena de boosters arranca en la primera de ellas)
+    salida = SalidaIncremental(ruta_csv, incidencia, configuracion(args), args.solo_nuevas, args.puntajes)
+    semanas = salida.pendientes(lista_semanas(fecha_inicio, fecha_fin))
+
+    # 📦 Resultados semanales (en orden de semana)
+    with traza.etapa("backtest"):
+        if args.incremental:
+            resultados = [predecir_semana(semana, incremental=True) for semana in semanas]
+        else:
+            resultados = ejecutar_semanas(predecir_semana, semanas, args.trabajadores)
+
+    # 💾 Guardar resultados
+    with traza.etapa("guardar_csv"):
+        salida.guardar(resultados)
+    cache.recortar()
+    print(f"\n✅ {len(resultados)} semanas calculadas; predicciones semanales guardadas en '{ruta_csv}'")
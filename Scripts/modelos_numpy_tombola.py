@@ -0,0 +1,245 @@
+# 📦 Importaciones
+import os
+
+import numpy as np
+
+# 📁 Carpeta de los parámetros exportados (uno .npz por modelo)
+CARPETA_EXPORTADOS = os.path.join("data", "exportados")
+
+
+def ruta_exportado(nombre, carpeta=CARPETA_EXPORTADOS):
+    return os.path.join(carpeta, f"{nombre}.npz")
+
+
+def guardar_npz(ruta, **arreglos):
+    """Guarda los arreglos en un .npz de forma atómica (archivo temporal + reemplazo)."""
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "wb") as f:
+        np.savez(f, **arreglos)
+    os.replace(temporal, ruta)
+
+
+def _metadatos(extra):
+    """Los valores extra (p. ej. el hash de los datos) se guardan con prefijo meta_."""
+    return {f"meta_{nombre}": valor for nombre, valor in extra.items()}
+
+
+def metadatos(ruta):
+    """Valores extra guardados junto a los parámetros, como escalares de Python."""
+    with np.load(ruta) as datos:
+        return {nombre[5:]: datos[nombre].item() for nombre in datos.files if nombre.startswith("meta_")}
+
+
+def _sigmoide(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class LSTMNumpy:
+    """
+    Red Embedding -> LSTM(64) -> Dense(softmax) del modelo LSTM, evaluada
+    solo con NumPy a partir de sus pesos exportados.
+
+    La entrada es un único número codificado (secuencia de largo 1) y el
+    estado inicial es cero, así que el término recurrente no aporta; el
+    kernel recurrente se guarda igual para que el .npz tenga todos los pesos.
+    """
+
+    def __init__(self, embedding, kernel, recurrente, sesgo, denso, sesgo_denso, clases):
+        self.embedding = embedding
+        self.kernel = kernel
+        self.recurrente = recurrente
+        self.sesgo = sesgo
+        self.denso = denso
+        self.sesgo_denso = sesgo_denso
+        self.clases = clases
+
+    @classmethod
+    def desde_keras(cls, modelo, clases):
+        """Toma los pesos de un modelo Keras ya cargado (Embedding, LSTM, Dense)."""
+        embedding, lstm, denso = (capa.get_weights() for capa in modelo.layers)
+        return cls(embedding[0], lstm[0], lstm[1], lstm[2], denso[0], denso[1], np.asarray(clases))
+
+    def probabilidades(self, indices):
+        """Probabilidades del siguiente número para cada índice codificado; forma (n, clases)."""
+        x = self.embedding[np.asarray(indices, dtype=np.intp).ravel()]
+        # Compuertas en el orden de Keras: entrada, olvido, celda, salida
+        i, _, g, o = np.split(x @ self.kernel + self.sesgo, 4, axis=1)
+        celda = _sigmoide(i) * np.tanh(g)  # con estado inicial cero, la compuerta de olvido no actúa
+        h = _sigmoide(o) * np.tanh(celda)
+        logits = h @ self.denso + self.sesgo_denso
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def guardar(self, ruta, **extra):
+        guardar_npz(ruta, embedding=self.embedding, kernel=self.kernel, recurrente=self.recurrente,
+                    sesgo=self.sesgo, denso=self.denso, sesgo_denso=self.sesgo_denso,
+                    clases=self.clases, **_metadatos(extra))
+
+    @classmethod
+    def cargar(cls, ruta):
+        with np.load(ruta) as datos:
+            return cls(*(datos[nombre] for nombre in ("embedding", "kernel", "recurrente", "sesgo",
+                                                      "denso", "sesgo_denso", "clases")))
+
+
+class BosqueNumpy:
+    """
+    Conjunto de árboles de decisión en arreglos planos, evaluado con NumPy.
+
+    - caracteristica (int32): columna que usa cada nodo; -1 en las hojas.
+    - umbral (float64), izquierda / derecha (int32): índices globales de los hijos.
+    - valor (float64): valor de cada hoja.
+    - raices (int32): nodo raíz de cada árbol.
+    - promedio: True si la probabilidad es el promedio de las hojas (Random
+      Forest); False si es sigmoide(margen + suma de las hojas) (boosting).
+    - estricto: True si se va a la izquierda con x < umbral (XGBoost); False con x <= umbral.
+    """
+
+    def __init__(self, caracteristica, umbral, izquierda, derecha, valor, raices, promedio, margen=0.0,
+                 estricto=False):
+        self.caracteristica = caracteristica
+        self.umbral = umbral
+        self.izquierda = izquierda
+        self.derecha = derecha
+        self.valor = valor
+        self.raices = raices
+        self.promedio = bool(promedio)
+        self.margen = float(margen)
+        self.estricto = bool(estricto)
+
+    @classmethod
+    def _desde_nodos(cls, arboles, **kwargs):
+        """Une árboles dados como listas de (caracteristica, umbral, izquierda, derecha, valor) con índices locales."""
+        columnas = [[], [], [], [], []]
+        raices = []
+        desplazamiento = 0
+        for nodos in arboles:
+            raices.append(desplazamiento)
+            caract, umbral, izq, der, valor = (np.asarray(c) for c in zip(*nodos))
+            hoja = caract < 0
+            for columna, arreglo in zip(columnas, (caract, umbral,
+                                                   np.where(hoja, 0, izq + desplazamiento),
+                                                   np.where(hoja, 0, der + desplazamiento), valor)):
+                columna.append(arreglo)
+            desplazamiento += len(nodos)
+        caract, umbral, izq, der, valor = (np.concatenate(c) for c in columnas)
+        return cls(caract.astype(np.int32), umbral.astype(np.float64), izq.astype(np.int32),
+                   der.astype(np.int32), valor.astype(np.float64), np.array(raices, dtype=np.int32), **kwargs)
+
+    @classmethod
+    def desde_sklearn(cls, modelo):
+        """Desde un RandomForestClassifier binario ya entrenado."""
+        clase = int(np.flatnonzero(modelo.classes_ == 1)[0])
+        arboles = []
+        for estimador in modelo.estimators_:
+            t = estimador.tree_
+            valor = t.value[:, 0, :]
+            proba = valor[:, clase] / valor.sum(axis=1)
+            arboles.append(list(zip(t.feature, t.threshold, t.children_left, t.children_right, proba)))
+        return cls._desde_nodos(arboles, promedio=True)
+
+    @classmethod
+    def desde_xgboost(cls, modelo, X_referencia):
+        """Desde un XGBClassifier binario; el margen base se mide sobre X_referencia."""
+        tabla = modelo.get_booster().trees_to_dataframe()
+        columnas = {nombre: i for i, nombre in enumerate(modelo.get_booster().feature_names)}
+        local = lambda id_nodo: int(id_nodo.split("-")[1])
+        arboles = []
+        for _, nodos_arbol in tabla.groupby("Tree", sort=True):
+            nodos = [(-1, 0.0, 0, 0, 0.0)] * (int(nodos_arbol["Node"].max()) + 1)
+            for fila in nodos_arbol.itertuples(index=False):
+                if fila.Feature == "Leaf":
+                    nodos[fila.Node] = (-1, 0.0, 0, 0, fila.Gain)
+                else:
+                    nodos[fila.Node] = (columnas[fila.Feature], fila.Split, local(fila.Yes), local(fila.No), 0.0)
+            arboles.append(nodos)
+        bosque = cls._desde_nodos(arboles, promedio=False, estricto=True)
+        bosque.margen = float(np.mean(modelo.predict(X_referencia, output_margin=True)
+                                      - bosque.suma_hojas(X_referencia)))
+        return bosque
+
+    @classmethod
+    def desde_lightgbm(cls, modelo, X_referencia):
+        """Desde un LGBMClassifier binario; el margen base se mide sobre X_referencia."""
+        arboles = []
+        for info in modelo.booster_.dump_model()["tree_info"]:
+            nodos = []
+            pendientes = [(info["tree_structure"], None, None)]
+            while pendientes:
+                nodo, padre, lado = pendientes.pop()
+                indice = len(nodos)
+                if padre is not None:
+                    nodos[padre][lado] = indice
+                if "leaf_value" in nodo:
+                    nodos.append([-1, 0.0, 0, 0, nodo["leaf_value"]])
+                else:
+                    nodos.append([nodo["split_feature"], nodo["threshold"], 0, 0, 0.0])
+                    pendientes.append((nodo["right_child"], indice, 3))
+                    pendientes.append((nodo["left_child"], indice, 2))
+            arboles.append(nodos)
+        bosque = cls._desde_nodos(arboles, promedio=False)
+        bosque.margen = float(np.mean(modelo.predict(X_referencia, raw_score=True)
+                                      - bosque.suma_hojas(X_referencia)))
+        return bosque
+
+    def hojas(self, X):
+        """Índice de la hoja a la que llega cada fila en cada árbol; forma (árboles, filas)."""
+        X = np.asarray(X, dtype=np.float64)
+        filas = np.broadcast_to(np.arange(len(X)), (len(self.raices), len(X)))
+        nodo = np.repeat(self.raices[:, None], len(X), axis=1)
+        while True:
+            caract = self.caracteristica[nodo]
+            internos = caract >= 0
+            if not internos.any():
+                return nodo
+            x = X[filas, np.maximum(caract, 0)]
+            izquierda = x < self.umbral[nodo] if self.estricto else x <= self.umbral[nodo]
+            siguiente = np.where(izquierda, self.izquierda[nodo], self.derecha[nodo])
+            nodo = np.where(internos, siguiente, nodo)
+
+    def suma_hojas(self, X):
+        return self.valor[self.hojas(X)].sum(axis=0)
+
+    def predict_proba(self, X):
+        """Probabilidad de la clase 1 para cada fila de X (columnas en el orden de entrenamiento)."""
+        if self.promedio:
+            return self.valor[self.hojas(X)].mean(axis=0)
+        return _sigmoide(self.margen + self.suma_hojas(X))
+
+    def guardar(self, ruta, **extra):
+        guardar_npz(ruta, caracteristica=self.caracteristica, umbral=self.umbral, izquierda=self.izquierda,
+                    derecha=self.derecha, valor=self.valor, raices=self.raices, promedio=self.promedio,
+                    margen=self.margen, estricto=self.estricto, **_metadatos(extra))
+
+    @classmethod
+    def cargar(cls, ruta):
+        with np.load(ruta) as datos:
+            return cls(datos["caracteristica"], datos["umbral"], datos["izquierda"], datos["derecha"],
+                       datos["valor"], datos["raices"], datos["promedio"].item(), datos["margen"].item(),
+                       datos["estricto"].item())
+
+
+class ConteoNumpy:
+    """
+    Regresión de conteo (Poisson o Binomial Negativa, enlace log) con
+    variables [constante, Numero, dia_semana]: conteo esperado = exp(X @ coeficientes).
+    """
+
+    def __init__(self, coeficientes):
+        self.coeficientes = np.asarray(coeficientes, dtype=np.float64)
+
+    def predecir(self, numero, dia_semana):
+        numero, dia_semana = np.broadcast_arrays(np.asarray(numero, dtype=np.float64),
+                                                 np.asarray(dia_semana, dtype=np.float64))
+        constante, b_numero, b_dia = self.coeficientes
+        return np.exp(constante + b_numero * numero + b_dia * dia_semana)
+
+    def guardar(self, ruta, **extra):
+        guardar_npz(ruta, coeficientes=self.coeficientes, **_metadatos(extra))
+
+    @classmethod
+    def cargar(cls, ruta):
+        with np.load(ruta) as datos:
+            return cls(datos["coeficientes"])
+
@@ -0,0 +1,217 @@
+# 📦 Importaciones (solo NumPy y pandas: TensorFlow, scikit-learn, XGBoost y
+# LightGBM se importan dentro de las funciones de entrenamiento)
+import argparse
+import os
+import subprocess
+import sys
+import time
+from datetime import timedelta
+
+import numpy as np
+
+from datos_tombola import RUTA_EXCEL, cargar_sorteos, clave_archivo
+from incidencia_tombola import N_NUMEROS, cargar_incidencia
+from conteo_glm_tombola import GLMConteo, conteos_por_dia
+from features_binarias_tombola import construir_tabla_binaria
+from frecuencia_tombola import top_k
+from modelos_numpy_tombola import BosqueNumpy, ConteoNumpy, LSTMNumpy, metadatos, ruta_exportado
+
+# 📁 Rutas
+CARPETA_SCRIPTS = os.path.dirname(os.path.abspath(__file__))
+RUTA_MODELO_LSTM = os.path.join("data", "modelo_lstm_tombola.h5")
+RUTA_CLASES_LSTM = os.path.join("data", "modelo_lstm_tombola_clases.npy")
+
+# 🗂️ Modelos servidos y librerías que la predicción no debe importar
+MODELOS = ("lstm", "rf", "xgb", "lgb", "poisson", "binomial_negativa")
+PESADAS = ("tensorflow", "keras", "prophet", "statsmodels", "sklearn", "xgboost", "lightgbm")
+
+
+def pesadas_importadas():
+    return [modulo for modulo in PESADAS if modulo in sys.modules]
+
+
+def clave_origen(nombre, ruta_excel=RUTA_EXCEL):
+    """Hash de lo que define los parámetros: el .h5 para el LSTM, el Excel para el resto."""
+    return clave_archivo(RUTA_MODELO_LSTM if nombre == "lstm" else ruta_excel)
+
+
+# --- Entrenamiento / exportación (importa las librerías pesadas) ---
+
+def exportar_lstm():
+    """Pesos del LSTM guardado en data/modelo_lstm_tombola.h5."""
+    if not os.path.exists(RUTA_MODELO_LSTM):
+        raise FileNotFoundError(RUTA_MODELO_LSTM)
+    from tensorflow.keras.models import load_model
+    return LSTMNumpy.desde_keras(load_model(RUTA_MODELO_LSTM, compile=False), np.load(RUTA_CLASES_LSTM))
+
+
+def entrenar_arboles(nombre, incidencia):
+    """
+    Entrena el clasificador binario con todos los días de sorteo y los mismos
+    hiperparámetros que su script semanal (equivale al modelo de la última semana).
+    """
+    from sklearn.model_selection import train_test_split
+
+    tabla = construir_tabla_binaria(incidencia, contar_repeticiones=nombre != "rf")
+    X, y = tabla.hasta(incidencia.n_dias)
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, shuffle=True, random_state=42)
+    X_referencia = tabla.X_prediccion(incidencia.n_dias, 0)
+
+    if nombre == "rf":
+        from sklearn.ensemble import RandomForestClassifier
+        modelo = RandomForestClassifier(n_estimators=100, random_state=42)
+        modelo.fit(X_train, y_train)
+        return BosqueNumpy.desde_sklearn(modelo)
+    if nombre == "xgb":
+        from xgboost import XGBClassifier
+        modelo = XGBClassifier(n_estimators=100, learning_rate=0.1, eval_metric='logloss', random_state=42)
+        modelo.fit(X_train, y_train)
+        return BosqueNumpy.desde_xgboost(modelo, X_referencia)
+    import lightgbm as lgb
+    modelo = lgb.LGBMClassifier(n_estimators=100, learning_rate=0.1, random_state=42, verbose=-1)
+    modelo.fit(X_train, y_train)
+    return BosqueNumpy.desde_lightgbm(modelo, X_referencia)
+
+
+def entrenar_conteo(nombre, incidencia):
+    """Ajusta la regresión de conteo de su script (Numero y dia_semana, con constante) con GLMConteo."""
+    glm = GLMConteo(nombre)
+    if not glm.ajustar(conteos_por_dia(incidencia.conteos, incidencia.dia_semana)):
+        raise ValueError("No hay sorteos para ajustar la regresión de conteo.")
+    return ConteoNumpy(glm.coeficientes)
+
+
+def entrenar(nombre, incidencia):
+    """Entrena (o exporta) el modelo y guarda sus parámetros en data/exportados/."""
+    if nombre == "lstm":
+        parametros = exportar_lstm()
+    elif nombre in ("rf", "xgb", "lgb"):
+        parametros = entrenar_arboles(nombre, incidencia)
+    else:
+        parametros = entrenar_conteo(nombre, incidencia)
+    parametros.guardar(ruta_exportado(nombre), clave=clave_origen(nombre))
+
+
+# --- Predicción (solo NumPy) ---
+
+def proximo_dia_sorteo(incidencia):
+    """Día siguiente al último sorteo, salteando el domingo (no hay sorteo)."""
+    fecha = incidencia.fechas[-1].item() + timedelta(days=1)
+    return fecha + timedelta(days=1) if fecha.weekday() == 6 else fecha
+
+
+def predecir_lstm(df):
+    """Encadena 10 predicciones desde el último número del último día completo (10 números)."""
+    lstm = LSTMNumpy.cargar(ruta_exportado("lstm"))
+    _, inicio_dia, cantidad = np.unique(df["Fecha"].values, return_index=True, return_counts=True)
+    completos = np.flatnonzero(cantidad == 10)
+    if len(completos) == 0:
+        return []
+    ultimo = df["Numero"].values[inicio_dia[completos[-1]] + 9]
+    entrada = np.searchsorted(lstm.clases, [ultimo])
+    if entrada[0] >= len(lstm.clases) or lstm.clases[entrada[0]] != ultimo:
+        raise ValueError(f"El número {ultimo} no está entre las clases del LSTM exportado. Reentrenar.")
+    prediccion = []
+    for _ in range(10):
+        entrada = np.argmax(lstm.probabilidades(entrada), axis=1)
+        prediccion.append(int(lstm.clases[entrada[0]]))
+    return prediccion
+
+
+def predecir(nombre, incidencia, df):
+    """Top 10 del próximo día de sorteo a partir de los parámetros exportados."""
+    if nombre == "lstm":
+        return predecir_lstm(df)
+
+    dia = proximo_dia_sorteo(incidencia).weekday()
+    if nombre in ("rf", "xgb", "lgb"):
+        bosque = BosqueNumpy.cargar(ruta_exportado(nombre))
+        eventos = incidencia.presencia if nombre == "rf" else incidencia.conteos
+        X = np.column_stack([np.arange(N_NUMEROS), np.full(N_NUMEROS, dia),
+                             eventos.sum(axis=0, dtype=np.int64)])
+        puntajes = bosque.predict_proba(X)
+    else:
+        conteo = ConteoNumpy.cargar(ruta_exportado(nombre))
+        # Como en los scripts: conteo esperado sumado sobre los 7 días de la semana
+        puntajes = conteo.predecir(np.arange(N_NUMEROS)[:, None], np.arange(7)[None, :]).sum(axis=1)
+    return top_k(puntajes[None, :], k=10, solo_positivos=False)[0]
+
+
+# --- Medición del tiempo de importación ---
+
+def medir_importacion(modulo="prediccion_rapida_tombola"):
+    """
+    Importa el módulo en un intérprete nuevo y devuelve (segundos, librerías
+    pesadas que quedaron importadas).
+    """
+    codigo = ("import sys, time; inicio = time.perf_counter(); import {0}; "
+              "print(time.perf_counter() - inicio); print(','.join(m for m in {1!r} if m in sys.modules))"
+              ).format(modulo, PESADAS)
+    salida = subprocess.run([sys.executable, "-c", codigo], cwd=CARPETA_SCRIPTS,
+                            capture_output=True, text=True, check=True).stdout.splitlines()
+    return float(salida[0]), [m for m in salida[1].split(",") if m]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Top 10 del próximo sorteo con los parámetros exportados, usando solo NumPy."
+    )
+    parser.add_argument("modelos", nargs="*", metavar="modelo",
+                        help=f"Modelos a usar (por defecto, todos): {', '.join(MODELOS)}.")
+    parser.add_argument("--entrenar", action="store_true",
+                        help="Reentrenar/exportar los parámetros antes de predecir (importa las librerías pesadas).")
+    parser.add_argument("--medir-importacion", action="store_true",
+                        help="Solo medir el tiempo de importación de este módulo en un intérprete nuevo.")
+    parser.add_argument("--limite-ms", type=float, default=None,
+                        help="Con --medir-importacion: terminar con error si se supera este tiempo.")
+    args = parser.parse_args()
+
+    if args.medir_importacion:
+        segundos, pesadas = medir_importacion()
+        print(f"⏱️ Importación: {segundos * 1000:.0f} ms")
+        print(f"📦 Librerías pesadas importadas: {', '.join(pesadas) or 'ninguna'}")
+        if pesadas or (args.limite_ms is not None and segundos * 1000 > args.limite_ms):
+            sys.exit(1)
+        return
+
+    desconocidos = [nombre for nombre in args.modelos if nombre not in MODELOS]
+    if desconocidos:
+        parser.error(f"modelos desconocidos: {', '.join(desconocidos)}")
+    nombres = list(dict.fromkeys(args.modelos)) or list(MODELOS)
+
+    try:
+        df = cargar_sorteos(RUTA_EXCEL)
+        incidencia = cargar_incidencia(RUTA_EXCEL)
+    except FileNotFoundError:
+        print("❌ Error: No se encontró el archivo 'tombola.xlsx' en la carpeta 'data'.")
+        sys.exit(1)
+
+    print(f"📅 Próximo sorteo: {proximo_dia_sorteo(incidencia)}")
+    errores = False
+    for nombre in nombres:
+        ruta = ruta_exportado(nombre)
+        inicio = time.perf_counter()
+        try:
+            if args.entrenar:
+                entrenar(nombre, incidencia)
+            elif not os.path.exists(ruta):
+                print(f"❌ {nombre}: no hay parámetros exportados en '{ruta}'. Ejecutar con --entrenar.")
+                errores = True
+                continue
+            elif metadatos(ruta).get("clave") != clave_origen(nombre):
+                print(f"⚠️ {nombre}: los parámetros exportados corresponden a otros datos. Conviene --entrenar.")
+            prediccion = predecir(nombre, incidencia, df)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"❌ {nombre}: {e}")
+            errores = True
+            continue
+        print(f"🔮 {nombre:<18} {prediccion}  ({(time.perf_counter() - inicio) * 1000:.0f} ms)")
+
+    if not args.entrenar and pesadas_importadas():
+        print(f"⚠️ La predicción importó librerías pesadas: {', '.join(pesadas_importadas())}")
+    if errores:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
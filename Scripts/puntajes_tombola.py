@@ -0,0 +1,122 @@
+# 📦 Importaciones
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from incidencia_tombola import N_NUMEROS
+
+# 📁 Tablas de puntajes de todos los modelos
+PATRON_PUNTAJES = os.path.join("data", "*.puntajes.npy")
+
+# 🧱 Una fila por (semana, número): 14 bytes por fila, sin relleno.
+# rango es el puesto del número en el orden del script (1 = el mejor) y 0
+# si el script no lo considera (sin puntaje, o puntaje 0 en frecuencia)
+DTYPE_PUNTAJES = np.dtype([
+    ("semana_inicio", "<M8[D]"),
+    ("numero", "u1"),
+    ("puntaje", "<f4"),
+    ("rango", "u1"),
+])
+
+
+def agregar_argumento_puntajes(parser):
+    parser.add_argument("--puntajes", action="store_true",
+                        help="Guardar además el puntaje y el puesto de los 100 números de cada semana "
+                             "en <salida>.puntajes.npy.")
+
+
+def ruta_puntajes(ruta_csv):
+    """data/modelo_x_tombola.csv -> data/modelo_x_tombola.puntajes.npy."""
+    return os.path.splitext(ruta_csv)[0] + ".puntajes.npy"
+
+
+def puntajes_semana(inicio_semana, puntajes=None, orden=()):
+    """
+    Las 100 filas de una semana. puntajes: vector de 100 (NaN = sin puntaje)
+    o None; orden: números en el orden en que el script los elige.
+    """
+    tabla = np.zeros(N_NUMEROS, dtype=DTYPE_PUNTAJES)
+    tabla["semana_inicio"] = np.datetime64(inicio_semana, "D")
+    tabla["numero"] = np.arange(N_NUMEROS)
+    tabla["puntaje"] = np.nan if puntajes is None else puntajes
+    tabla["rango"][np.asarray(orden, dtype=np.intp)] = np.arange(1, len(orden) + 1)
+    return tabla
+
+
+def tabla_puntajes(inicios, puntajes, rangos):
+    """Tabla de varias semanas a la vez: inicios (n,), puntajes y rangos (n, 100)."""
+    tabla = np.zeros(len(inicios) * N_NUMEROS, dtype=DTYPE_PUNTAJES)
+    tabla["semana_inicio"] = np.repeat(np.asarray(inicios, dtype="datetime64[D]"), N_NUMEROS)
+    tabla["numero"] = np.tile(np.arange(N_NUMEROS), len(inicios))
+    tabla["puntaje"] = np.asarray(puntajes).ravel()
+    tabla["rango"] = np.asarray(rangos).ravel()
+    return tabla
+
+
+def rangos_de_orden(orden, validos=None):
+    """Matriz (n, 100) de puestos a partir de órdenes completos (n, 100); validos marca los que cuentan."""
+    orden = np.asarray(orden)
+    puestos = np.broadcast_to(np.arange(1, orden.shape[1] + 1, dtype=np.uint8), orden.shape)
+    if validos is not None:
+        puestos = np.where(validos, puestos, 0).astype(np.uint8)
+    rangos = np.zeros(orden.shape, dtype=np.uint8)
+    np.put_along_axis(rangos, orden, puestos, axis=1)
+    return rangos
+
+
+def puntajes_de_filas(filas):
+    """Junta las tablas de las filas semanales (las filas sin puntajes quedan con NaN y rango 0)."""
+    if not len(filas):
+        return np.zeros(0, dtype=DTYPE_PUNTAJES)
+    return np.concatenate([
+        fila["puntajes"] if "puntajes" in fila else puntajes_semana(np.datetime64(fila["semana_inicio"], "D"))
+        for fila in filas
+    ])
+
+
+def guardar_puntajes(ruta, tabla):
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "wb") as f:
+        np.save(f, tabla)
+    os.replace(temporal, ruta)
+
+
+def leer_puntajes(ruta, mmap=True):
+    """Tabla guardada; con mmap se mapea el archivo sin copiarlo a memoria."""
+    return np.load(ruta, mmap_mode="r" if mmap else None)
+
+
+def leer_modelos(patron=PATRON_PUNTAJES):
+    """{modelo: tabla mapeada} de todos los archivos de puntajes que coinciden con el patrón."""
+    return {os.path.basename(ruta)[:-len(".puntajes.npy")]: leer_puntajes(ruta) for ruta in sorted(glob.glob(patron))}
+
+
+def a_dataframe(tabla, modelo=None):
+    """DataFrame con los tipos compactos de la tabla (y una columna modelo si se indica)."""
+    df = pd.DataFrame({nombre: tabla[nombre] for nombre in tabla.dtype.names})
+    if modelo is not None:
+        df.insert(0, "modelo", pd.Categorical([modelo] * len(df)))
+    return df
+
+
+def primeros(tabla, k=10):
+    """Matriz (semanas, k) con los números de puesto 1 a k de cada semana, en orden (-1 donde no hay)."""
+    rangos = np.asarray(tabla["rango"]).reshape(-1, N_NUMEROS).astype(np.int16)
+    orden = np.argsort(np.where(rangos > 0, rangos, N_NUMEROS + 1), axis=1, kind="stable")[:, :k]
+    return np.where(np.take_along_axis(rangos, orden, axis=1) > 0, orden, -1)
+
+
+def vista_csv(tabla, k=10):
+    """
+    El CSV semanal (semana_inicio, semana_fin, prediccion) que corresponde a
+    la tabla: los números con puesto 1 a k de cada semana, en orden.
+    """
+    inicios = np.asarray(tabla["semana_inicio"])[::N_NUMEROS]
+    numeros = primeros(tabla, k)
+    return pd.DataFrame({
+        "semana_inicio": inicios.astype(str),
+        "semana_fin": (inicios + np.timedelta64(6, "D")).astype(str),
+        "prediccion": [str(fila[fila >= 0].tolist()) if (fila >= 0).any() else "" for fila in numeros],
+    })
@@ -0,0 +1,180 @@
+# 📦 Importaciones
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from puntajes_tombola import DTYPE_PUNTAJES, guardar_puntajes, leer_puntajes, puntajes_de_filas, ruta_puntajes
+
+# 🔖 Versión del archivo de estado (cambiarla obliga a recalcular todo)
+VERSION_ESTADO = 1
+
+# Valor de "desde" cuando ninguna semana cambió
+SIN_PENDIENTES = "9999-12-31"
+
+# Opciones que no cambian el resultado y no invalidan las filas guardadas
+OPCIONES_NEUTRAS = ("trabajadores", "solo_nuevas", "salida", "puntajes", "cache_mb")
+
+
+def agregar_argumento_solo_nuevas(parser):
+    parser.add_argument("--solo-nuevas", action="store_true",
+                        help="Calcular solo las semanas que faltan en el CSV o que cambiaron por sorteos "
+                             "nuevos, y conservar las demás filas.")
+
+
+def configuracion(args, **extra):
+    """Opciones que definen el resultado del script (para detectar si cambiaron entre corridas)."""
+    opciones = {nombre: valor for nombre, valor in vars(args).items() if nombre not in OPCIONES_NEUTRAS}
+    opciones.update(extra)
+    return opciones
+
+
+def ruta_estado(ruta_csv):
+    """data/modelo_x_tombola.csv -> data/modelo_x_tombola.estado.json."""
+    return os.path.splitext(ruta_csv)[0] + ".estado.json"
+
+
+def huellas_semanales(incidencia):
+    """
+    Huella (hash corto) de los sorteos de cada semana, indexada por el
+    inicio de semana "YYYY-MM-DD". Si cambia la de una semana, cambian las
+    predicciones de esa semana y de todas las siguientes.
+    """
+    inicios, _, cortes = incidencia.semanas()
+    desde = np.concatenate(([0], cortes[:-1]))
+    fechas = incidencia.fechas.astype(np.int64)
+    huellas = {}
+    for inicio, a, b in zip(inicios.astype(str), desde, cortes):
+        h = hashlib.blake2b(digest_size=8)
+        h.update(fechas[a:b].tobytes())
+        h.update(np.ascontiguousarray(incidencia.conteos[a:b]).tobytes())
+        huellas[inicio] = h.hexdigest()
+    return huellas
+
+
+def _escribir_atomico(ruta, escribir):
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "w", newline="", encoding="utf-8") as f:
+        escribir(f)
+    os.replace(temporal, ruta)
+
+
+class SalidaIncremental:
+    """
+    CSV semanal (semana_inicio, semana_fin, prediccion) que se puede
+    completar en lugar de recalcular.
+
+    Junto al CSV se guarda un estado (.estado.json) con la configuración del
+    script y la huella de los sorteos de cada semana. Con solo_nuevas, se
+    conservan las filas anteriores a la primera semana cuya huella cambió
+    (o que es nueva) y solo se calculan las semanas desde ahí. Sin estado
+    previo se recalcula desde la última semana del CSV, que pudo haberse
+    escrito con la semana a medias. Si cambió la configuración se recalcula
+    todo.
+
+    Con puntajes, además del CSV se mantiene la tabla de puntajes
+    (.puntajes.npy) con las mismas semanas; si la tabla guardada no cubre las
+    filas que se conservan, se recalcula todo. Sin puntajes, al guardar se
+    borra la tabla que haya quedado de una corrida anterior.
+    """
+
+    def __init__(self, ruta_csv, incidencia, configuracion, solo_nuevas=False, puntajes=False):
+        self.ruta_csv = ruta_csv
+        self.ruta_puntajes = ruta_puntajes(ruta_csv) if puntajes else None
+        self.puntajes_previos = np.zeros(0, dtype=DTYPE_PUNTAJES)
+        self.configuracion = json.loads(json.dumps(configuracion, default=str))
+        self.huellas = huellas_semanales(incidencia)
+        self.previas = pd.DataFrame(columns=["semana_inicio", "semana_fin", "prediccion"])
+        self.desde = None  # primera semana a calcular ("YYYY-MM-DD"); None = todas
+        self._sobrantes = False
+        if solo_nuevas:
+            self._cargar_previas()
+
+    def _cargar_previas(self):
+        if not os.path.exists(self.ruta_csv):
+            return
+        previas = pd.read_csv(self.ruta_csv, dtype=str, keep_default_na=False)
+        estado = self._leer_estado()
+        if estado is not None and estado.get("configuracion") != self.configuracion:
+            return  # otras opciones: se recalcula todo
+
+        if estado is not None:
+            guardadas = estado["huellas"]
+            cambiadas = [semana for semana, huella in self.huellas.items() if guardadas.get(semana) != huella]
+            self.desde = cambiadas[0] if cambiadas else SIN_PENDIENTES
+            # Semanas que ya no están en los datos: hay que reescribir sin ellas
+            self._sobrantes = not guardadas.keys() <= self.huellas.keys()
+        elif len(previas):
+            self.desde = previas["semana_inicio"].max()
+        else:
+            return
+        vigentes = previas["semana_inicio"].isin(self.huellas.keys()) & (previas["semana_inicio"] < self.desde)
+        self.previas = previas[vigentes].reset_index(drop=True)
+        if self.ruta_puntajes is not None:
+            self._cargar_puntajes_previos()
+
+    def _cargar_puntajes_previos(self):
+        try:
+            tabla = leer_puntajes(self.ruta_puntajes, mmap=False)
+        except (OSError, ValueError):
+            tabla = np.zeros(0, dtype=DTYPE_PUNTAJES)
+        semanas = tabla["semana_inicio"].astype(str) if tabla.dtype == DTYPE_PUNTAJES else np.array([], dtype=str)
+        conservar = np.isin(semanas, self.previas["semana_inicio"].to_numpy())
+        if set(semanas[conservar]) != set(self.previas["semana_inicio"]):
+            # La tabla no acompaña al CSV (p. ej. la corrida anterior fue sin puntajes)
+            self.desde, self._sobrantes = None, False
+            self.previas = self.previas.iloc[:0]
+            return
+        self.puntajes_previos = tabla[conservar]
+
+    def _leer_estado(self):
+        try:
+            with open(ruta_estado(self.ruta_csv), encoding="utf-8") as f:
+                estado = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if estado.get("version") != VERSION_ESTADO or not isinstance(estado.get("huellas"), dict):
+            return None
+        return estado
+
+    @property
+    def sin_cambios(self):
+        """True si el CSV ya cubre todas las semanas con los sorteos actuales."""
+        return self.desde == SIN_PENDIENTES and not self._sobrantes
+
+    def es_pendiente(self, semana_inicio):
+        """True si hay que calcular la semana que empieza en semana_inicio ("YYYY-MM-DD")."""
+        return self.desde is None or semana_inicio >= self.desde
+
+    def pendientes(self, semanas):
+        """Las semanas (date) que hay que calcular."""
+        return [semana for semana in semanas if self.es_pendiente(semana.strftime("%Y-%m-%d"))]
+
+    def guardar(self, filas_nuevas, puntajes=None):
+        """
+        Escribe las filas conservadas más las nuevas (reemplazo atómico del
+        CSV) y actualiza el estado. Con la tabla de puntajes activa, las
+        filas nuevas se toman de puntajes o, si es None, de la clave
+        "puntajes" de cada fila. Devuelve el DataFrame completo.
+        """
+        if self.sin_cambios and os.path.exists(self.ruta_csv):
+            return self.previas
+        nuevas = pd.DataFrame(filas_nuevas, columns=["semana_inicio", "semana_fin", "prediccion"])
+        df = pd.concat([self.previas, nuevas], ignore_index=True) if len(self.previas) else nuevas
+        os.makedirs(os.path.dirname(self.ruta_csv) or ".", exist_ok=True)
+        _escribir_atomico(self.ruta_csv, lambda f: df.to_csv(f, index=False))
+        if self.ruta_puntajes is not None:
+            if puntajes is None:
+                puntajes = puntajes_de_filas(filas_nuevas)
+            guardar_puntajes(self.ruta_puntajes, np.concatenate([self.puntajes_previos, puntajes]))
+        else:
+            # Una tabla de una corrida anterior con puntajes ya no acompaña a este CSV
+            try:
+                os.remove(ruta_puntajes(self.ruta_csv))
+            except FileNotFoundError:
+                pass
+        estado = {"version": VERSION_ESTADO, "configuracion": self.configuracion, "huellas": self.huellas}
+        _escribir_atomico(ruta_estado(self.ruta_csv), lambda f: json.dump(estado, f, indent=1))
+        return df
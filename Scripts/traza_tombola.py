@@ -0,0 +1,105 @@
+# 📦 Importaciones
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: sin memoria pico
+    resource = None
+
+# ⚙️ La traza se activa con TOMBOLA_TRAZA=1 (se hereda en los procesos trabajadores)
+VARIABLE_ENTORNO = "TOMBOLA_TRAZA"
+
+# Contexto vacío que se devuelve cuando la traza está apagada
+_NULO = contextlib.nullcontext()
+
+
+def traza_activa():
+    return os.environ.get(VARIABLE_ENTORNO, "") not in ("", "0")
+
+
+def rss_pico_mb():
+    """Memoria residente máxima del proceso hasta ahora, en MB (None si no se puede medir)."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss está en KiB en Linux y en bytes en macOS
+    return pico / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def ruta_traza(ruta_salida):
+    """data/modelo_x_tombola.csv -> data/modelo_x_tombola.traza.jsonl."""
+    return os.path.splitext(ruta_salida)[0] + ".traza.jsonl"
+
+
+class Traza:
+    """
+    Mide etapas de un script y las escribe como JSON lines junto a su salida.
+
+    Cada etapa es un bloque `with traza.etapa("nombre", semana=..., numero=...)`
+    y genera una línea con: modelo, etapa, padre (etapa que la contiene),
+    los datos extra, inicio (epoch), segundos de reloj, cpu_segundos del
+    proceso, rss_pico_mb (máximo del proceso al terminar la etapa),
+    rss_aumento_mb (cuánto subió ese máximo durante la etapa), pid y error
+    si la etapa terminó con una excepción.
+
+    Apagada (sin TOMBOLA_TRAZA), etapa() devuelve siempre el mismo contexto
+    vacío y no mide ni escribe nada. Los procesos trabajadores escriben en el
+    mismo archivo (modo append, una escritura por línea).
+    """
+
+    def __init__(self, ruta_salida, activa=None):
+        self.activa = traza_activa() if activa is None else activa
+        self.ruta = ruta_traza(ruta_salida)
+        self.modelo = os.path.splitext(os.path.basename(ruta_salida))[0]
+        self._pila = []
+        self._fd = None
+        self._pid = None
+        # Solo el proceso principal empieza la traza de cero
+        if self.activa and multiprocessing.parent_process() is None:
+            os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+            open(self.ruta, "w").close()
+
+    def etapa(self, nombre, **datos):
+        if not self.activa:
+            return _NULO
+        return self._medir(nombre, datos)
+
+    @contextlib.contextmanager
+    def _medir(self, nombre, datos):
+        padre = self._pila[-1] if self._pila else None
+        self._pila.append(nombre)
+        marca = time.time()
+        pico_antes = rss_pico_mb()
+        inicio, cpu = time.perf_counter(), time.process_time()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            segundos, cpu_segundos = time.perf_counter() - inicio, time.process_time() - cpu
+            pico = rss_pico_mb()
+            self._pila.pop()
+            registro = {"modelo": self.modelo, "etapa": nombre, "padre": padre, **datos,
+                        "inicio": round(marca, 6), "segundos": round(segundos, 6),
+                        "cpu_segundos": round(cpu_segundos, 6),
+                        "rss_pico_mb": None if pico is None else round(pico, 1),
+                        "rss_aumento_mb": None if pico is None else round(pico - pico_antes, 1),
+                        "pid": os.getpid()}
+            if error:
+                registro["error"] = error
+            self._escribir(registro)
+
+    def _escribir(self, registro):
+        # Cada proceso (incluidos los trabajadores creados con fork) abre su propio descriptor
+        if self._pid != os.getpid():
+            self._fd = os.open(self.ruta, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            self._pid = os.getpid()
+        linea = json.dumps(registro, ensure_ascii=False, default=str) + "\n"
+        os.write(self._fd, linea.encode("utf-8"))